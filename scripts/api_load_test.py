@@ -0,0 +1,332 @@
+"""
+API Load Test
+Open-loop load harness for the dashboard and analytics API routes, with a weighted
+route mix whose query parameters come from the generated dataset
+"""
+
+import asyncio
+import ipaddress
+import os
+import subprocess
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional
+from urllib.parse import urlencode
+
+import numpy as np
+import pandas as pd
+
+from data_io import read_frame
+from http_load import (DEFAULT_CONNECTIONS, DEFAULT_TIMEOUT, ConnectionPool, ScheduledRequest, print_summary,
+                       run_open_loop, split_url, start_stand_in, write_results)
+from replay_events import find_dataset
+from schema import RISK_LEVELS, SUBJECTS, format_ids, id_widths
+
+
+DEFAULT_RATE = 20.0
+DEFAULT_DURATION = 60.0
+DEFAULT_WARMUP = 1
+
+ALERT_SEVERITIES = ['critical', 'high', 'medium', 'low']
+METRICS = ['engagement', 'empathy', 'clarity', 'satisfaction']
+DAY_WINDOWS = [7, 14, 30]
+
+
+class DatasetParams:
+    """Query parameter values drawn from a generated dataset"""
+
+    def __init__(self, data_dir: str):
+        tutors = read_frame(find_dataset(data_dir, 'tutor_profiles'), table='tutor_profiles')
+        self.tutor_ids = format_ids(tutors['tutor_id'], 'tutor_id', id_widths(tutors).get('tutor_id'))
+        # Busier tutors are looked up more often
+        weights = tutors['total_sessions_completed'].to_numpy(dtype=float) + 1
+        aggregates_path = find_dataset(data_dir, 'tutor_aggregates')
+        if aggregates_path is not None:
+            aggregates = read_frame(aggregates_path, table='tutor_aggregates')
+            sessions = aggregates.set_index('tutor_id')['total_sessions_30d'].reindex(tutors['tutor_id'])
+            weights = sessions.fillna(0).to_numpy(dtype=float) + 1
+        self.tutor_weights = weights / weights.sum()
+        self.subjects = sorted(tutors['primary_subject'].dropna().astype(str).unique()) or list(SUBJECTS)
+
+        # Date windows no longer than the sessions span
+        self.span_days = max(DAY_WINDOWS)
+        sessions_path = find_dataset(data_dir, 'sessions')
+        if sessions_path is not None:
+            times = pd.to_datetime(read_frame(sessions_path)['session_datetime'])
+            self.span_days = max(1, (times.max() - times.min()).days + 1)
+        self.day_windows = [days for days in DAY_WINDOWS if days <= self.span_days] or [self.span_days]
+
+        # Experiment statuses and date ranges
+        self.experiments = []
+        experiments_path = find_dataset(data_dir, 'experiments')
+        if experiments_path is not None:
+            experiments = read_frame(experiments_path)
+            starts = pd.to_datetime(experiments['start_date']).dt.strftime('%Y-%m-%d')
+            ends = pd.to_datetime(experiments['end_date']).dt.strftime('%Y-%m-%d')
+            self.experiments = list(zip(experiments['status'].astype(str), starts, ends))
+
+    def tutor(self, rng: np.random.Generator) -> str:
+        return str(self.tutor_ids[rng.choice(len(self.tutor_ids), p=self.tutor_weights)])
+
+    def days(self, rng: np.random.Generator) -> int:
+        return int(rng.choice(self.day_windows))
+
+
+def _query(path: str, **params) -> str:
+    params = {key: value for key, value in params.items() if value is not None}
+    return path + ('?' + urlencode(params) if params else '')
+
+
+def _maybe(rng: np.random.Generator, share: float, value: Callable):
+    """value() for share of the requests, None otherwise"""
+    return value() if rng.random() < share else None
+
+
+def _experiments(rng: np.random.Generator, data: DatasetParams) -> str:
+    if not data.experiments or rng.random() < 0.4:
+        return _query('/api/experiments', limit=50)
+    status, start, end = data.experiments[rng.integers(len(data.experiments))]
+    if rng.random() < 0.5:
+        return _query('/api/experiments', status=status, limit=50)
+    return _query('/api/experiments', startDate=start, endDate=end, limit=50)
+
+
+# Route -> (share of traffic, path builder). Weights follow dashboard usage: the overview
+# metrics and tutor list load with every page view, drill-downs on a tutor are rarer.
+ROUTE_MIX: Dict[str, tuple] = {
+    'dashboard/metrics': (20, lambda rng, data: '/api/dashboard/metrics'),
+    'dashboard/tutors': (15, lambda rng, data: _query(
+        '/api/dashboard/tutors', limit=50, offset=int(rng.choice([0, 0, 0, 50, 100])),
+        risk_level=_maybe(rng, 0.4, lambda: rng.choice(RISK_LEVELS)),
+        subject=_maybe(rng, 0.2, lambda: rng.choice(data.subjects)))),
+    'dashboard/engagement-trends': (8, lambda rng, data: '/api/dashboard/engagement-trends'),
+    'alerts': (12, lambda rng, data: _query(
+        '/api/alerts', limit=50, tutorId=_maybe(rng, 0.3, lambda: data.tutor(rng)),
+        severity=_maybe(rng, 0.3, lambda: rng.choice(ALERT_SEVERITIES)))),
+    'alerts/stats': (5, lambda rng, data: '/api/alerts/stats'),
+    'analytics/heatmap': (10, lambda rng, data: _query(
+        '/api/analytics/heatmap', days=data.days(rng), metricType=rng.choice(METRICS),
+        tutorId=_maybe(rng, 0.3, lambda: data.tutor(rng)))),
+    'analytics/trends': (10, lambda rng, data: _query(
+        '/api/analytics/trends', type='engagement', metric=rng.choice(METRICS), days=data.days(rng),
+        tutorId=_maybe(rng, 0.5, lambda: data.tutor(rng)))),
+    'analytics/noshow-risk': (6, lambda rng, data: _query(
+        '/api/analytics/noshow-risk', daysAhead=7, tutorId=_maybe(rng, 0.3, lambda: data.tutor(rng)))),
+    'experiments': (6, _experiments),
+    'engagement/metrics': (4, lambda rng, data: _query(
+        '/api/engagement/metrics', metricType=rng.choice(METRICS), period=data.days(rng),
+        tutorId=_maybe(rng, 0.5, lambda: data.tutor(rng)))),
+    'engagement/timeline': (4, lambda rng, data: _query(
+        f'/api/engagement/tutors/{data.tutor(rng)}/timeline', limit=10, days=data.days(rng))),
+}
+
+
+def arrival_schedule(data: DatasetParams, rate: float, duration: float, routes: Optional[List[str]] = None,
+                     seed: int = 42) -> Iterator[ScheduledRequest]:
+    """
+    Poisson arrivals at rate requests/s for duration seconds, routes drawn by weight
+
+    Arrival times do not depend on responses (open loop), so the offered load is the
+    same for every build under test.
+    """
+    rng = np.random.default_rng(seed)
+    names = list(routes or ROUTE_MIX)
+    weights = np.array([ROUTE_MIX[name][0] for name in names], dtype=float)
+    weights /= weights.sum()
+    offset = 0.0
+    while True:
+        offset += rng.exponential(1 / rate)
+        if offset > duration:
+            return
+        name = names[rng.choice(len(names), p=weights)]
+        yield offset, name, 'GET', ROUTE_MIX[name][1](rng, data), None
+
+
+def is_local(url: str) -> bool:
+    """Whether a URL points at this machine or a private network address"""
+    host = split_url(url)[0]
+    if host == 'localhost':
+        return True
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return address.is_loopback or address.is_private
+
+
+def build_label() -> str:
+    """Short git commit of the working tree, for telling builds apart in saved results"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+async def warm_up(pool: ConnectionPool, data: DatasetParams, routes: List[str], requests: int,
+                  seed: int = 42) -> Dict[str, List[int]]:
+    """
+    Request each route a few times before measuring (the dev server compiles routes on
+    first use), returning the statuses seen per route
+    """
+    rng = np.random.default_rng(seed + 1)
+    statuses = {}
+    for name in routes:
+        statuses[name] = [(await pool.request('GET', ROUTE_MIX[name][1](rng, data))).status for _ in range(requests)]
+    return statuses
+
+
+async def run_load_test(data: DatasetParams, url: Optional[str] = None, rate: float = DEFAULT_RATE,
+                        duration: float = DEFAULT_DURATION, routes: Optional[List[str]] = None,
+                        connections: int = DEFAULT_CONNECTIONS, max_pending: Optional[int] = None,
+                        timeout: float = DEFAULT_TIMEOUT, warmup: int = DEFAULT_WARMUP, seed: int = 42,
+                        stand_in_latency_ms: float = 0.0) -> Dict:
+    """
+    Offer the route mix to the app at a fixed arrival rate and measure it
+
+    Args:
+        data: Query parameter values from the dataset
+        url: Base URL of the app (default: start a local stand-in server)
+        rate: Arrivals per second
+        duration: Seconds of arrivals
+        routes: Routes of ROUTE_MIX to include (default: all)
+        connections: Keep-alive connections in the pool
+        max_pending: Cap on unanswered requests before arrivals stall
+        timeout: Seconds before a request counts as failed
+        warmup: Unmeasured requests per route before the run
+        seed: Seed of the arrival times, route choices and parameters
+        stand_in_latency_ms: Response delay of the stand-in server
+
+    Returns:
+        Settings, warm-up statuses and summary of the run (see LoadStats.summary)
+    """
+    routes = list(routes or ROUTE_MIX)
+    server = None
+    if url is None:
+        server, url, _ = await start_stand_in(latency_ms=stand_in_latency_ms)
+    pool = ConnectionPool(url, size=connections, timeout=timeout)
+    try:
+        warmed = await warm_up(pool, data, routes, warmup, seed) if warmup else {}
+        stats, elapsed = await run_open_loop(arrival_schedule(data, rate, duration, routes, seed), pool,
+                                             max_pending=max_pending)
+    finally:
+        pool.close()
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+    return {
+        'settings': {'url': url, 'stand_in': server is not None, 'rate': rate, 'duration': duration,
+                     'routes': {name: ROUTE_MIX[name][0] for name in routes}, 'connections': connections,
+                     'max_pending': max_pending, 'seed': seed},
+        'warmup': warmed,
+        'summary': stats.summary(elapsed, pool),
+    }
+
+
+def compare_to_baseline(results: Dict, baseline: Dict, threshold: float = 0.25, min_ms: float = 5.0) -> List[str]:
+    """
+    Compare per-route p95/p99 latency and error counts to an earlier run
+
+    Args:
+        results: Output of run_load_test
+        baseline: Earlier output of run_load_test (same rate and route mix for a fair comparison)
+        threshold: Allowed relative latency growth (0.25 = 25%)
+        min_ms: Percentiles below this in the baseline are too noisy to compare
+
+    Returns:
+        Regression messages (empty when everything is within thresholds)
+    """
+    regressions = []
+    previous_routes = baseline.get('summary', {}).get('routes', {})
+    for route, current in results['summary']['routes'].items():
+        previous = previous_routes.get(route)
+        if previous is None:
+            continue
+        for key in ('p95', 'p99'):
+            before = previous['latency_ms'].get(key)
+            after = current['latency_ms'].get(key)
+            if before is None or after is None or before < min_ms:
+                continue
+            if after > before * (1 + threshold):
+                regressions.append(f"{route}: {key} {before:.1f} ms -> {after:.1f} ms ({after / before:.2f}x)")
+        if current['errors'] > previous['errors']:
+            regressions.append(f"{route}: {previous['errors']} -> {current['errors']} errors")
+    return regressions
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import sys
+
+    parser = argparse.ArgumentParser(description='Open-loop load test of the dashboard and analytics API routes')
+    parser.add_argument('--data-dir', type=str, default='data',
+                       help='Generated dataset to draw tutor IDs, date ranges and experiments from (default: data)')
+    parser.add_argument('--url', type=str, default=None,
+                       help='Base URL of the app, e.g. http://localhost:3000 (default: a local stand-in server)')
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                       help=f'Arrivals per second (default: {DEFAULT_RATE:g})')
+    parser.add_argument('--duration', type=float, default=DEFAULT_DURATION,
+                       help=f'Seconds of arrivals (default: {DEFAULT_DURATION:g})')
+    parser.add_argument('--routes', type=str, default=None,
+                       help=f"Comma-separated subset of: {', '.join(ROUTE_MIX)} (default: all)")
+    parser.add_argument('--connections', type=int, default=DEFAULT_CONNECTIONS,
+                       help=f'Keep-alive connections (default: {DEFAULT_CONNECTIONS})')
+    parser.add_argument('--max-pending', type=int, default=None,
+                       help='Unanswered requests before arrivals stall (default: 64 per connection)')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                       help=f'Request timeout in seconds (default: {DEFAULT_TIMEOUT:g})')
+    parser.add_argument('--warmup', type=int, default=DEFAULT_WARMUP,
+                       help=f'Unmeasured requests per route before the run (default: {DEFAULT_WARMUP})')
+    parser.add_argument('--stand-in-latency-ms', type=float, default=0.0,
+                       help='Response delay of the stand-in server (default: 0)')
+    parser.add_argument('--allow-remote', action='store_true',
+                       help='Allow a --url that is not on this machine or a private network')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+    parser.add_argument('--label', type=str, default=None,
+                       help='Build label saved with the results (default: current git commit)')
+    parser.add_argument('--output', type=str, default='data/api_load_results.json',
+                       help='Where to save the results (default: data/api_load_results.json)')
+    parser.add_argument('--baseline', type=str, default=None,
+                       help='Earlier results to compare against; exits with status 1 on regressions')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                       help='Allowed relative p95/p99 growth against the baseline (default: 0.25)')
+
+    args = parser.parse_args()
+    routes = [route.strip() for route in args.routes.split(',') if route.strip()] if args.routes else None
+    unknown = [route for route in routes or [] if route not in ROUTE_MIX]
+    if unknown:
+        parser.error(f"Unknown routes: {', '.join(unknown)} (choose from {', '.join(ROUTE_MIX)})")
+    if args.url and not args.allow_remote and not is_local(args.url):
+        parser.error(f'{args.url} is not a local address; pass --allow-remote to load-test it anyway')
+    if find_dataset(args.data_dir, 'tutor_profiles') is None:
+        parser.error(f'tutor_profiles not found in {args.data_dir}')
+
+    print(f"\n📂 Reading query parameters from {args.data_dir}...")
+    data = DatasetParams(args.data_dir)
+    print(f"   ✓ {len(data.tutor_ids):,} tutors, {data.span_days} days, {len(data.experiments)} experiments")
+
+    print(f"\n🚦 {args.rate:g} requests/s for {args.duration:g}s against {args.url or 'a local stand-in server'}...")
+    results = asyncio.run(run_load_test(data, args.url, args.rate, args.duration, routes, args.connections,
+                                        args.max_pending, args.timeout, args.warmup, args.seed,
+                                        args.stand_in_latency_ms))
+    failed = {route: statuses for route, statuses in results['warmup'].items()
+              if any(status == 0 or status >= 400 for status in statuses)}
+    if failed:
+        print(f"   ⚠️  Warm-up errors (status 0 = no response): {failed}")
+    print_summary(results['summary'], args.rate)
+
+    results = {'label': args.label or build_label(), 'generated_at': datetime.now().isoformat(), **results}
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    write_results(args.output, results)
+    print(f"\n💾 Saved results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) against {args.baseline} ({baseline.get('label')}):")
+            for regression in regressions:
+                print(f"   - {regression}")
+            sys.exit(1)
+        print(f"\n✅ No regressions against {args.baseline} ({baseline.get('label')})")
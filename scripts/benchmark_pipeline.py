@@ -0,0 +1,215 @@
+"""
+Pipeline Benchmark
+Runs the full generation pipeline at a ladder of dataset sizes and records wall time,
+peak RSS and rows/s per stage, with optional comparison against a saved baseline
+"""
+
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from datetime import datetime
+from multiprocessing import get_context
+from typing import Dict, List, Optional
+
+# tutor_data_gen.py lives in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# Rung -> (tutors, days, sessions per day)
+LADDER = {
+    'dev': (25, 14, 100),
+    'production': (150, 30, 750),
+    '10x': (1500, 30, 7500),
+    '100x': (15000, 30, 75000),
+}
+
+# Fixed reference time so every run generates the same volumes (weekends run lighter)
+BENCHMARK_AS_OF = datetime(2025, 1, 31)
+
+
+def _rows(runner, name: str) -> Optional[int]:
+    """Rows produced by a stage; write stages count the rows of the frame they saved"""
+    result = runner.results.get(name)
+    if hasattr(result, 'shape'):
+        return len(result)
+    deps = runner.stages[name].deps
+    if deps and hasattr(runner.results.get(deps[0]), 'shape'):
+        return len(runner.results[deps[0]])
+    return None
+
+
+def run_rung(rung: str, seed: int = 42, workers: int = 1, shards: int = 1,
+             output_format: str = 'csv', verbose: bool = False) -> Dict:
+    """
+    Run the whole pipeline once at one ladder size (call in a fresh process for a clean peak RSS)
+
+    Returns:
+        Dictionary with the rung size, wall time, peak RSS and per-stage measurements
+    """
+    from tutor_data_gen import build_pipeline
+    from stage_runner import StageRunner, peak_rss_mb
+
+    n_tutors, n_days, sessions_per_day = LADDER[rung]
+    with tempfile.TemporaryDirectory(prefix=f'benchmark_{rung}_') as output_dir:
+        runner = StageRunner(seed=seed, workers=workers)
+        build_pipeline(runner, n_tutors, n_days, sessions_per_day, output_dir, output_format,
+                       as_of=BENCHMARK_AS_OF, shards=shards, train_model=True)
+        with open(os.devnull, 'w') as devnull, redirect_stdout(sys.stdout if verbose else devnull):
+            runner.run()
+
+    stages = {}
+    for name, timing in runner.timings.items():
+        rows = _rows(runner, name)
+        stages[name] = {
+            'duration': round(timing['duration'], 4),
+            'peak_rss_mb': round(timing['peak_rss_mb'], 1),
+            'rows': rows,
+            'rows_per_sec': round(rows / timing['duration'], 1) if rows and timing['duration'] > 0 else None,
+        }
+    return {
+        'tutors': n_tutors,
+        'days': n_days,
+        'sessions_per_day': sessions_per_day,
+        'wall_time': round(runner.wall_time, 4),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'failed': dict(runner.failed),
+        'stages': stages,
+    }
+
+
+def run_ladder(rungs: List[str], seed: int = 42, workers: int = 1, shards: int = 1,
+               output_format: str = 'csv', verbose: bool = False) -> Dict:
+    """Run each rung in its own spawned process and collect machine-readable results"""
+    results = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'seed': seed,
+        'workers': workers,
+        'shards': shards,
+        'output_format': output_format,
+        'rungs': {},
+    }
+    for rung in rungs:
+        n_tutors, n_days, sessions_per_day = LADDER[rung]
+        print(f"\n🏁 {rung}: {n_tutors} tutors, {n_days} days, {sessions_per_day} sessions/day")
+        started = time.time()
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as pool:
+            rung_result = pool.submit(run_rung, rung, seed, workers, shards, output_format, verbose).result()
+        results['rungs'][rung] = rung_result
+        print(f"   ✓ {rung_result['wall_time']:.2f}s wall, peak RSS {rung_result['peak_rss_mb']:.0f} MB "
+              f"({time.time() - started:.2f}s including process start)")
+        print_rung(rung_result)
+    return results
+
+
+def print_rung(rung_result: Dict) -> None:
+    print(f"   {'stage':<28}{'time':>9}{'rows':>11}{'rows/s':>12}{'peak RSS':>11}")
+    for name, stage in rung_result['stages'].items():
+        rows = f"{stage['rows']:,}" if stage['rows'] is not None else '—'
+        rate = f"{stage['rows_per_sec']:,.0f}" if stage['rows_per_sec'] is not None else '—'
+        print(f"   {name:<28}{stage['duration']:>8.2f}s{rows:>11}{rate:>12}{stage['peak_rss_mb']:>8.0f} MB")
+    for name, reason in rung_result['failed'].items():
+        print(f"   ⚠️  {name}: {reason}")
+
+
+def compare_to_baseline(results: Dict, baseline: Dict, time_threshold: float = 0.25,
+                        rss_threshold: float = 0.25, min_seconds: float = 0.05) -> List[str]:
+    """
+    Compare results to a baseline run
+
+    Args:
+        results: Output of run_ladder
+        baseline: Earlier output of run_ladder
+        time_threshold: Allowed relative slowdown per stage and per rung (0.25 = 25%)
+        rss_threshold: Allowed relative growth of a rung's peak RSS
+        min_seconds: Stages faster than this in the baseline are too noisy to compare
+
+    Returns:
+        Regression messages (empty when everything is within thresholds)
+    """
+    regressions = []
+    for rung, current in results['rungs'].items():
+        previous = baseline.get('rungs', {}).get(rung)
+        if previous is None:
+            continue
+
+        for name, stage in current['stages'].items():
+            before = previous['stages'].get(name)
+            if before is None or before['duration'] < min_seconds:
+                continue
+            ratio = stage['duration'] / before['duration']
+            if ratio > 1 + time_threshold:
+                regressions.append(f"{rung}/{name}: {before['duration']:.2f}s -> {stage['duration']:.2f}s "
+                                   f"({ratio:.2f}x)")
+
+        if previous['wall_time'] >= min_seconds and current['wall_time'] > previous['wall_time'] * (1 + time_threshold):
+            regressions.append(f"{rung}: wall time {previous['wall_time']:.2f}s -> {current['wall_time']:.2f}s "
+                               f"({current['wall_time'] / previous['wall_time']:.2f}x)")
+        if current['peak_rss_mb'] > previous['peak_rss_mb'] * (1 + rss_threshold):
+            regressions.append(f"{rung}: peak RSS {previous['peak_rss_mb']:.0f} MB -> {current['peak_rss_mb']:.0f} MB "
+                               f"({current['peak_rss_mb'] / previous['peak_rss_mb']:.2f}x)")
+        for name in current['failed']:
+            if name not in previous.get('failed', {}):
+                regressions.append(f"{rung}/{name}: failed ({current['failed'][name]})")
+    return regressions
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark the generation pipeline at a ladder of sizes')
+    parser.add_argument('--rungs', type=str, default=','.join(LADDER),
+                       help=f"Comma-separated rungs to run (default: {','.join(LADDER)})")
+    parser.add_argument('--output', type=str, default='data/benchmark_results.json',
+                       help='Path for the JSON results (default: data/benchmark_results.json)')
+    parser.add_argument('--baseline', type=str, default=None,
+                       help='Earlier results JSON to compare against; exits with status 1 on regressions')
+    parser.add_argument('--time-threshold', type=float, default=0.25,
+                       help='Allowed relative slowdown per stage and rung (default: 0.25)')
+    parser.add_argument('--rss-threshold', type=float, default=0.25,
+                       help='Allowed relative peak RSS growth per rung (default: 0.25)')
+    parser.add_argument('--min-seconds', type=float, default=0.05,
+                       help='Skip timing comparisons for stages faster than this in the baseline (default: 0.05)')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Worker processes for the pipeline (default: 1)')
+    parser.add_argument('--shards', type=int, default=1,
+                       help='Tutor shards (default: 1)')
+    parser.add_argument('--output-format', type=str, choices=['csv', 'parquet', 'arrow'], default='csv',
+                       help='Output format for the write stages (default: csv)')
+    parser.add_argument('--seed', type=int, default=42,
+                       help='Random seed')
+    parser.add_argument('--verbose', action='store_true',
+                       help='Show pipeline progress output')
+
+    args = parser.parse_args()
+
+    rungs = [rung.strip() for rung in args.rungs.split(',') if rung.strip()]
+    unknown = [rung for rung in rungs if rung not in LADDER]
+    if unknown:
+        parser.error(f"Unknown rungs: {', '.join(unknown)} (choose from {', '.join(LADDER)})")
+
+    results = run_ladder(rungs, args.seed, args.workers, args.shards, args.output_format, args.verbose)
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Saved results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.time_threshold,
+                                          args.rss_threshold, args.min_seconds)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) against {args.baseline}:")
+            for regression in regressions:
+                print(f"   - {regression}")
+            sys.exit(1)
+        print(f"\n✅ No regressions against {args.baseline}")
@@ -0,0 +1,443 @@
+"""
+Churn Model
+Feature rows, training, versioned artifacts and batch scoring for the tutor churn model.
+Incremental training streams feature chunks through a running StandardScaler and
+SGDClassifier.partial_fit, so the feature matrix never has to fit in memory; fitted
+pipelines are saved under a fingerprint of their training data, reused while the data
+is unchanged, and score tutors chunk by chunk in place of the signal-count heuristic,
+on the heuristic's probability scale
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from schema import CERTIFICATION_LEVELS, apply_schema
+
+
+# Bump when features or training change, so older artifacts are not reused
+MODEL_VERSION = 4
+MODEL_MANIFEST = 'churn_model.json'
+DEFAULT_CHUNK_ROWS = 100_000
+DEFAULT_EPOCHS = 5
+DEFAULT_SCORE_ROWS = 250_000
+TEST_FRACTION = 0.25
+TRAINING_MODES = ['batch', 'incremental']
+# Tutors with at least this many heuristic churn signals are labelled churned
+CHURN_SIGNAL_THRESHOLD = 4
+# Heuristic churn probability: SIGNAL_PROBABILITY per signal up to MAX_SIGNAL_PROBABILITY,
+# plus uniform noise up to SIGNAL_NOISE
+SIGNAL_PROBABILITY = 0.12
+MAX_SIGNAL_PROBABILITY = 0.85
+SIGNAL_NOISE = 0.1
+# Churn probability -> risk level: High from 0.5, Medium from 0.3
+RISK_THRESHOLDS = [(0.5, 'High'), (0.3, 'Medium')]
+# Quantiles of model scores kept in the manifest to map them onto the heuristic scale
+PROBABILITY_MAP_KNOTS = 201
+
+# Numeric tutor_aggregates columns used as features, in aggregate column order
+AGGREGATE_FEATURES = ['total_sessions_30d', 'total_sessions_7d', 'avg_rating_30d', 'avg_rating_7d',
+                      'avg_engagement_score', 'avg_empathy_score', 'avg_clarity_score',
+                      'avg_student_satisfaction', 'first_session_avg_rating', 'first_session_count',
+                      'poor_first_session_flag', 'recommendation_rate', 'technical_issue_rate',
+                      'sentiment_trend_7d']
+EXPERIENCE_BINS = [0, 12, 36, 120]
+EXPERIENCE_LEVELS = ['Junior', 'Mid', 'Senior']
+# Region is not generated yet; every tutor is US-East
+REGIONS = ['US-East']
+CATEGORY_LEVELS = {
+    'experience_level': EXPERIENCE_LEVELS,
+    'region': REGIONS,
+    'certification_level': CERTIFICATION_LEVELS,
+}
+# One-hot columns named and ordered as pd.get_dummies(drop_first=True, dummy_na=True) names
+# them, but for the full level lists, so every chunk has the same columns
+FEATURES = AGGREGATE_FEATURES + ['months_experience'] + [
+    f'{column}_{level}' for column, levels in CATEGORY_LEVELS.items() for level in levels[1:] + ['nan']]
+
+AggregateSource = Union[pd.DataFrame, str]
+
+
+def tutor_features(tutors_df: pd.DataFrame) -> pd.DataFrame:
+    """Per-tutor profile inputs of the feature rows, indexed by tutor_id"""
+    return tutors_df.drop_duplicates('tutor_id').set_index('tutor_id')[['months_experience', 'certification_level']]
+
+
+def churn_features(aggregates: pd.DataFrame, tutor_info: pd.DataFrame) -> np.ndarray:
+    """
+    Feature matrix (float64, FEATURES columns) for tutor_aggregates rows
+
+    Args:
+        aggregates: tutor_aggregates rows (any chunk of them)
+        tutor_info: tutor_features() of the tutors; tutors missing from it get
+            0 months and the 'nan' experience and certification levels
+    """
+    positions = tutor_info.index.get_indexer(aggregates['tutor_id'])
+    known = positions >= 0
+    months = np.where(known, tutor_info['months_experience'].to_numpy(dtype=float)[np.maximum(positions, 0)],
+                      np.nan)
+    certification = pd.Series(tutor_info['certification_level'].to_numpy(dtype=object)[np.maximum(positions, 0)])
+    certification[~known] = None
+    codes = {
+        'experience_level': pd.cut(months, bins=EXPERIENCE_BINS, labels=EXPERIENCE_LEVELS).codes,
+        'region': np.zeros(len(aggregates), dtype=np.int8),
+        'certification_level': pd.Categorical(certification, categories=CERTIFICATION_LEVELS).codes,
+    }
+
+    columns = [pd.Series(aggregates[column]).to_numpy(dtype=float, na_value=np.nan)
+               for column in AGGREGATE_FEATURES]
+    columns.append(months)
+    for column, levels in CATEGORY_LEVELS.items():
+        columns.extend((codes[column] == code).astype(float) for code in list(range(1, len(levels))) + [-1])
+    return np.nan_to_num(np.column_stack(columns), nan=0.0)
+
+
+def churn_labels(aggregates: pd.DataFrame) -> np.ndarray:
+    """
+    Binary churn target from the heuristic churn signals
+
+    The signal count is kept when churn_probability is replaced by model scores, so
+    retraining on scored aggregates never learns from the model's own output.
+    """
+    return (aggregates['churn_signals_detected'].to_numpy(dtype=float) >= CHURN_SIGNAL_THRESHOLD).astype(int)
+
+
+def risk_levels(churn_probability: np.ndarray) -> np.ndarray:
+    """Churn risk level per probability (see RISK_THRESHOLDS)"""
+    return np.select([churn_probability >= threshold for threshold, _ in RISK_THRESHOLDS],
+                     [level for _, level in RISK_THRESHOLDS], 'Low')
+
+
+def signal_probability(signals: np.ndarray) -> np.ndarray:
+    """Heuristic churn probability of churn signal counts, before noise"""
+    return np.minimum(signals * SIGNAL_PROBABILITY, MAX_SIGNAL_PROBABILITY)
+
+
+def heuristic_quantiles(signals: np.ndarray, levels: np.ndarray) -> np.ndarray:
+    """
+    Quantiles of the heuristic churn probability of tutors with these signal counts
+
+    Each tutor's heuristic probability is uniform on [signal_probability, + SIGNAL_NOISE),
+    so the distribution is a mixture of uniforms whose CDF is linear between the ends of
+    their ranges; the quantiles are exact, with no noise drawn.
+    """
+    base = signal_probability(np.asarray(signals, dtype=float))
+    ends = np.unique(np.concatenate([base, base + SIGNAL_NOISE]))
+    cdf = np.clip((ends[:, None] - base[None, :]) / SIGNAL_NOISE, 0, 1).mean(axis=1)
+    return np.interp(levels, cdf, ends)
+
+
+def fit_probability_map(churn_probability: np.ndarray, signals: np.ndarray) -> Dict[str, List[float]]:
+    """
+    Monotone map from a model's scores onto the heuristic's probability scale
+
+    The model predicts the rare churned label, so its scores sit far below the
+    heuristic's. Matching quantiles of the model scores to quantiles of the heuristic
+    probability of the same tutors keeps the model's ranking while giving scores the
+    scale that RISK_THRESHOLDS and the app's alert rules expect. Tied scores share the
+    mean of their heuristic quantiles.
+
+    Returns:
+        {'model': score knots (increasing), 'heuristic': mapped values}, for map_probability
+    """
+    levels = np.linspace(0, 1, PROBABILITY_MAP_KNOTS)
+    knots, inverse = np.unique(np.quantile(np.asarray(churn_probability, dtype=float), levels),
+                               return_inverse=True)
+    targets = np.bincount(inverse, weights=heuristic_quantiles(signals, levels)) / np.bincount(inverse)
+    return {'model': knots.tolist(), 'heuristic': targets.tolist()}
+
+
+def map_probability(churn_probability: np.ndarray, probability_map: Dict[str, List[float]]) -> np.ndarray:
+    """Model scores on the heuristic's probability scale (see fit_probability_map)"""
+    return np.interp(churn_probability, probability_map['model'], probability_map['heuristic'])
+
+
+def test_mask(tutor_ids) -> np.ndarray:
+    """Hold-out rows (about TEST_FRACTION), decided per tutor ID so any chunking splits alike"""
+    hashed = (np.asarray(tutor_ids, dtype=np.uint64) * np.uint64(0x9E3779B97F4A7C15)) >> np.uint64(40)
+    return hashed < np.uint64(TEST_FRACTION * (1 << 24))
+
+
+def iter_training_chunks(aggregates: AggregateSource, tutor_info: pd.DataFrame,
+                         chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Yield (tutor_ids, features, labels) per chunk of tutor_aggregates rows
+
+    Args:
+        aggregates: tutor_aggregates frame, or the path of a tutor_aggregates file
+            (read chunk by chunk)
+        tutor_info: tutor_features() of the tutors
+        chunk_rows: Rows per chunk
+    """
+    for chunk in aggregate_chunks(aggregates, chunk_rows):
+        yield chunk['tutor_id'].to_numpy(), churn_features(chunk, tutor_info), churn_labels(chunk)
+
+
+def aggregate_chunks(aggregates: AggregateSource, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """tutor_aggregates rows of a frame or file, chunk_rows at a time"""
+    if isinstance(aggregates, str):
+        from data_io import iter_frame
+        return iter_frame(aggregates, chunk_rows, table='tutor_aggregates')
+    return (aggregates.iloc[start:start + chunk_rows] for start in range(0, len(aggregates), chunk_rows))
+
+
+def calibrate_probability(pipeline, aggregates: AggregateSource, tutor_info: pd.DataFrame,
+                          chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Dict[str, List[float]]:
+    """fit_probability_map() of a fitted pipeline over all tutor_aggregates rows, one chunk at a time"""
+    probability, signals = [], []
+    for chunk in aggregate_chunks(aggregates, chunk_rows):
+        probability.append(pipeline.predict_proba(churn_features(chunk, tutor_info))[:, 1])
+        signals.append(chunk['churn_signals_detected'].to_numpy(dtype=float))
+    return fit_probability_map(np.concatenate(probability), np.concatenate(signals))
+
+
+def data_fingerprint(chunks: Iterable[Tuple[np.ndarray, np.ndarray, np.ndarray]],
+                     params: Dict) -> Tuple[str, Dict[str, int]]:
+    """
+    SHA-256 of the training rows and parameters, independent of how rows are chunked
+
+    Returns:
+        (fingerprint, row counts: rows, positives, train rows, train positives)
+    """
+    digest = hashlib.sha256(json.dumps({'version': MODEL_VERSION, 'features': FEATURES, **params},
+                                       sort_keys=True).encode())
+    counts = {'rows': 0, 'positives': 0, 'train_rows': 0, 'train_positives': 0}
+    for tutor_ids, X, y in chunks:
+        for values in (np.asarray(tutor_ids, dtype=np.int64), np.ascontiguousarray(X), y.astype(np.int8)):
+            digest.update(values.tobytes())
+        train = ~test_mask(tutor_ids)
+        counts['rows'] += len(y)
+        counts['positives'] += int(y.sum())
+        counts['train_rows'] += int(train.sum())
+        counts['train_positives'] += int(y[train].sum())
+    return digest.hexdigest(), counts
+
+
+def train_incremental(chunks: Callable[[], Iterable[Tuple[np.ndarray, np.ndarray, np.ndarray]]],
+                      epochs: int = DEFAULT_EPOCHS, seed: int = 42):
+    """
+    Fit a StandardScaler + SGD logistic regression pipeline one chunk at a time
+
+    One pass fits the scaler's running mean and variance, then every epoch feeds the
+    shuffled training rows of each chunk to SGDClassifier.partial_fit. Memory is bounded
+    by the chunk size, not the number of rows.
+
+    Args:
+        chunks: Returns a fresh iterator of (tutor_ids, features, labels) chunks per pass
+        epochs: Passes over the training rows
+        seed: Seed for the learner and the in-chunk shuffles
+
+    Returns:
+        (fitted Pipeline, hold-out labels, hold-out predictions)
+    """
+    from sklearn.linear_model import SGDClassifier
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    scaler = StandardScaler()
+    for tutor_ids, X, _ in chunks():
+        train = ~test_mask(tutor_ids)
+        if train.any():
+            scaler.partial_fit(X[train])
+
+    model = SGDClassifier(loss='log_loss', random_state=seed)
+    rng = np.random.default_rng(seed)
+    for _ in range(epochs):
+        for tutor_ids, X, y in chunks():
+            train = np.flatnonzero(~test_mask(tutor_ids))
+            if len(train):
+                order = rng.permutation(train)
+                model.partial_fit(scaler.transform(X[order]), y[order], classes=np.array([0, 1]))
+
+    pipeline = Pipeline([('scaler', scaler), ('model', model)])
+    y_test, y_pred = [], []
+    for tutor_ids, X, y in chunks():
+        test = test_mask(tutor_ids)
+        if test.any():
+            y_test.append(y[test])
+            y_pred.append(pipeline.predict(X[test]))
+    return (pipeline, np.concatenate(y_test) if y_test else np.zeros(0, dtype=int),
+            np.concatenate(y_pred) if y_pred else np.zeros(0, dtype=int))
+
+
+def artifact_path(model_dir: str, fingerprint: str) -> str:
+    return os.path.join(model_dir, f'churn_model_v{MODEL_VERSION}_{fingerprint[:16]}.joblib')
+
+
+def save_model(pipeline, model_dir: str, fingerprint: str, metadata: Dict) -> str:
+    """
+    Save a fitted pipeline as churn_model_v<version>_<fingerprint>.joblib and make it
+    the current model (MODEL_MANIFEST records its file, fingerprint and metadata)
+    """
+    import joblib
+    os.makedirs(model_dir, exist_ok=True)
+    path = artifact_path(model_dir, fingerprint)
+    joblib.dump(pipeline, path)
+    manifest = {'version': MODEL_VERSION, 'fingerprint': fingerprint, 'artifact': os.path.basename(path),
+                'features': FEATURES, 'saved_at': datetime.now().isoformat(timespec='seconds'), **metadata}
+    for manifest_path in (path[:-len('.joblib')] + '.json', os.path.join(model_dir, MODEL_MANIFEST)):
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+    return path
+
+
+def load_model(model_dir: str, fingerprint: Optional[str] = None) -> Optional[Tuple[object, Dict]]:
+    """
+    Load a saved pipeline and its manifest
+
+    Args:
+        model_dir: Directory of saved models
+        fingerprint: Training data fingerprint to load (default: the current model)
+
+    Returns:
+        (pipeline, manifest), or None if there is no such model of this MODEL_VERSION
+    """
+    import joblib
+    if fingerprint is None:
+        manifest_path = os.path.join(model_dir, MODEL_MANIFEST)
+    else:
+        manifest_path = artifact_path(model_dir, fingerprint)[:-len('.joblib')] + '.json'
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    path = os.path.join(model_dir, manifest['artifact'])
+    if manifest.get('version') != MODEL_VERSION or manifest.get('features') != FEATURES or not os.path.exists(path):
+        return None
+    return joblib.load(path), manifest
+
+
+def format_probability_map(probability_map: Dict[str, List[float]]) -> str:
+    model, heuristic = probability_map['model'], probability_map['heuristic']
+    return f"model {model[0]:.3g}–{model[-1]:.3g} → {heuristic[0]:.3f}–{heuristic[-1]:.3f}"
+
+
+def model_coefficients(pipeline) -> np.ndarray:
+    """Coefficients on the scaled features (the feature importances)"""
+    return pipeline.named_steps['model'].coef_[0]
+
+
+def score_chunk(pipeline, aggregates: pd.DataFrame, tutor_info: pd.DataFrame,
+                probability_map: Dict[str, List[float]]) -> pd.DataFrame:
+    """
+    Replace churn_probability and churn_risk_level of tutor_aggregates rows with model
+    scores, mapped onto the heuristic's scale by the model's manifest probability_map
+    """
+    probability = map_probability(pipeline.predict_proba(churn_features(aggregates, tutor_info))[:, 1],
+                                  probability_map)
+    scored = aggregates.copy()
+    scored['churn_probability'] = np.round(probability, 3)
+    scored['churn_risk_level'] = risk_levels(scored['churn_probability'].to_numpy())
+    return apply_schema(scored, 'tutor_aggregates')
+
+
+def score_churn(aggregates: pd.DataFrame, tutors_df: pd.DataFrame, model_dir: str, fingerprint: Optional[str],
+                chunk_rows: int = DEFAULT_SCORE_ROWS) -> pd.DataFrame:
+    """
+    Score every tutor with the saved churn model of a training data fingerprint,
+    chunk_rows rows per predict call
+
+    Only the model trained (or reused) for this dataset is used, never whichever model is
+    current in model_dir; with no fingerprint, or no saved model of this MODEL_VERSION for
+    it, the heuristic scores from calculate_tutor_aggregates are kept. The artifact and
+    fingerprint used (or None) are recorded in attrs['churn_model'] and
+    attrs['churn_model_fingerprint'].
+    """
+    saved = load_model(model_dir, fingerprint) if fingerprint else None
+    if saved is None:
+        scored = aggregates.copy()
+        scored.attrs.update(churn_model=None, churn_model_fingerprint=None)
+        return scored
+    pipeline, manifest = saved
+    tutor_info = tutor_features(tutors_df)
+    scored = pd.concat([score_chunk(pipeline, aggregates.iloc[start:start + chunk_rows], tutor_info,
+                                    manifest['probability_map'])
+                        for start in range(0, len(aggregates), chunk_rows)] or [aggregates.copy()])
+    scored.attrs.update(churn_model=manifest['artifact'], churn_model_fingerprint=manifest['fingerprint'])
+    return scored
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    from sklearn.metrics import classification_report
+    from data_io import OUTPUT_FORMATS, FrameWriter, format_from_path, iter_frame, read_frame
+    from schema import id_widths
+
+    parser = argparse.ArgumentParser(description='Train the churn model out of core, or score tutors with it, '
+                                                 'from generated files')
+    parser.add_argument('--data-dir', type=str, default='data',
+                       help='Directory with tutor_profiles and tutor_aggregates (default: data)')
+    parser.add_argument('--model-dir', type=str, default=None,
+                       help='Directory for model artifacts (default: <data-dir>/models)')
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS,
+                       help=f'Aggregate rows per training or scoring chunk (default: {DEFAULT_CHUNK_ROWS})')
+    parser.add_argument('--epochs', type=int, default=DEFAULT_EPOCHS,
+                       help=f'Passes over the training rows (default: {DEFAULT_EPOCHS})')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+    parser.add_argument('--retrain', action='store_true',
+                       help='Train even if a model for the same data is saved')
+    parser.add_argument('--score', action='store_true',
+                       help='Instead of training, rewrite churn_probability/churn_risk_level in tutor_aggregates '
+                            'with the current saved model, chunk by chunk')
+
+    args = parser.parse_args()
+    model_dir = args.model_dir or os.path.join(args.data_dir, 'models')
+
+    def find(name: str) -> str:
+        for extension in OUTPUT_FORMATS.values():
+            path = os.path.join(args.data_dir, name + extension)
+            if os.path.exists(path):
+                return path
+        parser.error(f'{name} not found in {args.data_dir}')
+
+    start_time = time.time()
+    tutors = read_frame(find('tutor_profiles'), table='tutor_profiles')
+    tutor_info = tutor_features(tutors)
+    aggregates_path = find('tutor_aggregates')
+
+    if args.score:
+        saved = load_model(model_dir)
+        if saved is None:
+            parser.error(f'No churn model of version {MODEL_VERSION} in {model_dir}; train one first')
+        pipeline, manifest = saved
+        print(f"\n🎯 Scoring {aggregates_path} with {manifest['artifact']}...")
+        # Written next to the input and swapped in at the end, so a failed run leaves it intact
+        fmt = format_from_path(aggregates_path)
+        temporary = aggregates_path + '.scoring'
+        rows = 0
+        with FrameWriter(temporary, fmt=fmt, id_widths=id_widths(tutors)) as writer:
+            for chunk in iter_frame(aggregates_path, args.chunk_rows, table='tutor_aggregates'):
+                writer.write(score_chunk(pipeline, chunk, tutor_info, manifest['probability_map']))
+                rows += len(chunk)
+        os.replace(temporary, aggregates_path)
+        print(f"   ✓ Scored {rows:,} tutors")
+    else:
+        chunks = lambda: iter_training_chunks(aggregates_path, tutor_info, args.chunk_rows)
+        params = {'training': 'incremental', 'epochs': args.epochs, 'chunk_rows': args.chunk_rows, 'seed': args.seed}
+
+        print("\n🔑 Fingerprinting training data...")
+        fingerprint, counts = data_fingerprint(chunks(), params)
+        print(f"   ✓ {counts['rows']:,} rows ({counts['positives']:,} churned), fingerprint {fingerprint[:16]}")
+
+        saved = None if args.retrain else load_model(model_dir, fingerprint)
+        if saved is not None:
+            print(f"\n♻️  Data unchanged; reusing {os.path.join(model_dir, saved[1]['artifact'])}")
+        elif counts['train_positives'] in (0, counts['train_rows']):
+            print("⚠️  All training rows have the same churn status. Skipping model training.")
+        else:
+            print(f"\n🤖 Training churn model ({args.epochs} epochs over {args.chunk_rows:,}-row chunks)...")
+            pipeline, y_test, y_pred = train_incremental(chunks, epochs=args.epochs, seed=args.seed)
+            report = classification_report(y_test, y_pred, zero_division=0)
+            print(report)
+            probability_map = calibrate_probability(pipeline, aggregates_path, tutor_info, args.chunk_rows)
+            print(f"   Probability map: {format_probability_map(probability_map)}")
+            path = save_model(pipeline, model_dir, fingerprint,
+                              {**params, **counts, 'report': report, 'probability_map': probability_map})
+            print(f"   ✓ Saved {path}")
+    print(f"\n⏱️  Total time: {time.time() - start_time:.2f}s")
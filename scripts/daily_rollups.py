@@ -0,0 +1,144 @@
+"""
+Daily Rollups
+Session counts and metric sums per (tutor, day). Tutor window aggregates are totals over
+these buckets, so a new day or late sessions only add to their own buckets and the
+aggregates refresh in O(tutors x days) instead of rescanning every session
+"""
+
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from schema import FLOAT32_DECIMALS, ROLLUP_COUNTS, ROLLUP_METRICS, apply_schema, float_values
+from session_index import SessionIndex
+
+
+DAY_US = 86400 * 1_000_000
+
+# tutor_daily_rollups columns: the (tutor, day) key, counts, then <metric>_sum and
+# <metric>_count (completed sessions with the metric set) per metric
+SUM_COLUMNS = [f'{metric}_sum' for metric in ROLLUP_METRICS]
+COUNT_COLUMNS = ROLLUP_COUNTS + [f'{metric}_count' for metric in ROLLUP_METRICS]
+ROLLUP_COLUMNS = ['tutor_id', 'day'] + ROLLUP_COUNTS + [column for metric in ROLLUP_METRICS
+                                                        for column in (f'{metric}_sum', f'{metric}_count')]
+
+
+def _flags(values) -> np.ndarray:
+    """True/False per value, with missing values False"""
+    return pd.Series(values).eq(True).to_numpy(dtype=bool, na_value=False)
+
+
+def _round_sums(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Round metric sums to their column's decimals
+
+    Sums of values with d decimals are exact at d decimals, so rounding drops the float
+    error of adding buckets up and keeps totals independent of the order buckets merge in.
+    """
+    for metric, column in ROLLUP_METRICS.items():
+        df[f'{metric}_sum'] = np.round(df[f'{metric}_sum'].to_numpy(dtype=float), FLOAT32_DECIMALS.get(column, 0))
+    return df
+
+
+def empty_rollups() -> pd.DataFrame:
+    """A tutor_daily_rollups frame without buckets"""
+    df = pd.DataFrame({column: np.zeros(0, dtype=float) for column in ROLLUP_COLUMNS})
+    df['day'] = np.zeros(0, dtype='datetime64[us]')
+    return apply_schema(df, 'tutor_daily_rollups')
+
+
+def daily_rollups(sessions_df: pd.DataFrame, tutor_ids: Optional[Iterable] = None,
+                  session_index: Optional[SessionIndex] = None) -> pd.DataFrame:
+    """
+    Roll sessions up into one row per (tutor, day) with sessions
+
+    Args:
+        sessions_df: Session data
+        tutor_ids: Tutors to roll up, in output order (default: tutors in session order)
+        session_index: Index of sessions_df to reuse (rebuilt if it covers other tutors)
+
+    Returns:
+        tutor_daily_rollups frame sorted by tutor, then day
+    """
+    if session_index is None or (tutor_ids is not None and not session_index.matches(tutor_ids)):
+        session_index = SessionIndex(sessions_df, tutor_ids)
+    if not len(session_index):
+        return empty_rollups()
+
+    # Sessions are sorted by tutor, then time, so each (tutor, day) bucket is one run
+    codes = session_index.codes
+    days = session_index.times // DAY_US
+    starts = np.flatnonzero(np.r_[True, (codes[1:] != codes[:-1]) | (days[1:] != days[:-1])])
+
+    def bucket_sum(values: np.ndarray) -> np.ndarray:
+        return np.add.reduceat(values, starts)
+
+    completed = _flags(session_index.column('session_completed'))
+    first = completed & _flags(session_index.column('is_first_session'))
+    rollups = {
+        'tutor_id': session_index.tutor_ids[codes[starts]],
+        'day': (days[starts] * DAY_US).astype('datetime64[us]'),
+        'sessions': np.diff(np.r_[starts, len(codes)]),
+        'completed_sessions': bucket_sum(completed.astype(np.int64)),
+        'first_sessions': bucket_sum(first.astype(np.int64)),
+    }
+    for metric, column in ROLLUP_METRICS.items():
+        values = float_values(session_index.column(column), column)
+        valid = (first if metric == 'first_session_rating' else completed) & ~np.isnan(values)
+        rollups[f'{metric}_sum'] = bucket_sum(np.where(valid, values, 0.0))
+        rollups[f'{metric}_count'] = bucket_sum(valid.astype(np.int64))
+    return apply_schema(_round_sums(pd.DataFrame(rollups)[ROLLUP_COLUMNS]), 'tutor_daily_rollups')
+
+
+def merge_rollups(*rollups: pd.DataFrame) -> pd.DataFrame:
+    """
+    Combine rollups, adding up buckets of the same (tutor, day)
+
+    Rolling up only new sessions (a new day, or late sessions for days already rolled
+    up) and merging them in updates just the buckets they fall in.
+    """
+    frames = [apply_schema(df, 'tutor_daily_rollups') for df in rollups if len(df)]
+    if not frames:
+        return empty_rollups()
+    if len(frames) == 1:
+        return frames[0]
+    merged = pd.concat(frames, ignore_index=True).groupby(['tutor_id', 'day'], sort=True).sum().reset_index()
+    return apply_schema(_round_sums(merged[ROLLUP_COLUMNS]), 'tutor_daily_rollups')
+
+
+def window_totals(rollups: pd.DataFrame, tutor_ids: Iterable, days: Optional[int] = None,
+                  end_day=None) -> pd.DataFrame:
+    """
+    Per-tutor totals of the rollup counts and sums over a window of days
+
+    Args:
+        rollups: tutor_daily_rollups frame
+        tutor_ids: Tutors to total, in output order (tutors without buckets get zeros)
+        days: Window length in calendar days, ending with end_day (default: every day)
+        end_day: Last day of the window (default: the latest day in rollups)
+
+    Returns:
+        Frame of COUNT_COLUMNS and SUM_COLUMNS indexed by tutor_id
+    """
+    tutor_ids = pd.Index(tutor_ids, name='tutor_id')
+    codes = tutor_ids.get_indexer(rollups['tutor_id'])
+    keep = codes >= 0
+    if days is not None and len(rollups):
+        day = rollups['day'].to_numpy(dtype='datetime64[us]')
+        end = day.max() if end_day is None else np.datetime64(pd.Timestamp(end_day).normalize(), 'us')
+        keep &= (day > end - np.timedelta64(days, 'D')) & (day <= end)
+
+    totals = pd.DataFrame(index=tutor_ids)
+    for column in COUNT_COLUMNS + SUM_COLUMNS:
+        totals[column] = np.bincount(codes[keep], weights=rollups[column].to_numpy(dtype=float)[keep],
+                                     minlength=len(tutor_ids))
+    totals[COUNT_COLUMNS] = totals[COUNT_COLUMNS].astype(np.int64)
+    return _round_sums(totals)
+
+
+def window_mean(totals: pd.DataFrame, metric: str) -> np.ndarray:
+    """Mean of a rollup metric from window_totals, NaN where no sessions had it set"""
+    counts = totals[f'{metric}_count'].to_numpy()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, totals[f'{metric}_sum'].to_numpy() / counts, np.nan)
@@ -0,0 +1,272 @@
+"""
+Data I/O
+Pluggable output backends (CSV, Parquet, Arrow IPC) shared by all generators
+"""
+
+import pandas as pd
+from typing import Dict, Iterator, Optional
+import os
+
+from schema import apply_schema, format_frame_ids
+
+
+# Output format -> file extension
+OUTPUT_FORMATS = {
+    'csv': '.csv',
+    'parquet': '.parquet',
+    'arrow': '.arrow'
+}
+
+
+def _require_pyarrow():
+    """Import pyarrow lazily so CSV output works without it"""
+    try:
+        import pyarrow
+        return pyarrow
+    except ImportError as e:
+        raise ImportError(
+            "Parquet/Arrow output requires pyarrow. Install it with: pip install pyarrow"
+        ) from e
+
+
+def format_from_path(path: str) -> str:
+    """Infer the output format from a file extension (defaults to CSV)"""
+    extension = os.path.splitext(path)[1].lower()
+    for fmt, fmt_extension in OUTPUT_FORMATS.items():
+        if extension == fmt_extension:
+            return fmt
+    if extension == '.feather':
+        return 'arrow'
+    return 'csv'
+
+
+def output_path(output_dir: str, name: str, fmt: str = 'csv') -> str:
+    """Build the path for a named dataset, e.g. ('data', 'sessions', 'parquet') -> data/sessions.parquet"""
+    return os.path.join(output_dir, name + OUTPUT_FORMATS[fmt])
+
+
+def with_format(path: str, fmt: Optional[str]) -> str:
+    """Swap a path's extension for the given format (no-op when fmt is None)"""
+    if fmt is None:
+        return path
+    return os.path.splitext(path)[0] + OUTPUT_FORMATS[fmt]
+
+
+def to_typed_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert object columns to typed columns for columnar output
+
+    Object columns holding booleans/numbers/datetimes with None become nullable
+    boolean, Int64, Float64 or datetime64 columns; string columns are left as is.
+    """
+    typed = {}
+    for column in df.columns:
+        values = df[column]
+        if values.dtype == object:
+            inferred = pd.api.types.infer_dtype(values, skipna=True)
+            if inferred == 'boolean':
+                values = values.astype('boolean')
+            elif inferred == 'integer':
+                values = values.astype('Int64')
+            elif inferred in ('floating', 'mixed-integer-float'):
+                values = values.astype('Float64')
+            elif inferred in ('datetime', 'datetime64', 'date'):
+                values = pd.to_datetime(values)
+        typed[column] = values
+    return pd.DataFrame(typed, index=df.index)
+
+
+def write_frame(df: pd.DataFrame, path: str, fmt: Optional[str] = None,
+                id_widths: Optional[Dict[str, int]] = None) -> str:
+    """
+    Write a DataFrame in the given format (inferred from the extension when omitted)
+
+    Integer key columns (tutor_id, session_id, ...) are written as their string IDs.
+
+    Args:
+        id_widths: Key column -> digits, so IDs line up across files (e.g. tutor_id
+            padded for the full tutor count); other key columns fit their largest key
+
+    Returns:
+        The path written
+    """
+    fmt = fmt or format_from_path(path)
+    df = format_frame_ids(df, id_widths)
+    if fmt == 'csv':
+        df.to_csv(path, index=False)
+    elif fmt == 'parquet':
+        _require_pyarrow()
+        to_typed_frame(df).to_parquet(path, index=False)
+    elif fmt == 'arrow':
+        _require_pyarrow()
+        to_typed_frame(df).reset_index(drop=True).to_feather(path)
+    else:
+        raise ValueError(f"Unknown output format: {fmt}")
+    return path
+
+
+def _match_csv_datetimes(df: pd.DataFrame, path: str) -> Optional[pd.DataFrame]:
+    """
+    Format datetime columns like the first row of an existing CSV file
+
+    pandas picks one layout per column from the values written: fractional seconds
+    only if some value has them, and dates only if every value is midnight. Rows
+    appended later could otherwise switch layout mid-file.
+
+    Returns:
+        df with those columns as strings, or None if the new values do not fit the
+        file's layout (times after date-only values), so the file must be rewritten
+    """
+    columns = [column for column in df.columns if pd.api.types.is_datetime64_any_dtype(df[column])]
+    if not columns:
+        return df
+    first_row = pd.read_csv(path, nrows=1, usecols=columns, dtype=str, keep_default_na=False)
+    df = df.copy(deep=False)
+    for column in columns:
+        written = str(first_row[column].iloc[0]) if len(first_row) else ''
+        if written and ' ' not in written and 'T' not in written:
+            values = df[column].dropna()
+            if (values != values.dt.normalize()).any():
+                return None
+            layout = '%Y-%m-%d'
+        elif '.' in written:
+            layout = '%Y-%m-%d %H:%M:%S.%f'
+        else:
+            layout = '%Y-%m-%d %H:%M:%S'
+        df[column] = df[column].dt.strftime(layout)
+    return df
+
+
+def append_frame(df: pd.DataFrame, path: str, table: Optional[str] = None, fmt: Optional[str] = None,
+                 id_widths: Optional[Dict[str, int]] = None, rewrite: bool = False) -> str:
+    """
+    Add rows to a dataset written by write_frame (or write it if it does not exist yet)
+
+    CSV files are appended in place. Parquet/Arrow files, and any file with rewrite=True
+    (e.g. when ID widths grow), are read back, extended and rewritten.
+
+    Args:
+        df: Rows to add, with the same columns as the file
+        path: Existing file
+        table: Schema name used to read the file back when it is rewritten
+        id_widths: Key column -> digits, as for write_frame
+
+    Returns:
+        The path written
+    """
+    fmt = fmt or format_from_path(path)
+    if not os.path.exists(path):
+        return write_frame(df, path, fmt, id_widths)
+    if fmt == 'csv' and not rewrite:
+        matched = _match_csv_datetimes(format_frame_ids(df, id_widths), path)
+        if matched is not None:
+            matched.to_csv(path, mode='a', header=False, index=False)
+            return path
+    existing = read_frame(path, table)
+    return write_frame(pd.concat([existing, df], ignore_index=True), path, fmt, id_widths)
+
+
+def read_frame(path: str, table: Optional[str] = None) -> pd.DataFrame:
+    """
+    Read a dataset written by write_frame, dispatching on the file extension
+
+    Args:
+        path: File to read
+        table: Schema name (e.g. 'sessions'); when given, columns are cast to the
+            compact dtypes in schema.SCHEMAS
+    """
+    fmt = format_from_path(path)
+    if fmt == 'parquet':
+        _require_pyarrow()
+        df = pd.read_parquet(path)
+    elif fmt == 'arrow':
+        _require_pyarrow()
+        df = pd.read_feather(path)
+    else:
+        df = pd.read_csv(path)
+    return apply_schema(df, table) if table else df
+
+
+def iter_frame(path: str, chunk_rows: int, table: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """
+    Read a dataset written by write_frame or FrameWriter in chunks of at most chunk_rows
+    rows, so files larger than memory can be scanned
+
+    Args:
+        path: File to read
+        chunk_rows: Maximum rows per chunk
+        table: Schema name to cast each chunk with (see read_frame)
+    """
+    fmt = format_from_path(path)
+    if fmt == 'csv':
+        chunks = pd.read_csv(path, chunksize=chunk_rows)
+    else:
+        _require_pyarrow()
+        import pyarrow as pa
+        if fmt == 'parquet':
+            import pyarrow.parquet as pq
+            batches = pq.ParquetFile(path).iter_batches(batch_size=chunk_rows)
+        else:
+            reader = pa.ipc.open_file(path)
+            batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+        chunks = (batch.slice(start, chunk_rows).to_pandas()
+                  for batch in batches for start in range(0, batch.num_rows, chunk_rows))
+    for chunk in chunks:
+        yield apply_schema(chunk, table) if table else chunk
+
+
+class FrameWriter:
+    """
+    Incremental writer that appends DataFrame chunks to a single output file
+
+    The first chunk fixes the columnar schema; later chunks are cast to it, so a
+    column that happens to be all-null in one chunk keeps its type. Pass id_widths
+    for key columns that grow across chunks, so every chunk pads them alike.
+    """
+
+    def __init__(self, path: str, fmt: Optional[str] = None, id_widths: Optional[Dict[str, int]] = None):
+        self.path = path
+        self.fmt = fmt or format_from_path(path)
+        self.id_widths = id_widths
+        self.rows_written = 0
+        self._started = False
+        self._writer = None
+        self._schema = None
+        if self.fmt != 'csv':
+            _require_pyarrow()
+
+    def write(self, df: pd.DataFrame) -> None:
+        """Append one chunk"""
+        df = format_frame_ids(df, self.id_widths)
+        if self.fmt == 'csv':
+            df.to_csv(self.path, mode='a' if self._started else 'w', header=not self._started, index=False)
+        else:
+            import pyarrow as pa
+            if self._schema is None:
+                table = pa.Table.from_pandas(to_typed_frame(df), preserve_index=False)
+                self._schema = table.schema
+                self._writer = self._open(table.schema)
+            else:
+                table = pa.Table.from_pandas(to_typed_frame(df), schema=self._schema, preserve_index=False)
+            self._writer.write_table(table)
+        self._started = True
+        self.rows_written += len(df)
+
+    def _open(self, schema):
+        import pyarrow as pa
+        if self.fmt == 'parquet':
+            import pyarrow.parquet as pq
+            return pq.ParquetWriter(self.path, schema)
+        return pa.ipc.new_file(self.path, schema)
+
+    def close(self) -> None:
+        """Flush and close the underlying file"""
+        if self._writer is not None:
+            self._writer.close()
+        self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
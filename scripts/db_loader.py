@@ -0,0 +1,256 @@
+"""
+Database Loader
+Bulk-loads generated frames into the Postgres tables of prisma/schema.prisma with
+COPY FROM STDIN, in row batches, as a faster alternative to scripts/import-data.ts
+"""
+
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import os
+
+import numpy as np
+import pandas as pd
+
+from schema import format_frame_ids, id_widths
+
+
+# Rows serialized per COPY write; bounds the text buffered at once
+DEFAULT_BATCH_ROWS = 50_000
+
+# Dataset -> Postgres table, the dataset column (or columns) its text primary key is built
+# from, and the table columns filled from same-named dataset columns. Columns missing from
+# a frame are left to the table default (NULL for nullable ones).
+LOAD_TABLES = {
+    'tutor_profiles': {
+        'table': 'tutors',
+        'id': ['tutor_id'],
+        'columns': ['tutor_id', 'months_experience', 'total_sessions_completed', 'avg_historical_rating',
+                    'subjects_taught', 'primary_subject', 'reschedule_rate', 'no_show_count',
+                    'reliability_score', 'certification_level', 'active_status', 'last_login'],
+        # Prisma @updatedAt columns have no database default
+        'updated_at': 'updatedAt',
+    },
+    'sessions': {
+        'table': 'sessions',
+        'id': ['session_id'],
+        'columns': ['session_id', 'tutor_id', 'session_datetime', 'scheduled_duration_min', 'actual_duration_min',
+                    'subject', 'grade_level', 'is_first_session', 'session_completed', 'student_showed',
+                    'tutor_showed', 'connection_quality', 'had_technical_issues', 'student_attention_pct',
+                    'tutor_camera_on_pct', 'tutor_speak_ratio', 'screen_share_pct', 'overall_sentiment',
+                    'student_sentiment', 'tutor_sentiment', 'empathy_score', 'clarity_score', 'engagement_score',
+                    'student_rating', 'student_satisfaction', 'would_recommend'],
+    },
+    'tutor_aggregates': {
+        'table': 'tutor_aggregates',
+        'id': ['tutor_id'],
+        'columns': ['tutor_id', 'total_sessions_30d', 'total_sessions_7d', 'avg_rating_30d', 'avg_rating_7d',
+                    'avg_engagement_score', 'avg_empathy_score', 'avg_clarity_score', 'avg_student_satisfaction',
+                    'first_session_count', 'first_session_avg_rating', 'poor_first_session_flag',
+                    'recommendation_rate', 'technical_issue_rate', 'sentiment_trend_7d', 'churn_probability',
+                    'churn_risk_level', 'churn_signals_detected'],
+    },
+    'experiments': {
+        'table': 'experiments',
+        'id': ['experiment_id'],
+        'columns': ['name', 'hypothesis', 'description', 'variants', 'target_segment', 'primary_metric',
+                    'secondary_metrics', 'start_date', 'end_date', 'status', 'sample_size', 'significance',
+                    'winner', 'notes', 'created_at', 'updated_at'],
+        'updated_at': 'updated_at',
+    },
+    'experiment_assignments': {
+        'table': 'experiment_assignments',
+        'id': ['experiment_id', 'tutor_id'],
+        'columns': ['experiment_id', 'tutor_id', 'variant', 'assigned_at', 'exposed_at', 'converted_at',
+                    'conversion_value'],
+    },
+    'interventions': {
+        'table': 'interventions',
+        'id': ['intervention_id'],
+        'columns': ['tutor_id', 'intervention_type', 'channel', 'subject', 'content', 'template_id',
+                    'experiment_id', 'experiment_variant', 'sent_at', 'delivered_at', 'opened_at', 'clicked_at',
+                    'responded_at', 'response_type', 'response_notes', 'engagement_before', 'engagement_after',
+                    'sessions_before_count', 'sessions_after_count', 'status', 'error_message', 'created_at',
+                    'updated_at'],
+        'updated_at': 'updated_at',
+    },
+    'engagement_events': {
+        'table': 'engagement_events',
+        'id': ['event_id'],
+        'columns': ['tutor_id', 'event_type', 'event_data', 'timestamp'],
+    },
+}
+
+# Parents before children, so foreign keys hold at every step
+LOAD_ORDER = ['tutor_profiles', 'sessions', 'tutor_aggregates', 'experiments', 'experiment_assignments',
+              'interventions', 'engagement_events']
+
+
+def _require_psycopg():
+    """Import psycopg (3) lazily so generation works without it"""
+    try:
+        import psycopg
+        return psycopg
+    except ImportError as e:
+        raise ImportError(
+            "Loading into Postgres requires psycopg 3. Install it with: pip install 'psycopg[binary]'"
+        ) from e
+
+
+def connect(database_url: str):
+    """Open a psycopg connection (DATABASE_URL format; Prisma's ?schema= parameter is dropped)"""
+    psycopg = _require_psycopg()
+    parts = urlsplit(database_url)
+    query = urlencode([(key, value) for key, value in parse_qsl(parts.query) if key != 'schema'])
+    return psycopg.connect(urlunsplit(parts._replace(query=query)))
+
+
+def _quote(column: str) -> str:
+    return '"' + column.replace('"', '""') + '"'
+
+
+def load_columns(df: pd.DataFrame, dataset: str) -> List[str]:
+    """Table columns a COPY of df fills: id, the mapped columns present in df, then @updatedAt if missing"""
+    spec = LOAD_TABLES[dataset]
+    columns = ['id'] + [column for column in spec['columns'] if column in df.columns]
+    if spec.get('updated_at') and spec['updated_at'] not in df.columns:
+        columns.append(spec['updated_at'])
+    return columns
+
+
+def copy_batches(df: pd.DataFrame, dataset: str, batch_rows: int = DEFAULT_BATCH_ROWS,
+                 widths: Optional[Dict[str, int]] = None,
+                 loaded_at: Optional[datetime] = None) -> Iterator[str]:
+    """
+    COPY ... WITH (FORMAT csv) text for a frame, one string per batch of rows
+
+    Integer keys are formatted as their string IDs batch by batch, padded to the same
+    widths as the files written by write_frame. Empty strings load as NULL, as in
+    import-data.ts.
+
+    Args:
+        df: Generated frame for the dataset
+        dataset: Name in LOAD_TABLES
+        batch_rows: Rows per batch
+        widths: Key column -> digits (default: fit the frame's largest keys)
+        loaded_at: Value for the table's @updatedAt column where the frame has none
+    """
+    spec = LOAD_TABLES[dataset]
+    columns = [column for column in spec['columns'] if column in df.columns]
+    widths = {**id_widths(df), **(widths or {})}
+    loaded_at = loaded_at or datetime.now()
+    for start in range(0, len(df), batch_rows):
+        batch = format_frame_ids(df.iloc[start:start + batch_rows], widths)
+        ids = batch[spec['id'][0]].astype(str).to_numpy()
+        for column in spec['id'][1:]:
+            ids = np.char.add(np.char.add(ids.astype(str), ':'), batch[column].astype(str).to_numpy())
+        rows = pd.DataFrame({'id': ids}, index=batch.index)
+        rows = pd.concat([rows, batch[columns]], axis=1)
+        if spec.get('updated_at') and spec['updated_at'] not in df.columns:
+            rows[spec['updated_at']] = loaded_at
+        yield rows.to_csv(index=False, header=False)
+
+
+def copy_frame(conn, df: pd.DataFrame, dataset: str, batch_rows: int = DEFAULT_BATCH_ROWS,
+               widths: Optional[Dict[str, int]] = None) -> int:
+    """
+    Stream a frame into its table with one COPY FROM STDIN (the caller commits)
+
+    Returns:
+        Rows copied
+    """
+    table = LOAD_TABLES[dataset]['table']
+    columns = ', '.join(_quote(column) for column in load_columns(df, dataset))
+    with conn.cursor() as cursor:
+        with cursor.copy(f'COPY {_quote(table)} ({columns}) FROM STDIN WITH (FORMAT csv)') as copy:
+            for text in copy_batches(df, dataset, batch_rows, widths):
+                copy.write(text)
+    return len(df)
+
+
+def load_frame(df: pd.DataFrame, dataset: str, database_url: str, batch_rows: int = DEFAULT_BATCH_ROWS,
+               widths: Optional[Dict[str, int]] = None) -> int:
+    """Copy one frame into its table in its own transaction"""
+    with connect(database_url) as conn:
+        rows = copy_frame(conn, df, dataset, batch_rows, widths)
+        conn.commit()
+    return rows
+
+
+def update_last_login(tutors: pd.DataFrame, database_url: str, widths: Optional[Dict[str, int]] = None) -> int:
+    """
+    Set tutors.last_login for tutors loaded before their logins were known
+
+    The values are copied into a temporary table and applied with one UPDATE.
+
+    Returns:
+        Tutors updated
+    """
+    frame = format_frame_ids(tutors[['tutor_id', 'last_login']], {**id_widths(tutors), **(widths or {})})
+    with connect(database_url) as conn:
+        with conn.cursor() as cursor:
+            cursor.execute('CREATE TEMP TABLE tutor_last_login (tutor_id TEXT, last_login TIMESTAMP(3)) '
+                           'ON COMMIT DROP')
+            with cursor.copy('COPY tutor_last_login (tutor_id, last_login) FROM STDIN WITH (FORMAT csv)') as copy:
+                copy.write(frame.to_csv(index=False, header=False))
+            cursor.execute('UPDATE tutors SET last_login = t.last_login, "updatedAt" = now() '
+                           'FROM tutor_last_login t WHERE tutors.tutor_id = t.tutor_id')
+            updated = cursor.rowcount
+        conn.commit()
+    return updated
+
+
+def clear_tables(database_url: str) -> None:
+    """
+    Empty the loaded tables
+
+    TRUNCATE ... CASCADE also empties tables that reference them (alerts, recommendations),
+    like the --clear option of import-data.ts.
+    """
+    tables = ', '.join(_quote(LOAD_TABLES[dataset]['table']) for dataset in LOAD_ORDER)
+    with connect(database_url) as conn:
+        conn.execute(f'TRUNCATE {tables} CASCADE')
+        conn.commit()
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    from data_io import OUTPUT_FORMATS, read_frame
+
+    parser = argparse.ArgumentParser(description='Load generated data into Postgres with COPY')
+    parser.add_argument('--data-dir', type=str, default='data',
+                       help='Directory with the generated files (default: data)')
+    parser.add_argument('--database-url', type=str, default=os.environ.get('DATABASE_URL'),
+                       help='Postgres connection URL (default: $DATABASE_URL)')
+    parser.add_argument('--clear', action='store_true',
+                       help='Empty the tables before loading')
+    parser.add_argument('--batch-rows', type=int, default=DEFAULT_BATCH_ROWS,
+                       help=f'Rows per COPY batch (default: {DEFAULT_BATCH_ROWS})')
+
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error('Pass --database-url or set DATABASE_URL')
+
+    start_time = time.time()
+    if args.clear:
+        print("🗑️  Clearing existing data...")
+        clear_tables(args.database_url)
+
+    # Tutor IDs are padded alike in every table
+    widths = None
+    for dataset in LOAD_ORDER:
+        path = next((os.path.join(args.data_dir, dataset + extension) for extension in OUTPUT_FORMATS.values()
+                     if os.path.exists(os.path.join(args.data_dir, dataset + extension))), None)
+        if path is None:
+            print(f"   ⚠️  {dataset} not found in {args.data_dir}, skipping")
+            continue
+        df = read_frame(path, table=dataset)
+        if dataset == 'tutor_profiles':
+            widths = {'tutor_id': id_widths(df).get('tutor_id', 4)}
+        print(f"\n📥 Loading {os.path.basename(path)} into {LOAD_TABLES[dataset]['table']}...")
+        table_start = time.time()
+        rows = load_frame(df, dataset, args.database_url, args.batch_rows, widths)
+        print(f"   ✓ Loaded {rows:,} rows in {time.time() - table_start:.2f}s")
+
+    print(f"\n⏱️  Total load time: {time.time() - start_time:.2f}s")
@@ -6,314 +6,391 @@ Generates realistic tutor engagement events with high correlation to session act
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import random
-import json
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 import os
 
+from schema import EVENT_TYPES, SCHEMAS, apply_schema, format_ids, id_width
+from session_index import SessionIndex
+
+
+MICROSECONDS = {
+    'minute': 60 * 1_000_000,
+    'hour': 3600 * 1_000_000,
+    'day': 86400 * 1_000_000
+}
+
+EVENT_COLUMNS = ['event_id', 'tutor_id', 'event_type', 'event_data', 'timestamp']
+
+
+def _concat(*parts) -> np.ndarray:
+    """Element-wise string concatenation of string scalars and arrays"""
+    result = np.asarray(parts[0], dtype=str)
+    for part in parts[1:]:
+        result = np.char.add(result, part)
+    return result
+
+
+def _json_string(values: np.ndarray) -> np.ndarray:
+    """Render a string array as JSON string literals"""
+    return _concat('"', values.astype(str), '"')
+
+
+def _json_nullable(values: np.ndarray, present: np.ndarray) -> np.ndarray:
+    """Render values as JSON, with null where present is False"""
+    return np.where(present, values, 'null')
+
+
+def _event_types(runs: List[Tuple[str, int]]) -> pd.Categorical:
+    """Categorical event_type column from (event type, count) runs"""
+    codes = np.concatenate([np.full(count, EVENT_TYPES.index(event_type), dtype=np.int8)
+                            for event_type, count in runs])
+    return pd.Categorical.from_codes(codes, dtype=SCHEMAS['engagement_events']['event_type'])
+
+
+def _isoformat(timestamps_us: np.ndarray) -> np.ndarray:
+    """ISO-8601 strings for int64 microsecond timestamps (like datetime.isoformat)"""
+    return np.datetime_as_string(timestamps_us.astype('datetime64[us]'), unit='us')
+
 
 class EngagementEventsGenerator:
-    def __init__(self, seed: int = 42):
-        np.random.seed(seed)
-        random.seed(seed)
+    def __init__(self, seed: Union[int, np.random.SeedSequence] = 42, as_of: Optional[datetime] = None):
+        self.rng = np.random.default_rng(seed)
+        self.as_of = as_of or datetime.now()
         
     def generate_events(self, tutors_df: pd.DataFrame, sessions_df: pd.DataFrame,
                        interventions_df: pd.DataFrame = None,
-                       n_days: int = 30) -> pd.DataFrame:
+                       n_days: int = 30,
+                       session_index: Optional[SessionIndex] = None,
+                       session_id_width: Optional[int] = None,
+                       first_event_number: int = 1) -> pd.DataFrame:
         """
         Generate engagement events with realistic patterns
         
+        Each event family is built as whole columns; logins and scheduling events are
+        correlated with sessions by binary search over per-tutor sorted session times.
+        
         Args:
             tutors_df: DataFrame with tutor profiles
             sessions_df: DataFrame with session data
             interventions_df: Optional DataFrame with interventions (for email events)
             n_days: Number of days to generate events for
+            session_index: Optional prebuilt SessionIndex over sessions_df for these tutors
+            session_id_width: Digits of the session IDs quoted in event data (default:
+                what the largest session key in sessions_df needs)
+            first_event_number: Key of the first event (to continue an existing dataset)
         
         Returns:
             DataFrame with engagement events
         """
-        events = []
-        start_date = datetime.now() - timedelta(days=n_days)
+        start_date = self.as_of - timedelta(days=n_days)
+        start_us = np.datetime64(start_date, 'us').astype(np.int64)
+        first_midnight_us = np.datetime64(start_date.replace(hour=0, minute=0), 'us').astype(np.int64)
         
-        # Group sessions by tutor and date
-        sessions_df['session_date'] = pd.to_datetime(sessions_df['session_datetime']).dt.date
-        sessions_df['session_datetime_parsed'] = pd.to_datetime(sessions_df['session_datetime'])
+        tutor_ids = pd.unique(tutors_df['tutor_id'])
+        tutor_info = tutors_df.drop_duplicates('tutor_id').set_index('tutor_id').loc[tutor_ids]
+        n_tutors = len(tutor_ids)
         
-        # Create tutor-specific patterns
-        tutor_patterns = {}
-        for _, tutor in tutors_df.iterrows():
-            tutor_id = tutor['tutor_id']
-            
-            # Determine tutor's preferred hours (morning vs evening)
-            is_morning_person = np.random.random() < 0.35  # 35% are morning people
-            preferred_hour_start = random.choice([8, 9, 10]) if is_morning_person else random.choice([16, 17, 18])
-            preferred_hour_end = preferred_hour_start + 4
-            
-            # Activity level (based on reliability - more reliable = more active)
-            activity_level = tutor['reliability_score'] * np.random.uniform(0.8, 1.2)
-            
-            tutor_patterns[tutor_id] = {
-                'preferred_hour_start': preferred_hour_start,
-                'preferred_hour_end': preferred_hour_end,
-                'is_morning_person': is_morning_person,
-                'activity_level': activity_level,
-                'coaching_sessions': tutor.get('coaching_sessions', 0) if 'coaching_sessions' in tutor else 0
-            }
+        # Sessions sorted by (tutor, datetime) with per-tutor offsets; the caller's frame is not modified
+        if session_index is None or not session_index.matches(tutor_ids):
+            session_index = SessionIndex(sessions_df, tutor_ids)
+        sorted_times = session_index.times
+        if session_id_width is None:
+            session_id_width = id_width('session_id', sessions_df['session_id'].max() if len(sessions_df) else 0)
+        sorted_session_ids = format_ids(session_index.column('session_id'), 'session_id', session_id_width)
+        offsets = session_index.offsets
         
-        # Generate events for each tutor
-        for tutor_id in tutors_df['tutor_id'].unique():
-            tutor_info = tutors_df[tutors_df['tutor_id'] == tutor_id].iloc[0]
-            pattern = tutor_patterns[tutor_id]
-            
-            # Get tutor's sessions
-            tutor_sessions = sessions_df[sessions_df['tutor_id'] == tutor_id].copy()
-            tutor_sessions = tutor_sessions.sort_values('session_datetime_parsed')
-            
-            # Generate login events (2-5 per week)
-            logins_per_week = int(np.random.uniform(2, 5))
-            total_logins = int(logins_per_week * (n_days / 7))
-            
-            # Generate login events
-            login_events = []
-            for _ in range(total_logins):
-                # Random day within the period
-                day_offset = random.randint(0, n_days - 1)
-                event_date = start_date + timedelta(days=day_offset)
-                
-                # Determine login time based on tutor pattern
-                if pattern['is_morning_person']:
-                    hour = random.choice([7, 8, 9, 10, 11])
-                else:
-                    hour = random.choice([17, 18, 19, 20, 21])
-                
-                login_time = event_date.replace(hour=hour, minute=random.randint(0, 59))
-                
-                # 60% correlation: login 1-4 hours before a session
-                correlated_session = None
-                if tutor_sessions.shape[0] > 0 and np.random.random() < 0.6:
-                    # Find sessions on the same day or next day
-                    same_day_sessions = tutor_sessions[
-                        (tutor_sessions['session_datetime_parsed'].dt.date == login_time.date()) |
-                        (tutor_sessions['session_datetime_parsed'].dt.date == (login_time.date() + timedelta(days=1)))
-                    ]
-                    
-                    if same_day_sessions.shape[0] > 0:
-                        session = same_day_sessions.iloc[0]
-                        session_time = session['session_datetime_parsed']
-                        
-                        # If session is later, adjust login to be 1-4 hours before
-                        if session_time > login_time:
-                            hours_before = random.uniform(1, 4)
-                            login_time = session_time - timedelta(hours=hours_before)
-                            correlated_session = session['session_id']
-                
-                login_events.append({
-                    'tutor_id': tutor_id,
-                    'event_type': 'login',
-                    'event_data': json.dumps({
-                        'ip_address': f"192.168.{random.randint(1,255)}.{random.randint(1,255)}",
-                        'device': random.choice(['desktop', 'mobile', 'tablet']),
-                        'correlated_session': correlated_session
-                    }),
-                    'timestamp': login_time
-                })
-            
-            # Generate session_scheduled events (30-60 min after login for upcoming sessions)
-            for login_event in login_events[:int(len(login_events) * 0.7)]:  # 70% of logins lead to scheduling
-                scheduled_time = login_event['timestamp'] + timedelta(minutes=random.randint(30, 60))
-                
-                # Find a session that makes sense
-                future_sessions = tutor_sessions[tutor_sessions['session_datetime_parsed'] > scheduled_time]
-                if future_sessions.shape[0] > 0:
-                    session = future_sessions.iloc[0]
-                    events.append({
-                        'tutor_id': tutor_id,
-                        'event_type': 'session_scheduled',
-                        'event_data': json.dumps({
-                            'session_id': session['session_id'],
-                            'scheduled_for': session['session_datetime_parsed'].isoformat()
-                        }),
-                        'timestamp': scheduled_time
-                    })
-            
-            # Generate session_completed events (immediately after session completion)
-            completed_sessions = tutor_sessions[tutor_sessions['session_completed'] == True]
-            for _, session in completed_sessions.iterrows():
-                completion_time = session['session_datetime_parsed'] + timedelta(
-                    minutes=int(session.get('actual_duration_min', 60))
-                )
-                
-                events.append({
-                    'tutor_id': tutor_id,
-                    'event_type': 'session_completed',
-                    'event_data': json.dumps({
-                        'session_id': session['session_id'],
-                        'duration_minutes': session.get('actual_duration_min', 60),
-                        'rating': float(session.get('student_rating', 0)) if pd.notna(session.get('student_rating')) else None
-                    }),
-                    'timestamp': completion_time
-                })
-            
-            # Add login events
-            events.extend(login_events)
-            
-            # Generate profile_updated events (1-2 per month)
-            profile_updates = int(np.random.uniform(1, 2) * (n_days / 30))
-            for _ in range(profile_updates):
-                day_offset = random.randint(0, n_days - 1)
-                update_time = start_date + timedelta(days=day_offset, hours=random.randint(10, 18))
-                
-                events.append({
-                    'tutor_id': tutor_id,
-                    'event_type': 'profile_updated',
-                    'event_data': json.dumps({
-                        'field': random.choice(['bio', 'availability', 'subjects', 'certification']),
-                        'previous_value': 'old_value',
-                        'new_value': 'new_value'
-                    }),
-                    'timestamp': update_time
-                })
-            
-            # Generate message_sent events (occasional communication)
-            messages_per_month = int(np.random.uniform(2, 5))
-            total_messages = int(messages_per_month * (n_days / 30))
-            for _ in range(total_messages):
-                day_offset = random.randint(0, n_days - 1)
-                message_time = start_date + timedelta(days=day_offset, hours=random.randint(9, 20))
-                
-                events.append({
-                    'tutor_id': tutor_id,
-                    'event_type': 'message_sent',
-                    'event_data': json.dumps({
-                        'recipient_type': random.choice(['student', 'admin', 'support']),
-                        'message_length': random.randint(50, 500)
-                    }),
-                    'timestamp': message_time
-                })
+        # Tutor-specific patterns: 35% are morning people
+        is_morning_person = self.rng.random(n_tutors) < 0.35
+        
+        families = []
+        
+        # Login events (2-5 per week)
+        logins_per_week = self.rng.uniform(2, 5, n_tutors).astype(int)
+        total_logins = (logins_per_week * (n_days / 7)).astype(int)
+        login_tutor = np.repeat(np.arange(n_tutors), total_logins)
+        n_logins = len(login_tutor)
+        
+        # Random day within the period, at an hour matching the tutor's pattern
+        login_day = self.rng.integers(0, n_days, n_logins)
+        login_hour = np.where(is_morning_person[login_tutor], 7, 17) + self.rng.integers(0, 5, n_logins)
+        login_time = (first_midnight_us + login_day * MICROSECONDS['day'] +
+                      login_hour * MICROSECONDS['hour'] +
+                      self.rng.integers(0, 60, n_logins) * MICROSECONDS['minute'])
+        
+        # 60% correlation: login 1-4 hours before the first session on the same or next day
+        login_midnight = login_time - login_time % MICROSECONDS['day']
+        segment_end = offsets[login_tutor + 1]
+        next_session = session_index.search(login_tutor, login_midnight, side='left')
+        has_session = next_session < segment_end
+        candidate_time = sorted_times[np.minimum(next_session, len(sorted_times) - 1)] if len(sorted_times) else login_time
+        correlated = (
+            (self.rng.random(n_logins) < 0.6) & has_session &
+            (candidate_time < login_midnight + 2 * MICROSECONDS['day']) &
+            (candidate_time > login_time)
+        )
+        hours_before = self.rng.uniform(1, 4, n_logins)
+        login_time = np.where(correlated,
+                              candidate_time - (hours_before * MICROSECONDS['hour']).astype(np.int64),
+                              login_time)
+        correlated_session = np.where(
+            correlated,
+            sorted_session_ids[np.minimum(next_session, len(sorted_session_ids) - 1)] if len(sorted_session_ids) else '',
+            ''
+        ).astype(str)
+        
+        families.append((login_tutor, 'login', _concat(
+            '{"ip_address": "192.168.', self.rng.integers(1, 256, n_logins).astype(str),
+            '.', self.rng.integers(1, 256, n_logins).astype(str),
+            '", "device": "', self.rng.choice(['desktop', 'mobile', 'tablet'], n_logins),
+            '", "correlated_session": ', _json_nullable(_json_string(correlated_session), correlated), '}'
+        ), login_time))
+        
+        # Session_scheduled events: 70% of logins lead to scheduling 30-60 min later
+        login_rank = np.arange(n_logins) - np.repeat(np.cumsum(total_logins) - total_logins, total_logins)
+        schedules = login_rank < (total_logins * 0.7).astype(int)[login_tutor]
+        schedule_tutor = login_tutor[schedules]
+        scheduled_time = login_time[schedules] + self.rng.integers(30, 61, schedules.sum()) * MICROSECONDS['minute']
+        
+        # Find the next session after the scheduling time
+        future_session = session_index.search(schedule_tutor, scheduled_time, side='right')
+        found = future_session < offsets[schedule_tutor + 1]
+        future_session = future_session[found]
+        families.append((schedule_tutor[found], 'session_scheduled', _concat(
+            '{"session_id": ', _json_string(sorted_session_ids[future_session]),
+            ', "scheduled_for": "', _isoformat(sorted_times[future_session]), '"}'
+        ), scheduled_time[found]))
+        
+        # Session_completed events (immediately after session completion)
+        completed = np.flatnonzero(session_index.column('session_completed') == True)
+        durations = session_index.numeric_column('actual_duration_min')[completed].astype(int)
+        ratings = session_index.numeric_column('student_rating')[completed]
+        families.append((session_index.codes[completed], 'session_completed', _concat(
+            '{"session_id": ', _json_string(sorted_session_ids[completed]),
+            ', "duration_minutes": ', durations.astype(str),
+            ', "rating": ', _json_nullable(ratings.astype(str), ~np.isnan(ratings)), '}'
+        ), sorted_times[completed] + durations * MICROSECONDS['minute']))
+        
+        # Profile_updated events (1-2 per month)
+        profile_updates = (self.rng.uniform(1, 2, n_tutors) * (n_days / 30)).astype(int)
+        update_tutor = np.repeat(np.arange(n_tutors), profile_updates)
+        n_updates = len(update_tutor)
+        families.append((update_tutor, 'profile_updated', _concat(
+            '{"field": "', self.rng.choice(['bio', 'availability', 'subjects', 'certification'], n_updates),
+            '", "previous_value": "old_value", "new_value": "new_value"}'
+        ), start_us + self.rng.integers(0, n_days, n_updates) * MICROSECONDS['day'] +
+           self.rng.integers(10, 19, n_updates) * MICROSECONDS['hour']))
+        
+        # Message_sent events (occasional communication)
+        messages_per_month = self.rng.uniform(2, 5, n_tutors).astype(int)
+        total_messages = (messages_per_month * (n_days / 30)).astype(int)
+        message_tutor = np.repeat(np.arange(n_tutors), total_messages)
+        n_messages = len(message_tutor)
+        families.append((message_tutor, 'message_sent', _concat(
+            '{"recipient_type": "', self.rng.choice(['student', 'admin', 'support'], n_messages),
+            '", "message_length": ', self.rng.integers(50, 501, n_messages).astype(str), '}'
+        ), start_us + self.rng.integers(0, n_days, n_messages) * MICROSECONDS['day'] +
+           self.rng.integers(9, 21, n_messages) * MICROSECONDS['hour']))
+        
+        # Coaching events (if tutor has coaching sessions), at most weekly
+        if 'coaching_sessions' in tutor_info.columns:
+            coaching_sessions = tutor_info['coaching_sessions'].fillna(0).values.astype(int)
+            coaching_count = np.clip(np.minimum(coaching_sessions, int(n_days / 7)), 0, None)
+            coaching_tutor = np.repeat(np.arange(n_tutors), coaching_count)
+            n_coaching = len(coaching_tutor)
             
-            # Generate coaching events (if tutor has coaching sessions)
-            if pattern['coaching_sessions'] > 0:
-                coaching_count = min(pattern['coaching_sessions'], int(n_days / 7))  # At most weekly
-                for i in range(coaching_count):
-                    # Schedule coaching 1-2 days before attendance
-                    day_offset = random.randint(0, n_days - 2)
-                    scheduled_time = start_date + timedelta(days=day_offset, hours=random.randint(10, 16))
-                    attended_time = scheduled_time + timedelta(days=random.randint(1, 2), hours=random.randint(10, 16))
-                    
-                    events.append({
-                        'tutor_id': tutor_id,
-                        'event_type': 'coaching_scheduled',
-                        'event_data': json.dumps({
-                            'scheduled_for': attended_time.isoformat()
-                        }),
-                        'timestamp': scheduled_time
-                    })
-                    
-                    events.append({
-                        'tutor_id': tutor_id,
-                        'event_type': 'coaching_attended',
-                        'event_data': json.dumps({
-                            'duration_minutes': random.randint(30, 60),
-                            'topic': random.choice(['engagement', 'quality', 'technical', 'support'])
-                        }),
-                        'timestamp': attended_time
-                    })
+            # Schedule coaching 1-2 days before attendance
+            coaching_scheduled = (start_us + self.rng.integers(0, max(n_days - 1, 1), n_coaching) * MICROSECONDS['day'] +
+                                  self.rng.integers(10, 17, n_coaching) * MICROSECONDS['hour'])
+            coaching_attended = (coaching_scheduled + self.rng.integers(1, 3, n_coaching) * MICROSECONDS['day'] +
+                                 self.rng.integers(10, 17, n_coaching) * MICROSECONDS['hour'])
+            families.append((coaching_tutor, 'coaching_scheduled', _concat(
+                '{"scheduled_for": "', _isoformat(coaching_attended), '"}'
+            ), coaching_scheduled))
+            families.append((coaching_tutor, 'coaching_attended', _concat(
+                '{"duration_minutes": ', self.rng.integers(30, 61, n_coaching).astype(str),
+                ', "topic": "', self.rng.choice(['engagement', 'quality', 'technical', 'support'], n_coaching), '"}'
+            ), coaching_attended))
+        
+        events_df = self._assemble(families, tutor_ids)
         
         # Generate email engagement events (if interventions provided)
         if interventions_df is not None and len(interventions_df) > 0:
-            for _, intervention in interventions_df.iterrows():
-                tutor_id = intervention['tutor_id']
-                sent_at = pd.to_datetime(intervention['sent_at'])
-                
-                if pd.notna(sent_at):
-                    # Email opened (70% of sent emails)
-                    if np.random.random() < 0.7:
-                        opened_at = sent_at + timedelta(hours=random.randint(1, 48))
-                        
-                        events.append({
-                            'tutor_id': tutor_id,
-                            'event_type': 'email_opened',
-                            'event_data': json.dumps({
-                                'intervention_id': intervention.get('intervention_id', ''),
-                                'intervention_type': intervention.get('intervention_type', ''),
-                                'email_provider': random.choice(['gmail', 'outlook', 'yahoo', 'other'])
-                            }),
-                            'timestamp': opened_at
-                        })
-                        
-                        # Email clicked (30-40% of opens)
-                        if np.random.random() < 0.35:
-                            clicked_at = opened_at + timedelta(minutes=random.randint(1, 30))
-                            
-                            events.append({
-                                'tutor_id': tutor_id,
-                                'event_type': 'email_clicked',
-                                'event_data': json.dumps({
-                                    'intervention_id': intervention.get('intervention_id', ''),
-                                    'link_clicked': random.choice(['dashboard', 'support', 'resources'])
-                                }),
-                                'timestamp': clicked_at
-                            })
-        
-        # Create DataFrame
-        events_df = pd.DataFrame(events)
+            email_events = self._email_events(interventions_df)
+            events_df = pd.concat([events_df, email_events], ignore_index=True)
         
         if len(events_df) > 0:
             # Sort by timestamp
-            events_df = events_df.sort_values('timestamp')
+            events_df = events_df.sort_values('timestamp', kind='stable', ignore_index=True)
             
             # Add event_id
-            events_df['event_id'] = [f'EV{i+1:06d}' for i in range(len(events_df))]
+            events_df['event_id'] = self._event_ids(first_event_number, len(events_df))
             
             # Reorder columns
-            events_df = events_df[['event_id', 'tutor_id', 'event_type', 'event_data', 'timestamp']]
+            events_df = events_df[EVENT_COLUMNS]
         
         return events_df
+    
+    def append_email_events(self, events_df: pd.DataFrame,
+                            interventions_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Add email_opened/email_clicked events for interventions to existing events
+        
+        Only the email events are generated; existing events keep their event_id and
+        relative order. New events are merged in by timestamp and numbered after the
+        highest existing event_id.
+        
+        Args:
+            events_df: Events from generate_events (without email events)
+            interventions_df: DataFrame with interventions
+        
+        Returns:
+            DataFrame with existing and email events, sorted by timestamp
+        """
+        if interventions_df is None or len(interventions_df) == 0:
+            return events_df
+        
+        email_events = self._email_events(interventions_df)
+        if len(email_events) == 0:
+            return events_df
+        
+        email_events = email_events.sort_values('timestamp', kind='stable', ignore_index=True)
+        existing = apply_schema(events_df[EVENT_COLUMNS], 'engagement_events').copy()
+        last_id = int(existing['event_id'].max()) if len(existing) > 0 else 0
+        email_events['event_id'] = self._event_ids(last_id + 1, len(email_events))
+        
+        # Stable merge: existing rows come first among equal timestamps and keep their order
+        existing['timestamp'] = pd.to_datetime(existing['timestamp'])
+        combined = pd.concat([existing, email_events[EVENT_COLUMNS]], ignore_index=True)
+        return combined.sort_values('timestamp', kind='stable', ignore_index=True)
+    
+    @staticmethod
+    def _event_ids(first: int, count: int) -> np.ndarray:
+        """Sequential integer event keys starting at first (written as EV000001, ...)"""
+        return np.arange(first, first + count, dtype=np.int64)
+    
+    @staticmethod
+    def _assemble(families: List[Tuple[np.ndarray, str, np.ndarray, np.ndarray]],
+                  tutor_ids: np.ndarray) -> pd.DataFrame:
+        """Stack (tutor index, event type, event data, timestamp) columns into one frame"""
+        tutor_index = np.concatenate([family[0] for family in families])
+        return pd.DataFrame({
+            'tutor_id': tutor_ids[tutor_index] if len(tutor_index) else np.array([], dtype=tutor_ids.dtype),
+            'event_type': _event_types([(family[1], len(family[0])) for family in families]),
+            'event_data': np.concatenate([family[2] for family in families]),
+            'timestamp': np.concatenate([family[3] for family in families]).astype('datetime64[us]')
+        })
+    
+    def _email_events(self, interventions_df: pd.DataFrame) -> pd.DataFrame:
+        """Email opened/clicked events for delivered interventions"""
+        sent = interventions_df[pd.to_datetime(interventions_df['sent_at']).notna().values]
+        sent_at = pd.to_datetime(sent['sent_at']).values.astype('datetime64[us]').astype(np.int64)
+        n_sent = len(sent)
+        if 'intervention_id' in sent and pd.api.types.is_integer_dtype(sent['intervention_id']):
+            # Quoted as written to interventions.csv
+            intervention_ids = format_ids(sent['intervention_id'].values, 'intervention_id',
+                                          id_width('intervention_id', interventions_df['intervention_id'].max()))
+        else:
+            intervention_ids = (sent['intervention_id'] if 'intervention_id' in sent else pd.Series('', index=sent.index))
+            intervention_ids = intervention_ids.fillna('').values.astype(str)
+        intervention_types = (sent['intervention_type'] if 'intervention_type' in sent else pd.Series('', index=sent.index))
+        intervention_types = intervention_types.fillna('').values.astype(str)
+        
+        # Email opened (70% of sent emails), clicked (30-40% of opens)
+        opened = self.rng.random(n_sent) < 0.7
+        opened_at = sent_at + self.rng.integers(1, 49, n_sent) * MICROSECONDS['hour']
+        clicked = opened & (self.rng.random(n_sent) < 0.35)
+        clicked_at = opened_at + self.rng.integers(1, 31, n_sent) * MICROSECONDS['minute']
+        
+        opened_data = _concat(
+            '{"intervention_id": ', _json_string(intervention_ids),
+            ', "intervention_type": ', _json_string(intervention_types),
+            ', "email_provider": "', self.rng.choice(['gmail', 'outlook', 'yahoo', 'other'], n_sent), '"}'
+        )
+        clicked_data = _concat(
+            '{"intervention_id": ', _json_string(intervention_ids),
+            ', "link_clicked": "', self.rng.choice(['dashboard', 'support', 'resources'], n_sent), '"}'
+        )
+        
+        # Interleave so each click directly follows its open
+        tutor_ids = sent['tutor_id'].values
+        email_events = pd.DataFrame({
+            'tutor_id': np.concatenate([tutor_ids[opened], tutor_ids[clicked]]),
+            'event_type': _event_types([('email_opened', opened.sum()), ('email_clicked', clicked.sum())]),
+            'event_data': np.concatenate([opened_data[opened], clicked_data[clicked]]),
+            'timestamp': np.concatenate([opened_at[opened], clicked_at[clicked]]).astype('datetime64[us]')
+        })
+        return email_events
 
 
 def generate_engagement_events(tutors_df: pd.DataFrame, sessions_df: pd.DataFrame,
                                 interventions_df: pd.DataFrame = None,
-                                n_days: int = 30, seed: int = 42) -> pd.DataFrame:
+                                n_days: int = 30, seed: int = 42,
+                                session_index: Optional[SessionIndex] = None,
+                                as_of: Optional[datetime] = None,
+                                session_id_width: Optional[int] = None,
+                                first_event_number: int = 1) -> pd.DataFrame:
     """Convenience function to generate engagement events"""
-    generator = EngagementEventsGenerator(seed=seed)
-    return generator.generate_events(tutors_df, sessions_df, interventions_df, n_days)
+    generator = EngagementEventsGenerator(seed=seed, as_of=as_of)
+    return generator.generate_events(tutors_df, sessions_df, interventions_df, n_days, session_index,
+                                     session_id_width, first_event_number)
+
+
+def append_email_events(events_df: pd.DataFrame, interventions_df: pd.DataFrame,
+                        seed: int = 42, as_of: Optional[datetime] = None) -> pd.DataFrame:
+    """Convenience function to add intervention email events to existing events"""
+    generator = EngagementEventsGenerator(seed=seed, as_of=as_of)
+    return generator.append_email_events(events_df, interventions_df)
 
 
 if __name__ == "__main__":
     import argparse
+    from data_io import read_frame, with_format, write_frame
+    from profiling import Profiler
+    from schema import id_widths
     
     parser = argparse.ArgumentParser(description='Generate engagement events CSV')
     parser.add_argument('--tutors-csv', type=str, default='data/tutor_profiles.csv',
-                       help='Path to tutor profiles CSV')
+                       help='Path to tutor profiles file (CSV, Parquet or Arrow)')
     parser.add_argument('--sessions-csv', type=str, default='data/sessions.csv',
-                       help='Path to sessions CSV')
+                       help='Path to sessions file (CSV, Parquet or Arrow)')
     parser.add_argument('--interventions-csv', type=str, default=None,
-                       help='Path to interventions CSV (optional)')
+                       help='Path to interventions file (optional; CSV, Parquet or Arrow)')
     parser.add_argument('--output', type=str, default='data/engagement_events.csv',
-                       help='Output CSV path')
+                       help='Output path (.csv, .parquet or .arrow)')
+    parser.add_argument('--output-format', type=str, choices=['csv', 'parquet', 'arrow'], default=None,
+                       help='Output format (default: inferred from --output extension)')
     parser.add_argument('--days', type=int, default=30,
                        help='Number of days to generate events for')
     parser.add_argument('--seed', type=int, default=42,
                        help='Random seed')
+    parser.add_argument('--profile', action='store_true',
+                       help='Profile loading, generation and saving; writes a report to <output dir>/profile')
+    parser.add_argument('--profile-stacks', action='store_true',
+                       help='With --profile, also write flamegraph-compatible collapsed stacks')
     
     args = parser.parse_args()
+    profiler = Profiler(enabled=args.profile, stacks=args.profile_stacks)
     
     # Load data
-    tutors_df = pd.read_csv(args.tutors_csv)
-    sessions_df = pd.read_csv(args.sessions_csv)
+    tutors_df = profiler.call('read_tutors', read_frame, args.tutors_csv, table='tutor_profiles')
+    sessions_df = profiler.call('read_sessions', read_frame, args.sessions_csv, table='sessions')
     interventions_df = None
     
     if args.interventions_csv and os.path.exists(args.interventions_csv):
-        interventions_df = pd.read_csv(args.interventions_csv)
+        interventions_df = profiler.call('read_interventions', read_frame, args.interventions_csv,
+                                         table='interventions')
     
     # Generate events
     print(f"Generating engagement events for {len(tutors_df)} tutors over {args.days} days...")
-    events_df = generate_engagement_events(tutors_df, sessions_df, interventions_df, args.days, args.seed)
+    events_df = profiler.call('generate', generate_engagement_events,
+                              tutors_df, sessions_df, interventions_df, args.days, args.seed)
     
     # Save
-    events_df.to_csv(args.output, index=False)
+    output_file = profiler.call('write', write_frame, events_df,
+                                with_format(args.output, args.output_format), id_widths=id_widths(tutors_df))
     print(f"Generated {len(events_df)} engagement events")
-    print(f"Saved to {args.output}")
+    print(f"Saved to {output_file}")
+    profiler.save(os.path.join(os.path.dirname(output_file) or '.', 'profile'), 'generate_engagement_events')
     
     # Print summary
     if len(events_df) > 0:
@@ -5,17 +5,85 @@ Generates tutor assignments to experiments with exposure and conversion tracking
 
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-import random
+from datetime import datetime
 import json
-from typing import Dict, List, Set
+from typing import Callable, Dict, List, Optional, Set, Union
 import os
 
+from schema import apply_schema, id_widths
+
+
+# Range filters: target_segment key -> (default min, default max, fill value for missing)
+# Missing values pass a range filter unless a fill value is given
+SEGMENT_RANGES = {
+    'first_session_count': (0, None, None),
+    'avg_engagement_score': (0.0, 10.0, None),
+    'total_sessions_7d': (None, 1000, None),
+    'months_experience': (0, 120, None),
+    'avg_rating_7d': (0.0, 5.0, 0)
+}
+
+# Profile columns every tutor has; other criteria are skipped when their column is absent
+REQUIRED_SEGMENT_COLUMNS = {'months_experience'}
+
+
+def compile_target_segment(target_segment: Dict) -> Callable[[pd.DataFrame], np.ndarray]:
+    """
+    Compile a target_segment dict into a vectorized filter
+    
+    Same criteria as ExperimentAssignmentsGenerator.matches_target_segment, evaluated
+    for every row of a merged tutor/aggregate frame at once.
+    
+    Args:
+        target_segment: Targeting criteria (empty matches every tutor)
+    
+    Returns:
+        Function mapping a tutor/aggregate frame to a boolean mask of matching rows
+    """
+    conditions = []
+    
+    # Tutors without aggregates (missing level/flag) never match these criteria
+    if 'churn_risk_level' in target_segment:
+        levels = list(target_segment['churn_risk_level'])
+        conditions.append(('churn_risk_level', lambda values: values.isin(levels)))
+    
+    if 'poor_first_session_flag' in target_segment:
+        flag = target_segment['poor_first_session_flag']
+        conditions.append(('poor_first_session_flag', lambda values: values == flag))
+    
+    for key, (default_min, default_max, fill_value) in SEGMENT_RANGES.items():
+        if key not in target_segment:
+            continue
+        low = target_segment[key].get('min', default_min)
+        high = target_segment[key].get('max', default_max)
+        
+        def in_range(values: pd.Series, low=low, high=high, fill_value=fill_value) -> pd.Series:
+            values = pd.to_numeric(values)
+            if fill_value is not None:
+                values = values.fillna(fill_value)
+            outside = pd.Series(False, index=values.index)
+            if low is not None:
+                outside |= (values < low).fillna(False)
+            if high is not None:
+                outside |= (values > high).fillna(False)
+            return ~outside
+        
+        conditions.append((key, in_range))
+    
+    def mask(frame: pd.DataFrame) -> np.ndarray:
+        result = np.ones(len(frame), dtype=bool)
+        for column, condition in conditions:
+            if column in frame.columns or column in REQUIRED_SEGMENT_COLUMNS:
+                result &= condition(frame[column]).to_numpy(dtype=bool, na_value=False)
+        return result
+    
+    return mask
+
 
 class ExperimentAssignmentsGenerator:
-    def __init__(self, seed: int = 42):
-        np.random.seed(seed)
-        random.seed(seed)
+    def __init__(self, seed: Union[int, np.random.SeedSequence] = 42, as_of: Optional[datetime] = None):
+        self.rng = np.random.default_rng(seed)
+        self.as_of = as_of or datetime.now()
         
     def matches_target_segment(self, tutor: pd.Series, aggregates: pd.Series, target_segment: Dict) -> bool:
         """Check if tutor matches experiment targeting criteria"""
@@ -92,125 +160,136 @@ class ExperimentAssignmentsGenerator:
         
         # Merge tutors and aggregates for easy lookup
         tutor_agg = tutors_df.merge(aggregates_df, on='tutor_id', how='left')
+        tutor_ids = tutor_agg['tutor_id'].values
         
         for _, experiment in experiments_df.iterrows():
-            experiment_id = experiment['experiment_id']
             variants = json.loads(experiment['variants'])
             target_segment = json.loads(experiment['target_segment']) if pd.notna(experiment['target_segment']) else {}
-            start_date = pd.to_datetime(experiment['start_date'])
-            end_date = pd.to_datetime(experiment['end_date']) if pd.notna(experiment['end_date']) else None
-            status = experiment['status']
             
             # Filter tutors by target segment
-            eligible_tutors = []
-            for _, tutor_row in tutor_agg.iterrows():
-                if self.matches_target_segment(tutor_row, tutor_row, target_segment):
-                    eligible_tutors.append(tutor_row['tutor_id'])
+            eligible_tutors = tutor_ids[compile_target_segment(target_segment)(tutor_agg)]
             
             # For completed experiments, assign all eligible tutors
             # For active experiments, assign subset (typically 60-80% of eligible)
-            if status == 'completed':
+            if experiment['status'] == 'completed':
                 assigned_tutors = eligible_tutors
             else:
-                assigned_count = int(len(eligible_tutors) * np.random.uniform(0.6, 0.8))
-                assigned_tutors = random.sample(eligible_tutors, min(assigned_count, len(eligible_tutors)))
-            
-            # Randomly assign variants (equal distribution)
-            variant_probs = [1.0 / len(variants)] * len(variants)
+                assigned_count = int(len(eligible_tutors) * self.rng.uniform(0.6, 0.8))
+                assigned_tutors = self.rng.choice(eligible_tutors, min(assigned_count, len(eligible_tutors)),
+                                                   replace=False)
             
-            for tutor_id in assigned_tutors:
-                variant = np.random.choice(variants, p=variant_probs)
-                assigned_at = start_date + timedelta(hours=random.randint(0, 24))
-                
-                # Exposure tracking (when variant was actually shown)
-                # For completed experiments, most were exposed
-                # For active experiments, fewer exposed yet
-                if status == 'completed':
-                    exposed_prob = np.random.uniform(0.85, 0.98)
-                else:
-                    exposed_prob = np.random.uniform(0.3, 0.7)  # Only some exposed so far
-                
-                exposed_at = None
-                converted_at = None
-                conversion_value = None
-                
-                if np.random.random() < exposed_prob:
-                    exposed_at = assigned_at + timedelta(hours=random.randint(1, 48))
-                    
-                    # Conversion tracking (if desired action occurred)
-                    # Control: 5-15% conversion
-                    # Treatment variants: 8-20% conversion
-                    if variant == 'control':
-                        conversion_rate = np.random.uniform(0.05, 0.15)
-                    else:
-                        conversion_rate = np.random.uniform(0.08, 0.20)
-                    
-                    if np.random.random() < conversion_rate:
-                        converted_at = exposed_at + timedelta(hours=random.randint(1, 168))  # Within 1 week
-                        
-                        # Conversion value depends on experiment type
-                        if 'engagement' in experiment['primary_metric'].lower():
-                            conversion_value = np.random.uniform(0.5, 2.0)  # Engagement lift
-                        elif 'churn' in experiment['primary_metric'].lower():
-                            conversion_value = np.random.uniform(0.1, 0.5)  # Churn reduction
-                        else:
-                            conversion_value = np.random.uniform(0.05, 0.3)  # Generic improvement
-                
-                assignments.append({
-                    'experiment_id': experiment_id,
-                    'tutor_id': tutor_id,
-                    'variant': variant,
-                    'assigned_at': assigned_at,
-                    'exposed_at': exposed_at,
-                    'converted_at': converted_at,
-                    'conversion_value': conversion_value
-                })
-        
-        df = pd.DataFrame(assignments)
+            assignments.append(self._draw_assignments(experiment, variants, assigned_tutors))
+        
+        if not assignments:
+            return pd.DataFrame()
+        df = apply_schema(pd.concat(assignments, ignore_index=True), 'experiment_assignments')
         
         # Sort by assigned_at
         if len(df) > 0:
             df = df.sort_values('assigned_at')
         
         return df
+    
+    def _draw_assignments(self, experiment: pd.Series, variants: List[str],
+                          assigned_tutors: np.ndarray) -> pd.DataFrame:
+        """Draw variants, exposure and conversion for all tutors assigned to one experiment"""
+        n = len(assigned_tutors)
+        start_date = pd.to_datetime(experiment['start_date'])
+        hour = np.timedelta64(1, 'h')
+        
+        # Randomly assign variants (equal distribution)
+        variant = self.rng.choice(variants, n)
+        assigned_at = np.datetime64(start_date, 'us') + self.rng.integers(0, 25, n) * hour
+        
+        # Exposure tracking (when variant was actually shown)
+        # For completed experiments, most were exposed
+        # For active experiments, fewer exposed yet
+        if experiment['status'] == 'completed':
+            exposed_prob = self.rng.uniform(0.85, 0.98, n)
+        else:
+            exposed_prob = self.rng.uniform(0.3, 0.7, n)  # Only some exposed so far
+        exposed = self.rng.random(n) < exposed_prob
+        exposed_at = assigned_at + self.rng.integers(1, 49, n) * hour
+        
+        # Conversion tracking (if desired action occurred)
+        # Control: 5-15% conversion
+        # Treatment variants: 8-20% conversion
+        conversion_rate = np.where(variant == 'control',
+                                   self.rng.uniform(0.05, 0.15, n),
+                                   self.rng.uniform(0.08, 0.20, n))
+        converted = exposed & (self.rng.random(n) < conversion_rate)
+        converted_at = exposed_at + self.rng.integers(1, 169, n) * hour  # Within 1 week
+        
+        # Conversion value depends on experiment type
+        primary_metric = experiment['primary_metric'].lower()
+        if 'engagement' in primary_metric:
+            conversion_value = self.rng.uniform(0.5, 2.0, n)  # Engagement lift
+        elif 'churn' in primary_metric:
+            conversion_value = self.rng.uniform(0.1, 0.5, n)  # Churn reduction
+        else:
+            conversion_value = self.rng.uniform(0.05, 0.3, n)  # Generic improvement
+        
+        not_a_time = np.datetime64('NaT', 'us')
+        return pd.DataFrame({
+            'experiment_id': np.full(n, experiment['experiment_id'], dtype=object),
+            'tutor_id': assigned_tutors,
+            'variant': variant.astype(object),
+            'assigned_at': assigned_at,
+            'exposed_at': np.where(exposed, exposed_at, not_a_time),
+            'converted_at': np.where(converted, converted_at, not_a_time),
+            'conversion_value': np.where(converted, conversion_value, np.nan)
+        })
 
 
 def generate_experiment_assignments(experiments_df: pd.DataFrame, tutors_df: pd.DataFrame,
-                                    aggregates_df: pd.DataFrame, seed: int = 42) -> pd.DataFrame:
+                                    aggregates_df: pd.DataFrame, seed: int = 42,
+                                    as_of: Optional[datetime] = None) -> pd.DataFrame:
     """Convenience function to generate experiment assignments"""
-    generator = ExperimentAssignmentsGenerator(seed=seed)
+    generator = ExperimentAssignmentsGenerator(seed=seed, as_of=as_of)
     return generator.generate_assignments(experiments_df, tutors_df, aggregates_df)
 
 
 if __name__ == "__main__":
     import argparse
+    from data_io import read_frame, with_format, write_frame
+    from profiling import Profiler
     
     parser = argparse.ArgumentParser(description='Generate experiment assignments CSV')
     parser.add_argument('--experiments-csv', type=str, default='data/experiments.csv',
-                       help='Path to experiments CSV')
+                       help='Path to experiments file (CSV, Parquet or Arrow)')
     parser.add_argument('--tutors-csv', type=str, default='data/tutor_profiles.csv',
-                       help='Path to tutor profiles CSV')
+                       help='Path to tutor profiles file (CSV, Parquet or Arrow)')
     parser.add_argument('--aggregates-csv', type=str, default='data/tutor_aggregates.csv',
-                       help='Path to tutor aggregates CSV')
+                       help='Path to tutor aggregates file (CSV, Parquet or Arrow)')
     parser.add_argument('--output', type=str, default='data/experiment_assignments.csv',
-                       help='Output CSV path')
+                       help='Output path (.csv, .parquet or .arrow)')
+    parser.add_argument('--output-format', type=str, choices=['csv', 'parquet', 'arrow'], default=None,
+                       help='Output format (default: inferred from --output extension)')
     parser.add_argument('--seed', type=int, default=42,
                        help='Random seed')
+    parser.add_argument('--profile', action='store_true',
+                       help='Profile loading, generation and saving; writes a report to <output dir>/profile')
+    parser.add_argument('--profile-stacks', action='store_true',
+                       help='With --profile, also write flamegraph-compatible collapsed stacks')
     
     args = parser.parse_args()
+    profiler = Profiler(enabled=args.profile, stacks=args.profile_stacks)
     
     # Load data
-    experiments_df = pd.read_csv(args.experiments_csv)
-    tutors_df = pd.read_csv(args.tutors_csv)
-    aggregates_df = pd.read_csv(args.aggregates_csv)
+    experiments_df = profiler.call('read_experiments', read_frame, args.experiments_csv)
+    tutors_df = profiler.call('read_tutors', read_frame, args.tutors_csv, table='tutor_profiles')
+    aggregates_df = profiler.call('read_aggregates', read_frame, args.aggregates_csv, table='tutor_aggregates')
     
     # Generate assignments
     print(f"Generating experiment assignments...")
-    assignments_df = generate_experiment_assignments(experiments_df, tutors_df, aggregates_df, args.seed)
+    assignments_df = profiler.call('generate', generate_experiment_assignments,
+                                   experiments_df, tutors_df, aggregates_df, args.seed)
     
-    assignments_df.to_csv(args.output, index=False)
+    output_file = profiler.call('write', write_frame, assignments_df,
+                                with_format(args.output, args.output_format), id_widths=id_widths(tutors_df))
     print(f"Generated {len(assignments_df)} experiment assignments")
-    print(f"Saved to {args.output}")
+    print(f"Saved to {output_file}")
+    profiler.save(os.path.join(os.path.dirname(output_file) or '.', 'profile'), 'generate_experiment_assignments')
     
     # Print summary
     if len(assignments_df) > 0:
@@ -6,16 +6,15 @@ Generates realistic A/B test experiments with both completed and active experime
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import random
 import json
-from typing import Dict, List
+from typing import Dict, List, Optional, Union
 import os
 
 
 class ExperimentsGenerator:
-    def __init__(self, seed: int = 42):
-        np.random.seed(seed)
-        random.seed(seed)
+    def __init__(self, seed: Union[int, np.random.SeedSequence] = 42, as_of: Optional[datetime] = None):
+        self.rng = np.random.default_rng(seed)
+        self.as_of = as_of or datetime.now()
         
     def generate_experiments(self, n_days: int = 30) -> pd.DataFrame:
         """
@@ -28,7 +27,7 @@ class ExperimentsGenerator:
             DataFrame with experiments
         """
         experiments = []
-        now = datetime.now()
+        now = self.as_of
         
         # Experiment 1: "First Session Coaching Email" - COMPLETED
         # Completed 15 days ago
@@ -197,31 +196,43 @@ class ExperimentsGenerator:
         return df
 
 
-def generate_experiments(n_days: int = 30, seed: int = 42) -> pd.DataFrame:
+def generate_experiments(n_days: int = 30, seed: int = 42,
+                         as_of: Optional[datetime] = None) -> pd.DataFrame:
     """Convenience function to generate experiments"""
-    generator = ExperimentsGenerator(seed=seed)
+    generator = ExperimentsGenerator(seed=seed, as_of=as_of)
     return generator.generate_experiments(n_days)
 
 
 if __name__ == "__main__":
     import argparse
+    from data_io import with_format, write_frame
+    from profiling import Profiler
     
     parser = argparse.ArgumentParser(description='Generate experiments CSV')
     parser.add_argument('--output', type=str, default='data/experiments.csv',
-                       help='Output CSV path')
+                       help='Output path (.csv, .parquet or .arrow)')
+    parser.add_argument('--output-format', type=str, choices=['csv', 'parquet', 'arrow'], default=None,
+                       help='Output format (default: inferred from --output extension)')
     parser.add_argument('--days', type=int, default=30,
                        help='Number of days in data period')
     parser.add_argument('--seed', type=int, default=42,
                        help='Random seed')
+    parser.add_argument('--profile', action='store_true',
+                       help='Profile loading, generation and saving; writes a report to <output dir>/profile')
+    parser.add_argument('--profile-stacks', action='store_true',
+                       help='With --profile, also write flamegraph-compatible collapsed stacks')
     
     args = parser.parse_args()
+    profiler = Profiler(enabled=args.profile, stacks=args.profile_stacks)
     
     print(f"Generating experiments...")
-    experiments_df = generate_experiments(args.days, args.seed)
+    experiments_df = profiler.call('generate', generate_experiments, args.days, args.seed)
     
-    experiments_df.to_csv(args.output, index=False)
+    output_file = profiler.call('write', write_frame, experiments_df,
+                                with_format(args.output, args.output_format))
     print(f"Generated {len(experiments_df)} experiments")
-    print(f"Saved to {args.output}")
+    print(f"Saved to {output_file}")
+    profiler.save(os.path.join(os.path.dirname(output_file) or '.', 'profile'), 'generate_experiments')
     
     print("\nExperiment summary:")
     print(f"Completed: {len(experiments_df[experiments_df['status'] == 'completed'])}")
@@ -6,15 +6,26 @@ Generates historical interventions with before/after metrics and experiment link
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import random
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple, Union
 import os
 
+from schema import KEY_DTYPES
+from session_index import SessionIndex
+
+
+INTERVENTION_COLUMNS = [
+    'intervention_id', 'tutor_id', 'intervention_type', 'channel', 'subject', 'content',
+    'template_id', 'experiment_id', 'experiment_variant', 'sent_at', 'delivered_at',
+    'opened_at', 'clicked_at', 'responded_at', 'response_type', 'response_notes',
+    'engagement_before', 'engagement_after', 'sessions_before_count', 'sessions_after_count',
+    'status', 'error_message', 'created_at', 'updated_at'
+]
+
 
 class InterventionsGenerator:
-    def __init__(self, seed: int = 42):
-        np.random.seed(seed)
-        random.seed(seed)
+    def __init__(self, seed: Union[int, np.random.SeedSequence] = 42, as_of: Optional[datetime] = None):
+        self.rng = np.random.default_rng(seed)
+        self.as_of = as_of or datetime.now()
         
         # Intervention templates
         self.templates = {
@@ -57,12 +68,32 @@ class InterventionsGenerator:
             # Default to engagement
             return 'engagement'
     
+    def determine_intervention_types(self, tutor_agg: pd.DataFrame) -> np.ndarray:
+        """Vectorized determine_intervention_type over a tutor/aggregate frame"""
+        def column(name: str, default) -> pd.Series:
+            return tutor_agg[name] if name in tutor_agg.columns else pd.Series(default, index=tutor_agg.index)
+        
+        # Priority order
+        return np.select([
+            (column('poor_first_session_flag', False) == True).to_numpy(dtype=bool, na_value=False),
+            (column('churn_risk_level', None) == 'High').to_numpy(dtype=bool, na_value=False),
+            (column('avg_rating_7d', 5.0) < 3.8).to_numpy(dtype=bool, na_value=False),
+            (column('technical_issue_rate', 0) > 0.15).to_numpy(dtype=bool, na_value=False),
+        ], ['first_session', 'churn', 'quality', 'technical'], 'engagement').astype(object)
+    
     def generate_interventions(self, tutors_df: pd.DataFrame, aggregates_df: pd.DataFrame,
                               sessions_df: pd.DataFrame, experiments_df: pd.DataFrame,
-                              assignments_df: pd.DataFrame, n_days: int = 30) -> pd.DataFrame:
+                              assignments_df: pd.DataFrame, n_days: int = 30,
+                              session_index: Optional[SessionIndex] = None,
+                              num_interventions: Optional[int] = None,
+                              max_per_tutor: int = 4) -> pd.DataFrame:
         """
         Generate interventions with before/after metrics
         
+        All interventions are drawn at once; experiment links come from assignments
+        keyed by tutor, and before/after engagement means and session counts from
+        binary searches and running sums over per-tutor sorted sessions.
+        
         Args:
             tutors_df: Tutor profiles
             aggregates_df: Tutor aggregates
@@ -70,245 +101,270 @@ class InterventionsGenerator:
             experiments_df: Experiments
             assignments_df: Experiment assignments
             n_days: Number of days in period
+            session_index: Optional prebuilt SessionIndex over sessions_df
+            num_interventions: Number of intervention draws (default: 50-100); draws for
+                tutors that already reached max_per_tutor are dropped
+            max_per_tutor: Maximum interventions per tutor
         
         Returns:
             DataFrame with interventions
         """
-        interventions = []
-        start_date = datetime.now() - timedelta(days=n_days)
+        start_date = self.as_of - timedelta(days=n_days)
         
         # Merge data for easy lookup
         tutor_agg = tutors_df.merge(aggregates_df, on='tutor_id', how='left')
-        sessions_df['session_datetime_parsed'] = pd.to_datetime(sessions_df['session_datetime'])
         
         # Filter for high/medium risk tutors
         at_risk_tutors = tutor_agg[
             tutor_agg['churn_risk_level'].isin(['High', 'Medium'])
-        ].copy()
+        ].reset_index(drop=True)
         
-        # Generate 50-100 interventions spread over the period
-        num_interventions = int(np.random.uniform(50, 100))
+        # Generate 50-100 interventions spread over the period unless a volume is given
+        if num_interventions is None:
+            num_interventions = int(self.rng.uniform(50, 100))
         
-        # Create lookup for experiment assignments
-        assignment_lookup = {}
-        if len(assignments_df) > 0:
-            for _, assignment in assignments_df.iterrows():
-                key = (assignment['experiment_id'], assignment['tutor_id'])
-                assignment_lookup[key] = assignment
+        if len(at_risk_tutors) == 0 or num_interventions <= 0:
+            return pd.DataFrame(columns=INTERVENTION_COLUMNS)
         
-        tutor_intervention_count = {}
+        # Select random tutors from the at-risk pool, limiting interventions per tutor;
+        # dropped draws leave gaps in intervention IDs
+        picks = self.rng.integers(0, len(at_risk_tutors), num_interventions)
+        pick_order = np.argsort(picks, kind='stable')
+        sorted_picks = picks[pick_order]
+        group_start = np.flatnonzero(np.diff(sorted_picks, prepend=-1))
+        occurrence = np.empty(num_interventions, dtype=np.int64)
+        occurrence[pick_order] = np.arange(num_interventions) - np.repeat(group_start, np.diff(np.append(group_start, num_interventions)))
+        kept = np.flatnonzero(occurrence < max_per_tutor)
+        picks = picks[kept]
+        n = len(picks)
         
-        for i in range(num_interventions):
-            # Select random tutor from at-risk pool
-            tutor_idx = random.randint(0, len(at_risk_tutors) - 1)
-            tutor_row = at_risk_tutors.iloc[tutor_idx]
-            tutor_id = tutor_row['tutor_id']
-            
-            # Limit interventions per tutor (2-4 max)
-            if tutor_id not in tutor_intervention_count:
-                tutor_intervention_count[tutor_id] = 0
-            
-            if tutor_intervention_count[tutor_id] >= 4:
-                continue
-            
-            tutor_intervention_count[tutor_id] += 1
-            
-            # Determine intervention type
-            intervention_type = self.determine_intervention_type(tutor_row)
-            
-            # Random day within period (weighted toward middle/end)
-            day_offset = int(np.random.beta(a=2, b=1) * n_days)
-            created_at = start_date + timedelta(days=day_offset)
-            
-            # Look for experiment assignment
-            experiment_id = None
-            experiment_variant = None
-            
-            # Check if tutor is in any experiment
-            tutor_experiments = assignments_df[
-                (assignments_df['tutor_id'] == tutor_id) &
-                (pd.to_datetime(experiments_df['start_date']).max() <= created_at)
-            ] if len(assignments_df) > 0 else pd.DataFrame()
-            
-            if len(tutor_experiments) > 0:
-                # Pick one experiment (prefer ones that match intervention type)
-                matching_experiments = experiments_df[
-                    experiments_df['experiment_id'].isin(tutor_experiments['experiment_id'].unique())
-                ]
-                
-                if len(matching_experiments) > 0:
-                    exp = matching_experiments.iloc[0]
-                    assignment = tutor_experiments[tutor_experiments['experiment_id'] == exp['experiment_id']].iloc[0]
-                    experiment_id = exp['experiment_id']
-                    experiment_variant = assignment['variant']
-            
-            # Generate before metrics (at time of intervention)
-            tutor_sessions_before = sessions_df[
-                (sessions_df['tutor_id'] == tutor_id) &
-                (sessions_df['session_datetime_parsed'] <= created_at)
-            ]
-            
-            engagement_before = tutor_sessions_before['engagement_score'].mean() if len(tutor_sessions_before) > 0 else tutor_row.get('avg_engagement_score', 6.0)
-            sessions_before_count = len(tutor_sessions_before[
-                tutor_sessions_before['session_datetime_parsed'] >= created_at - timedelta(days=7)
-            ])
-            
-            # Determine outcome (60% success, 25% ignored, 15% partial)
-            outcome_roll = np.random.random()
-            
-            if outcome_roll < 0.6:
-                # Success case
-                status = 'responded'
-                opened_at = created_at + timedelta(hours=random.randint(1, 48))
-                delivered_at = opened_at - timedelta(minutes=random.randint(1, 60))
-                
-                # Some also get clicked
-                if np.random.random() < 0.7:
-                    clicked_at = opened_at + timedelta(minutes=random.randint(1, 30))
-                    response_type = 'positive'
-                else:
-                    clicked_at = None
-                    response_type = 'positive'
-                
-                # Calculate after metrics (improvement)
-                improvement_factor = np.random.uniform(0.05, 0.25)  # 5-25% improvement
-                engagement_after = engagement_before * (1 + improvement_factor)
-                
-                # Sessions increased
-                sessions_after_count = sessions_before_count + random.randint(1, 4)
-                
-            elif outcome_roll < 0.85:
-                # Ignored case
-                status = 'delivered'
-                delivered_at = created_at + timedelta(minutes=random.randint(1, 60))
-                opened_at = None
-                clicked_at = None
-                response_type = None
-                
-                # No improvement
-                engagement_after = engagement_before * np.random.uniform(0.98, 1.02)  # Slight variation
-                sessions_after_count = sessions_before_count + random.randint(-1, 1)
-                
-            else:
-                # Partial success
-                status = 'opened'
-                delivered_at = created_at + timedelta(minutes=random.randint(1, 60))
-                opened_at = delivered_at + timedelta(hours=random.randint(2, 72))
-                clicked_at = None
-                response_type = 'neutral'
-                
-                # Minor improvement
-                improvement_factor = np.random.uniform(0.01, 0.08)  # 1-8% improvement
-                engagement_after = engagement_before * (1 + improvement_factor)
-                sessions_after_count = sessions_before_count + random.randint(0, 2)
-            
-            # Generate content
-            template = self.templates[intervention_type]
-            tutor_name = f"Tutor {tutor_id[-3:]}"
-            content = template['content_template'].format(tutor_name=tutor_name)
-            
-            # Calculate after metrics (future sessions)
-            tutor_sessions_after = sessions_df[
-                (sessions_df['tutor_id'] == tutor_id) &
-                (sessions_df['session_datetime_parsed'] > created_at) &
-                (sessions_df['session_datetime_parsed'] <= created_at + timedelta(days=14))
-            ]
-            
-            # Override with actual data if available
-            if len(tutor_sessions_after) > 0:
-                actual_engagement_after = tutor_sessions_after['engagement_score'].mean()
-                if pd.notna(actual_engagement_after):
-                    engagement_after = actual_engagement_after
-                
-                sessions_after_count = len(tutor_sessions_after[
-                    tutor_sessions_after['session_datetime_parsed'] >= created_at + timedelta(days=7)
-                ])
-            
-            intervention = {
-                'intervention_id': f'INT{i+1:04d}',
-                'tutor_id': tutor_id,
-                'intervention_type': intervention_type,
-                'channel': 'email',
-                'subject': template['subject'],
-                'content': content,
-                'template_id': f'template_{intervention_type}_001',
-                'experiment_id': experiment_id,
-                'experiment_variant': experiment_variant,
-                'sent_at': created_at,
-                'delivered_at': delivered_at,
-                'opened_at': opened_at,
-                'clicked_at': clicked_at,
-                'responded_at': clicked_at if clicked_at else None,
-                'response_type': response_type,
-                'response_notes': f'Intervention {intervention_type} - {status}' if response_type else None,
-                'engagement_before': round(engagement_before, 2),
-                'engagement_after': round(engagement_after, 2),
-                'sessions_before_count': sessions_before_count,
-                'sessions_after_count': sessions_after_count,
-                'status': status,
-                'error_message': None,
-                'created_at': created_at,
-                'updated_at': opened_at if opened_at else created_at
-            }
-            
-            interventions.append(intervention)
+        tutor_ids = at_risk_tutors['tutor_id'].values[picks]
+        intervention_type = self.determine_intervention_types(at_risk_tutors)[picks]
+        
+        # Random day within period (weighted toward middle/end)
+        day_offset = (self.rng.beta(a=2, b=1, size=n) * n_days).astype(int)
+        created_at = np.datetime64(start_date, 'us') + day_offset * np.timedelta64(1, 'D')
+        created_us = created_at.astype(np.int64)
+        
+        experiment_id, experiment_variant = self._experiment_links(
+            tutor_ids, created_at, experiments_df, assignments_df)
+        
+        # Per-tutor sorted sessions for windowed lookups; the caller's frame is not modified
+        if session_index is None or not session_index.matches(tutors_df['tutor_id']):
+            session_index = SessionIndex(sessions_df, tutors_df['tutor_id'])
+        tutor_codes = session_index.tutor_ids.get_indexer(tutor_ids)
+        segment_start = session_index.offsets[tutor_codes]
+        engagement_sums, engagement_counts = session_index.prefix_sums('engagement_score')
+        
+        day_us = 86400 * 1_000_000
+        
+        def position(times: np.ndarray, side: str) -> np.ndarray:
+            return session_index.search(tutor_codes, times, side=side)
+        
+        def window_mean(lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+            counts = engagement_counts[hi] - engagement_counts[lo]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                return np.where(counts > 0, (engagement_sums[hi] - engagement_sums[lo]) / counts, np.nan)
         
-        df = pd.DataFrame(interventions)
+        # Generate before metrics (at time of intervention)
+        before_end = position(created_us, 'right')
+        fallback_engagement = at_risk_tutors['avg_engagement_score'].values[picks].astype(float) \
+            if 'avg_engagement_score' in at_risk_tutors.columns else np.full(n, 6.0)
+        engagement_before = np.where(before_end > segment_start,
+                                     window_mean(segment_start, before_end), fallback_engagement)
+        sessions_before_count = before_end - position(created_us - 7 * day_us, 'left')
+        
+        # Determine outcome (60% success, 25% ignored, 15% partial)
+        outcome_roll = self.rng.random(n)
+        success = outcome_roll < 0.6
+        ignored = ~success & (outcome_roll < 0.85)
+        partial = ~success & ~ignored
+        status = np.select([success, ignored], ['responded', 'delivered'], 'opened').astype(object)
+        
+        hour = np.timedelta64(1, 'h')
+        minute = np.timedelta64(1, 'm')
+        not_a_time = np.datetime64('NaT', 'us')
+        
+        # Success: opened 1-48h after sending, delivered shortly before, 70% also clicked
+        success_opened = created_at + self.rng.integers(1, 49, n) * hour
+        success_delivered = success_opened - self.rng.integers(1, 61, n) * minute
+        success_clicked = success & (self.rng.random(n) < 0.7)
+        
+        # Ignored/partial: delivered within the hour; partial opened 2-72h later
+        delivered_at = np.where(success, success_delivered, created_at + self.rng.integers(1, 61, n) * minute)
+        opened_at = np.where(success, success_opened,
+                             np.where(partial, delivered_at + self.rng.integers(2, 73, n) * hour, not_a_time))
+        clicked_at = np.where(success_clicked, success_opened + self.rng.integers(1, 31, n) * minute, not_a_time)
+        response_type = np.select([success, partial], ['positive', 'neutral'], None).astype(object)
+        
+        # After metrics: 5-25% improvement on success, slight variation when ignored, 1-8% when partial
+        engagement_after = engagement_before * np.select(
+            [success, ignored],
+            [1 + self.rng.uniform(0.05, 0.25, n), self.rng.uniform(0.98, 1.02, n)],
+            1 + self.rng.uniform(0.01, 0.08, n))
+        sessions_after_count = sessions_before_count + np.select(
+            [success, ignored],
+            [self.rng.integers(1, 5, n), self.rng.integers(-1, 2, n)],
+            self.rng.integers(0, 3, n))
+        
+        # Calculate after metrics (future sessions), overriding with actual data if available
+        after_start = before_end
+        after_end = position(created_us + 14 * day_us, 'right')
+        has_after = after_end > after_start
+        actual_engagement_after = window_mean(after_start, after_end)
+        engagement_after = np.where(has_after & ~np.isnan(actual_engagement_after),
+                                    actual_engagement_after, engagement_after)
+        sessions_after_count = np.where(has_after, after_end - position(created_us + 7 * day_us, 'left'),
+                                        sessions_after_count)
+        
+        # Generate content
+        subject = np.array([self.templates[t]['subject'] for t in self.templates], dtype=object)
+        content_parts = [self.templates[t]['content_template'].split('{tutor_name}') for t in self.templates]
+        type_codes = pd.Index(list(self.templates)).get_indexer(intervention_type)
+        # Last three digits of the tutor ID ('T0048' -> 'Tutor 048')
+        tutor_names = np.char.add('Tutor ', np.char.zfill((np.asarray(tutor_ids) % 1000).astype(str), 3))
+        content = np.char.add(np.char.add(np.array([parts[0] for parts in content_parts])[type_codes], tutor_names),
+                              np.array([parts[1] for parts in content_parts])[type_codes])
+        
+        interventions = pd.DataFrame({
+            'intervention_id': (kept + 1).astype(KEY_DTYPES['intervention_id']),
+            'tutor_id': tutor_ids,
+            'intervention_type': intervention_type,
+            'channel': 'email',
+            'subject': subject[type_codes],
+            'content': content.astype(object),
+            'template_id': np.char.add(np.char.add('template_', intervention_type.astype(str)), '_001').astype(object),
+            'experiment_id': experiment_id,
+            'experiment_variant': experiment_variant,
+            'sent_at': created_at,
+            'delivered_at': delivered_at,
+            'opened_at': opened_at,
+            'clicked_at': clicked_at,
+            'responded_at': clicked_at,
+            'response_type': response_type,
+            'response_notes': np.where(response_type != None,
+                                       np.char.add(np.char.add('Intervention ', intervention_type.astype(str)),
+                                                   np.char.add(' - ', status.astype(str))).astype(object),
+                                       None),
+            'engagement_before': np.round(engagement_before, 2),
+            'engagement_after': np.round(engagement_after, 2),
+            'sessions_before_count': sessions_before_count,
+            'sessions_after_count': sessions_after_count,
+            'status': status,
+            'error_message': None,
+            'created_at': created_at,
+            'updated_at': np.where(np.isnat(opened_at), created_at, opened_at)
+        })
         
         # Sort by created_at
-        if len(df) > 0:
-            df = df.sort_values('created_at')
+        return interventions.sort_values('created_at')
+    
+    @staticmethod
+    def _experiment_links(tutor_ids: np.ndarray, created_at: np.ndarray, experiments_df: pd.DataFrame,
+                          assignments_df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Experiment and variant for each intervention, from assignments keyed by tutor
+        
+        A tutor's experiment is the first of their experiments in experiments_df order,
+        with the variant of their first assignment to it; interventions are only linked
+        once every experiment has started.
+        """
+        n = len(tutor_ids)
+        experiment_id = np.full(n, None, dtype=object)
+        experiment_variant = np.full(n, None, dtype=object)
+        if len(assignments_df) == 0 or len(experiments_df) == 0:
+            return experiment_id, experiment_variant
+        
+        # One row per tutor: the assignment to their first experiment
+        experiment_position = pd.Index(experiments_df['experiment_id']).get_indexer(assignments_df['experiment_id'])
+        tutor_assignments = (
+            assignments_df[['tutor_id', 'experiment_id', 'variant']]
+            .assign(experiment_position=experiment_position)
+            .loc[experiment_position >= 0]
+            .sort_values('experiment_position', kind='stable')
+            .drop_duplicates('tutor_id')
+            .set_index('tutor_id')
+        )
         
-        return df
+        latest_start = pd.to_datetime(experiments_df['start_date']).max()
+        lookup = tutor_assignments.index.get_indexer(tutor_ids)
+        linked = (lookup >= 0) & (created_at >= np.datetime64(latest_start, 'us'))
+        experiment_id[linked] = tutor_assignments['experiment_id'].values[lookup[linked]]
+        experiment_variant[linked] = tutor_assignments['variant'].values[lookup[linked]]
+        return experiment_id, experiment_variant
 
 
 def generate_interventions(tutors_df: pd.DataFrame, aggregates_df: pd.DataFrame,
                           sessions_df: pd.DataFrame, experiments_df: pd.DataFrame,
-                          assignments_df: pd.DataFrame, n_days: int = 30, seed: int = 42) -> pd.DataFrame:
+                          assignments_df: pd.DataFrame, n_days: int = 30, seed: int = 42,
+                          session_index: Optional[SessionIndex] = None,
+                          num_interventions: Optional[int] = None,
+                          max_per_tutor: int = 4,
+                          as_of: Optional[datetime] = None) -> pd.DataFrame:
     """Convenience function to generate interventions"""
-    generator = InterventionsGenerator(seed=seed)
+    generator = InterventionsGenerator(seed=seed, as_of=as_of)
     return generator.generate_interventions(tutors_df, aggregates_df, sessions_df, 
-                                          experiments_df, assignments_df, n_days)
+                                          experiments_df, assignments_df, n_days, session_index,
+                                          num_interventions, max_per_tutor)
 
 
 if __name__ == "__main__":
     import argparse
+    from data_io import read_frame, with_format, write_frame
+    from profiling import Profiler
+    from schema import id_widths
     
     parser = argparse.ArgumentParser(description='Generate interventions CSV')
     parser.add_argument('--tutors-csv', type=str, default='data/tutor_profiles.csv',
-                       help='Path to tutor profiles CSV')
+                       help='Path to tutor profiles file (CSV, Parquet or Arrow)')
     parser.add_argument('--aggregates-csv', type=str, default='data/tutor_aggregates.csv',
-                       help='Path to tutor aggregates CSV')
+                       help='Path to tutor aggregates file (CSV, Parquet or Arrow)')
     parser.add_argument('--sessions-csv', type=str, default='data/sessions.csv',
-                       help='Path to sessions CSV')
+                       help='Path to sessions file (CSV, Parquet or Arrow)')
     parser.add_argument('--experiments-csv', type=str, default='data/experiments.csv',
-                       help='Path to experiments CSV')
+                       help='Path to experiments file (CSV, Parquet or Arrow)')
     parser.add_argument('--assignments-csv', type=str, default='data/experiment_assignments.csv',
-                       help='Path to experiment assignments CSV')
+                       help='Path to experiment assignments file (CSV, Parquet or Arrow)')
     parser.add_argument('--output', type=str, default='data/interventions.csv',
-                       help='Output CSV path')
+                       help='Output path (.csv, .parquet or .arrow)')
+    parser.add_argument('--output-format', type=str, choices=['csv', 'parquet', 'arrow'], default=None,
+                       help='Output format (default: inferred from --output extension)')
     parser.add_argument('--days', type=int, default=30,
                        help='Number of days in data period')
+    parser.add_argument('--num-interventions', type=int, default=None,
+                       help='Number of intervention draws (default: random 50-100)')
+    parser.add_argument('--max-per-tutor', type=int, default=4,
+                       help='Maximum interventions per tutor')
     parser.add_argument('--seed', type=int, default=42,
                        help='Random seed')
+    parser.add_argument('--profile', action='store_true',
+                       help='Profile loading, generation and saving; writes a report to <output dir>/profile')
+    parser.add_argument('--profile-stacks', action='store_true',
+                       help='With --profile, also write flamegraph-compatible collapsed stacks')
     
     args = parser.parse_args()
+    profiler = Profiler(enabled=args.profile, stacks=args.profile_stacks)
     
     # Load data
-    tutors_df = pd.read_csv(args.tutors_csv)
-    aggregates_df = pd.read_csv(args.aggregates_csv)
-    sessions_df = pd.read_csv(args.sessions_csv)
-    experiments_df = pd.read_csv(args.experiments_csv)
-    assignments_df = pd.read_csv(args.assignments_csv)
+    tutors_df = profiler.call('read_tutors', read_frame, args.tutors_csv, table='tutor_profiles')
+    aggregates_df = profiler.call('read_aggregates', read_frame, args.aggregates_csv, table='tutor_aggregates')
+    sessions_df = profiler.call('read_sessions', read_frame, args.sessions_csv, table='sessions')
+    experiments_df = profiler.call('read_experiments', read_frame, args.experiments_csv)
+    assignments_df = profiler.call('read_assignments', read_frame, args.assignments_csv, table='experiment_assignments')
     
     # Generate interventions
     print(f"Generating interventions...")
-    interventions_df = generate_interventions(tutors_df, aggregates_df, sessions_df,
-                                             experiments_df, assignments_df, args.days, args.seed)
+    interventions_df = profiler.call('generate', generate_interventions,
+                                     tutors_df, aggregates_df, sessions_df,
+                                     experiments_df, assignments_df, args.days, args.seed,
+                                     num_interventions=args.num_interventions,
+                                     max_per_tutor=args.max_per_tutor)
     
-    interventions_df.to_csv(args.output, index=False)
+    output_file = profiler.call('write', write_frame, interventions_df,
+                                with_format(args.output, args.output_format), id_widths=id_widths(tutors_df))
     print(f"Generated {len(interventions_df)} interventions")
-    print(f"Saved to {args.output}")
+    print(f"Saved to {output_file}")
+    profiler.save(os.path.join(os.path.dirname(output_file) or '.', 'profile'), 'generate_interventions')
     
     # Print summary
     if len(interventions_df) > 0:
@@ -0,0 +1,397 @@
+"""
+HTTP Load
+Stdlib asyncio HTTP/1.1 client with a bounded keep-alive connection pool, an open-loop
+request scheduler that tracks backpressure, latency percentiles per route, and a local
+stand-in server for the tracking API
+"""
+
+import asyncio
+import json
+import ssl
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import numpy as np
+
+
+DEFAULT_CONNECTIONS = 16
+DEFAULT_TIMEOUT = 10.0
+PERCENTILES = [50, 95, 99]
+
+# Requests scheduled but not yet finished, per connection, before the scheduler stalls
+PENDING_PER_CONNECTION = 64
+
+# Errors after which a connection is dropped (and a reused one retried once)
+CONNECTION_ERRORS = (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError)
+
+
+@dataclass
+class Response:
+    status: int  # 0 when no response was received
+    body: bytes
+    latency: float  # Seconds from acquiring a connection to the end of the response
+    error: Optional[str] = None
+
+
+# (seconds after the start, route label, method, path, JSON body or None)
+ScheduledRequest = Tuple[float, str, str, str, Optional[bytes]]
+
+
+def split_url(url: str) -> Tuple[str, int, bool, str]:
+    """http(s)://host[:port][/prefix] -> (host, port, tls, path prefix without trailing slash)"""
+    parts = urlsplit(url)
+    if parts.scheme not in ('http', 'https'):
+        raise ValueError(f"Unsupported URL scheme: {url}")
+    tls = parts.scheme == 'https'
+    return parts.hostname or 'localhost', parts.port or (443 if tls else 80), tls, parts.path.rstrip('/')
+
+
+class HttpConnection:
+    """One keep-alive HTTP/1.1 connection (requests on it are sequential)"""
+
+    def __init__(self, host: str, port: int, tls: bool = False):
+        self.host = host
+        self.port = port
+        self.tls = tls
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.requests = 0
+
+    @property
+    def is_open(self) -> bool:
+        return self.writer is not None and not self.writer.is_closing()
+
+    async def open(self) -> None:
+        context = ssl.create_default_context() if self.tls else None
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port, ssl=context)
+        self.requests = 0
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+    async def request(self, method: str, path: str, body: Optional[bytes] = None) -> Tuple[int, bytes]:
+        """Send one request and read its whole response"""
+        if not self.is_open:
+            await self.open()
+        head = [f'{method} {path} HTTP/1.1', f'Host: {self.host}:{self.port}', 'Connection: keep-alive',
+                'Accept: application/json']
+        if body is not None:
+            head += ['Content-Type: application/json', f'Content-Length: {len(body)}']
+        self.writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + (body or b''))
+        await self.writer.drain()
+        self.requests += 1
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise asyncio.IncompleteReadError(b'', None)
+        status = int(status_line.split()[1])
+        headers = await read_headers(self.reader)
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            payload = bytearray()
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    await read_headers(self.reader)  # Trailers
+                    break
+                payload += await self.reader.readexactly(size)
+                await self.reader.readexactly(2)
+            payload = bytes(payload)
+        elif 'content-length' in headers:
+            payload = await self.reader.readexactly(int(headers['content-length']))
+        elif method == 'HEAD' or status in (204, 304):
+            payload = b''
+        else:
+            payload = await self.reader.read()
+            self.close()
+
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+        return status, payload
+
+
+async def read_headers(reader: asyncio.StreamReader) -> Dict[str, str]:
+    """Header block up to the blank line, with lower-cased names"""
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            return headers
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+
+class ConnectionPool:
+    """
+    At most size keep-alive connections to one server, opened on demand
+
+    A request waits for a free connection when all of them are busy; those waits are
+    counted, since they mean the server (or the pool) is not keeping up.
+    """
+
+    def __init__(self, base_url: str, size: int = DEFAULT_CONNECTIONS, timeout: float = DEFAULT_TIMEOUT):
+        self.host, self.port, self.tls, self.prefix = split_url(base_url)
+        self.size = size
+        self.timeout = timeout
+        self._idle: List[HttpConnection] = []
+        self._slots = asyncio.Semaphore(size)
+        self.opened = 0
+        self.waits = 0
+        self.retries = 0
+
+    async def request(self, method: str, path: str, body: Optional[bytes] = None) -> Response:
+        if self._slots.locked():
+            self.waits += 1
+        async with self._slots:
+            # Most recently used first, so idle connections age out on the server side
+            connection = self._idle.pop() if self._idle else None
+            start = time.perf_counter()
+            for attempt in range(2):
+                if connection is None:
+                    connection = HttpConnection(self.host, self.port, self.tls)
+                    self.opened += 1
+                reused = connection.is_open and connection.requests > 0
+                try:
+                    status, payload = await asyncio.wait_for(
+                        connection.request(method, self.prefix + path, body), self.timeout)
+                except asyncio.TimeoutError:
+                    connection.close()
+                    return Response(0, b'', time.perf_counter() - start, 'timeout')
+                except CONNECTION_ERRORS as e:
+                    connection.close()
+                    connection = None
+                    # The server may have closed an idle keep-alive connection; retry once on a new one
+                    if reused and attempt == 0:
+                        self.retries += 1
+                        continue
+                    return Response(0, b'', time.perf_counter() - start, type(e).__name__)
+                if connection.is_open:
+                    self._idle.append(connection)
+                return Response(status, payload, time.perf_counter() - start)
+
+    def close(self) -> None:
+        for connection in self._idle:
+            connection.close()
+        self._idle.clear()
+
+
+class LoadStats:
+    """Per-route latencies, statuses and schedule lag of an open-loop run"""
+
+    def __init__(self):
+        self.latency: Dict[str, List[float]] = {}
+        self.total_latency: Dict[str, List[float]] = {}
+        self.statuses: Dict[str, Dict[str, int]] = {}
+        self.lag: List[float] = []
+        self.stalls = 0
+        self.stalled_seconds = 0.0
+        self.max_pending = 0
+
+    def record(self, route: str, response: Response, total_latency: float) -> None:
+        """total_latency runs from the scheduled send time, so it includes time spent queued"""
+        self.latency.setdefault(route, []).append(response.latency)
+        self.total_latency.setdefault(route, []).append(total_latency)
+        key = str(response.status) if response.error is None else response.error
+        counts = self.statuses.setdefault(route, {})
+        counts[key] = counts.get(key, 0) + 1
+
+    @staticmethod
+    def _distribution(values: Iterable[float]) -> Dict[str, float]:
+        """Milliseconds at PERCENTILES, plus mean and max"""
+        values = np.asarray(list(values), dtype=float) * 1000
+        if not len(values):
+            return {}
+        summary = {f'p{p}': round(float(v), 3) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+        summary.update({'mean': round(float(values.mean()), 3), 'max': round(float(values.max()), 3)})
+        return summary
+
+    def _route_summary(self, latency: List[float], total_latency: List[float], statuses: Dict[str, int],
+                       elapsed: float) -> Dict:
+        ok = sum(count for status, count in statuses.items() if status.isdigit() and int(status) < 400)
+        return {
+            'requests': len(latency),
+            'ok': ok,
+            'errors': len(latency) - ok,
+            'throughput_rps': round(len(latency) / elapsed, 2) if elapsed > 0 else None,
+            'statuses': dict(sorted(statuses.items())),
+            'latency_ms': self._distribution(latency),
+            'latency_from_schedule_ms': self._distribution(total_latency),
+        }
+
+    def summary(self, elapsed: float, pool: Optional[ConnectionPool] = None) -> Dict:
+        routes = sorted(self.latency)
+        statuses: Dict[str, int] = {}
+        for route in routes:
+            for status, count in self.statuses[route].items():
+                statuses[status] = statuses.get(status, 0) + count
+        result = {
+            'elapsed_s': round(elapsed, 3),
+            'total': self._route_summary([v for r in routes for v in self.latency[r]],
+                                         [v for r in routes for v in self.total_latency[r]], statuses, elapsed),
+            'routes': {route: self._route_summary(self.latency[route], self.total_latency[route],
+                                                  self.statuses[route], elapsed) for route in routes},
+            'backpressure': {
+                'schedule_lag_ms': self._distribution(self.lag),
+                'scheduler_stalls': self.stalls,
+                'stalled_s': round(self.stalled_seconds, 3),
+                'max_pending': self.max_pending,
+            },
+        }
+        if pool is not None:
+            result['backpressure'].update({'connections': pool.size, 'connections_opened': pool.opened,
+                                           'pool_waits': pool.waits, 'reconnect_retries': pool.retries})
+        return result
+
+
+async def run_open_loop(schedule: Iterable[ScheduledRequest], pool: ConnectionPool,
+                        max_pending: Optional[int] = None, duration: Optional[float] = None) -> Tuple[LoadStats, float]:
+    """
+    Send requests at their scheduled times, whether or not earlier ones have finished
+
+    Arrivals do not wait for responses (open loop), so a slow server shows up as growing
+    latency instead of a lower request rate. Pending requests are capped at max_pending;
+    at the cap the scheduler stalls and falls behind, which is reported as schedule lag.
+
+    Args:
+        schedule: Requests in send order, with their offsets from the start in seconds
+        pool: Connection pool to send them through
+        max_pending: Cap on scheduled but unfinished requests (default: PENDING_PER_CONNECTION per connection)
+        duration: Stop scheduling after this many seconds
+
+    Returns:
+        Statistics and the elapsed wall time in seconds
+    """
+    loop = asyncio.get_running_loop()
+    stats = LoadStats()
+    pending = asyncio.Semaphore(max_pending or pool.size * PENDING_PER_CONNECTION)
+    tasks = set()
+    start = loop.time()
+
+    async def send(route: str, method: str, path: str, body: Optional[bytes], due: float) -> None:
+        try:
+            response = await pool.request(method, path, body)
+            stats.record(route, response, loop.time() - due)
+        finally:
+            pending.release()
+
+    for offset, route, method, path, body in schedule:
+        if duration is not None and offset > duration:
+            break
+        due = start + offset
+        delay = due - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if pending.locked():
+            stats.stalls += 1
+            stalled = loop.time()
+            await pending.acquire()
+            stats.stalled_seconds += loop.time() - stalled
+        else:
+            await pending.acquire()
+        stats.lag.append(max(0.0, loop.time() - due))
+        task = loop.create_task(send(route, method, path, body, due))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        stats.max_pending = max(stats.max_pending, len(tasks))
+
+    if tasks:
+        await asyncio.gather(*tasks)
+    return stats, loop.time() - start
+
+
+def print_summary(summary: Dict, target_rate: Optional[float] = None) -> None:
+    """Throughput, latency percentiles per route and backpressure counters"""
+    total = summary['total']
+    print(f"\n📈 {total['requests']:,} requests in {summary['elapsed_s']:.2f}s: "
+          f"{total['throughput_rps']:,} req/s" + (f" (target {target_rate:,})" if target_rate else "")
+          + f", {total['errors']:,} errors")
+    width = max([len(route) for route in summary['routes']] + [5])
+    print(f"   {'route':<{width}}  {'requests':>9}  {'errors':>7}  {'p50 ms':>9}  {'p95 ms':>9}  {'p99 ms':>9}  "
+          f"{'max ms':>9}")
+    for route, row in list(summary['routes'].items()) + [('total', total)]:
+        latency = row['latency_ms']
+        print(f"   {route:<{width}}  {row['requests']:>9,}  {row['errors']:>7,}  "
+              + '  '.join(f"{latency.get(key, float('nan')):>9.2f}" for key in ('p50', 'p95', 'p99', 'max')))
+    scheduled = total['latency_from_schedule_ms']
+    if scheduled:
+        print(f"   Latency from scheduled send time: p50 {scheduled['p50']:.2f} ms, p95 {scheduled['p95']:.2f} ms, "
+              f"p99 {scheduled['p99']:.2f} ms")
+    backpressure = summary['backpressure']
+    lag = backpressure['schedule_lag_ms']
+    print(f"   Backpressure: {backpressure['scheduler_stalls']:,} scheduler stalls ({backpressure['stalled_s']:.2f}s), "
+          f"max {backpressure['max_pending']:,} pending, {backpressure.get('pool_waits', 0):,} pool waits"
+          + (f", schedule lag p99 {lag['p99']:.2f} ms" if lag else ""))
+    errors = {status: count for status, count in total['statuses'].items()
+              if not status.isdigit() or int(status) >= 400}
+    if errors:
+        print(f"   ⚠️  Errors by status: {errors}")
+
+
+def write_results(path: str, results: Dict) -> None:
+    """Save a run's settings and summary as JSON"""
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, default=str)
+
+
+# Local stand-in for the Next.js API, for exercising the client without a server
+async def _handle_stand_in(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, latency: float,
+                           counts: Dict[str, int]) -> None:
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line.strip():
+                break
+            method, target, _ = request_line.decode('latin-1').split(' ', 2)
+            headers = await read_headers(reader)
+            body = await reader.readexactly(int(headers.get('content-length', 0)))
+            path = target.split('?', 1)[0]
+            counts[path] = counts.get(path, 0) + 1
+            if latency:
+                await asyncio.sleep(latency)
+
+            status, payload = 200, {'success': True}
+            if method == 'POST' and path.endswith('/engagement/track'):
+                try:
+                    event = json.loads(body or b'{}')
+                except ValueError:
+                    event = {}
+                if not event.get('tutorId') or not event.get('eventType'):
+                    status, payload = 400, {'error': 'tutorId and eventType are required'}
+                else:
+                    payload['event'] = {'id': str(sum(counts.values())), 'tutorId': event['tutorId'],
+                                        'eventType': event['eventType'], 'timestamp': event.get('timestamp')}
+            elif method != 'GET':
+                status, payload = 405, {'error': 'Method not allowed'}
+
+            data = json.dumps(payload).encode()
+            writer.write(f'HTTP/1.1 {status} {"OK" if status == 200 else "Error"}\r\n'
+                         f'Content-Type: application/json\r\nContent-Length: {len(data)}\r\n'
+                         f'Connection: keep-alive\r\n\r\n'.encode('latin-1') + data)
+            await writer.drain()
+    except (OSError, asyncio.IncompleteReadError, ValueError, asyncio.CancelledError):
+        # Client gone, malformed request, or the stand-in shutting down
+        pass
+    finally:
+        writer.close()
+
+
+async def start_stand_in(host: str = '127.0.0.1', port: int = 0,
+                         latency_ms: float = 0.0) -> Tuple[asyncio.AbstractServer, str, Dict[str, int]]:
+    """
+    Minimal keep-alive HTTP server answering like the API routes
+
+    POST .../engagement/track validates tutorId and eventType as the real route does;
+    GET requests to any path get {"success": true}. Each response is delayed by latency_ms.
+
+    Returns:
+        The server, its base URL and a live count of requests per path
+    """
+    counts: Dict[str, int] = {}
+    server = await asyncio.start_server(
+        lambda reader, writer: _handle_stand_in(reader, writer, latency_ms / 1000, counts), host, port)
+    bound_host, bound_port = server.sockets[0].getsockname()[:2]
+    return server, f'http://{bound_host}:{bound_port}', counts
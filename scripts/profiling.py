@@ -0,0 +1,252 @@
+"""
+Profiling
+Per-stage cProfile hot functions, tracemalloc peaks and DataFrame sizes, written as a
+JSON/HTML report with optional flamegraph-compatible collapsed stacks
+"""
+
+import cProfile
+import html
+import json
+import pstats
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import os
+
+import pandas as pd
+
+
+MB = 1024 * 1024
+
+# Rows kept per stage in the hot function and allocation tables
+HOT_FUNCTIONS = 25
+TOP_ALLOCATIONS = 10
+
+# Collapsed stacks: callers walked per leaf, and the smallest share of a stage's time kept
+MAX_STACK_DEPTH = 40
+MIN_STACK_SHARE = 1e-4
+
+
+def _function_label(key) -> str:
+    """pstats function key (file, line, name) -> 'name (file.py:line)'"""
+    filename, line, name = key
+    if filename == '~':
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def frame_info(result: Any) -> Optional[Dict]:
+    """Shape and deep memory size of a DataFrame result (None for anything else)"""
+    if not isinstance(result, pd.DataFrame):
+        return None
+    return {
+        'rows': len(result),
+        'columns': len(result.columns),
+        'memory_mb': round(result.memory_usage(deep=True).sum() / MB, 3),
+    }
+
+
+def hot_functions(stats: pstats.Stats, limit: int = HOT_FUNCTIONS) -> List[Dict]:
+    """Functions with the most own time"""
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:limit]
+    return [{
+        'function': _function_label(key),
+        'calls': nc,
+        'primitive_calls': cc,
+        'tottime': round(tt, 6),
+        'cumtime': round(ct, 6),
+    } for key, (cc, nc, tt, ct, _) in rows]
+
+
+def collapsed_stacks(stats: pstats.Stats, root: str) -> Dict[str, int]:
+    """
+    Approximate flamegraph stacks from cProfile's caller graph
+
+    cProfile keeps caller -> callee edges, not full stacks, so each function's own
+    time is spread over its caller chains in proportion to the time each caller
+    spent in it. Values are microseconds; tiny branches are dropped.
+
+    Args:
+        stats: Profile of one stage
+        root: Frame name placed at the bottom of every stack (the stage name)
+
+    Returns:
+        'root;caller;...;function' -> microseconds
+    """
+    entries = stats.stats
+    min_seconds = MIN_STACK_SHARE * max(stats.total_tt, 1e-9)
+    stacks: Dict[str, int] = {}
+
+    def emit(chain: List, seconds: float) -> None:
+        stack = ';'.join([root] + [_function_label(key) for key in reversed(chain)])
+        stacks[stack] = stacks.get(stack, 0) + int(round(seconds * 1e6))
+
+    def walk(chain: List, seconds: float) -> None:
+        callers = entries.get(chain[-1], (0, 0, 0, 0, {}))[4]
+        total = sum(edge[3] for edge in callers.values())
+        if not callers or total <= 0 or len(chain) >= MAX_STACK_DEPTH:
+            emit(chain, seconds)
+            return
+        for caller, edge in callers.items():
+            share = seconds * edge[3] / total
+            if share < min_seconds:
+                continue
+            # Recursion ends the stack at the first repeated frame
+            if caller in chain:
+                emit(chain, share)
+            else:
+                walk(chain + [caller], share)
+
+    for key, (_, _, tt, _, _) in entries.items():
+        if tt >= min_seconds:
+            walk([key], tt)
+    return {stack: value for stack, value in stacks.items() if value > 0}
+
+
+def profile_call(name: str, func: Callable, args: Sequence = (), kwargs: Optional[Dict] = None,
+                 stacks: bool = False):
+    """
+    Call func under cProfile and tracemalloc
+
+    Args:
+        name: Stage name (root frame of the collapsed stacks)
+        func: Function to call as func(*args, **kwargs)
+        stacks: Also collect collapsed stacks
+
+    Returns:
+        (result, record) where record holds duration, tracemalloc peak/retained MB,
+        top allocation sites, hot functions, the result's DataFrame size and
+        optionally collapsed stacks
+    """
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    profiler = cProfile.Profile()
+    started = time.time()
+    profiler.enable()
+    try:
+        result = func(*args, **(kwargs or {}))
+    finally:
+        profiler.disable()
+        duration = time.time() - started
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        if not already_tracing:
+            tracemalloc.stop()
+
+    stats = pstats.Stats(profiler)
+    allocations = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)]).statistics('lineno')
+    record = {
+        'duration': round(duration, 6),
+        'tracemalloc_peak_mb': round((peak - baseline) / MB, 3),
+        'tracemalloc_retained_mb': round((current - baseline) / MB, 3),
+        'top_allocations': [{
+            'location': f"{os.path.basename(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+            'size_mb': round(stat.size / MB, 3),
+            'blocks': stat.count,
+        } for stat in allocations[:TOP_ALLOCATIONS]],
+        'hot_functions': hot_functions(stats),
+        'frame': frame_info(result),
+    }
+    if stacks:
+        record['collapsed_stacks'] = collapsed_stacks(stats, name)
+    return result, record
+
+
+def _html_table(headers: List[str], rows: List[List[Any]]) -> str:
+    head = ''.join(f'<th>{html.escape(str(header))}</th>' for header in headers)
+    body = ''.join('<tr>' + ''.join(f'<td>{html.escape(str(cell))}</td>' for cell in row) + '</tr>'
+                   for row in rows)
+    return f'<table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>'
+
+
+def write_report(records: Dict[str, Dict], output_dir: str, name: str = 'profile') -> List[str]:
+    """
+    Write <name>.json and <name>.html, plus <name>_stacks.txt when stacks were collected
+
+    The stacks file uses the collapsed format read by flamegraph.pl and speedscope.
+
+    Returns:
+        Paths written
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+
+    report = {stage: {key: value for key, value in record.items() if key != 'collapsed_stacks'}
+              for stage, record in records.items()}
+    json_path = os.path.join(output_dir, f'{name}.json')
+    with open(json_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    paths.append(json_path)
+
+    summary = [[
+        stage,
+        f"{record['duration']:.3f}",
+        f"{record['tracemalloc_peak_mb']:.1f}",
+        f"{record['tracemalloc_retained_mb']:.1f}",
+        f"{record['frame']['rows']:,} × {record['frame']['columns']}" if record['frame'] else '—',
+        f"{record['frame']['memory_mb']:.1f}" if record['frame'] else '—',
+    ] for stage, record in report.items()]
+    sections = [
+        '<h1>Profile report</h1>',
+        _html_table(['stage', 'time (s)', 'tracemalloc peak (MB)', 'retained (MB)', 'DataFrame', 'DataFrame (MB)'],
+                    summary),
+    ]
+    for stage, record in report.items():
+        sections.append(f'<h2>{html.escape(stage)}</h2>')
+        sections.append(_html_table(
+            ['function', 'calls', 'own time (s)', 'cumulative (s)'],
+            [[row['function'], row['calls'], f"{row['tottime']:.4f}", f"{row['cumtime']:.4f}"]
+             for row in record['hot_functions']]))
+        if record['top_allocations']:
+            sections.append(_html_table(
+                ['allocated at (retained)', 'MB', 'blocks'],
+                [[row['location'], f"{row['size_mb']:.2f}", row['blocks']] for row in record['top_allocations']]))
+    style = ('body{font-family:sans-serif;margin:2em}table{border-collapse:collapse;margin-bottom:1.5em}'
+             'td,th{border:1px solid #ccc;padding:2px 8px;text-align:left}th{background:#f3f3f3}')
+    html_path = os.path.join(output_dir, f'{name}.html')
+    with open(html_path, 'w') as f:
+        f.write(f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>Profile report</title>'
+                f'<style>{style}</style></head><body>{"".join(sections)}</body></html>')
+    paths.append(html_path)
+
+    if any('collapsed_stacks' in record for record in records.values()):
+        stacks_path = os.path.join(output_dir, f'{name}_stacks.txt')
+        with open(stacks_path, 'w') as f:
+            for record in records.values():
+                for stack, value in record.get('collapsed_stacks', {}).items():
+                    f.write(f"{stack} {value}\n")
+        paths.append(stacks_path)
+    return paths
+
+
+class Profiler:
+    """
+    Profiles named steps of a CLI run; a disabled Profiler just calls through
+
+    Usage:
+        profiler = Profiler(enabled=args.profile, stacks=args.profile_stacks)
+        df = profiler.call('generate', generate_something, arg1, arg2)
+        profiler.save(output_dir)
+    """
+
+    def __init__(self, enabled: bool = True, stacks: bool = False):
+        self.enabled = enabled
+        self.stacks = stacks
+        self.records: Dict[str, Dict] = {}
+
+    def call(self, name: str, func: Callable, *args, **kwargs) -> Any:
+        if not self.enabled:
+            return func(*args, **kwargs)
+        result, self.records[name] = profile_call(name, func, args, kwargs, stacks=self.stacks)
+        return result
+
+    def save(self, output_dir: str, name: str = 'profile') -> List[str]:
+        """Write the report (no-op when disabled) and print where it went"""
+        if not self.enabled:
+            return []
+        paths = write_report(self.records, output_dir, name)
+        print(f"🔬 Profile report: {', '.join(paths)}")
+        return paths
@@ -0,0 +1,192 @@
+"""
+Event Replay
+Streams generated engagement events to the tracking API (app/api/engagement/track) in
+timestamp order, compressed in time, to load-test ingestion with correlated traffic
+"""
+
+import asyncio
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from data_io import OUTPUT_FORMATS, read_frame
+from generate_engagement_events import generate_engagement_events
+from http_load import (DEFAULT_CONNECTIONS, DEFAULT_TIMEOUT, ConnectionPool, ScheduledRequest, print_summary,
+                       run_open_loop, start_stand_in, write_results)
+from schema import format_ids, id_widths
+
+
+TRACK_PATH = '/api/engagement/track'
+# Default time compression: one hour of generated activity per second
+DEFAULT_SPEEDUP = 3600.0
+
+
+def find_dataset(data_dir: str, name: str) -> Optional[str]:
+    """Path of a generated dataset in any output format (None if missing)"""
+    for extension in OUTPUT_FORMATS.values():
+        path = os.path.join(data_dir, name + extension)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def load_events(data_dir: str, seed: int = 42) -> pd.DataFrame:
+    """
+    Engagement events of a generated dataset, with tutor IDs formatted as in the files
+
+    Without a saved engagement_events file the events are generated from the saved
+    tutors and sessions with EngagementEventsGenerator, over the days the sessions span
+    (or those recorded in generator_state.json).
+    """
+    tutors_path = find_dataset(data_dir, 'tutor_profiles')
+    tutors = read_frame(tutors_path, table='tutor_profiles') if tutors_path else None
+    events_path = find_dataset(data_dir, 'engagement_events')
+    if events_path is not None:
+        events = read_frame(events_path, table='engagement_events')
+    else:
+        sessions_path = find_dataset(data_dir, 'sessions')
+        if tutors is None or sessions_path is None:
+            raise FileNotFoundError(f"No engagement_events, or tutor_profiles and sessions, in {data_dir}")
+        sessions = read_frame(sessions_path, table='sessions')
+        state_path = os.path.join(data_dir, 'generator_state.json')
+        if os.path.exists(state_path):
+            with open(state_path) as f:
+                state = json.load(f)
+            as_of, n_days = datetime.fromisoformat(state['as_of']), state['n_days']
+        else:
+            times = pd.to_datetime(sessions['session_datetime'])
+            as_of = (times.max().normalize() + timedelta(days=1)).to_pydatetime()
+            n_days = max(1, (as_of - times.min().normalize().to_pydatetime()).days)
+        events = generate_engagement_events(tutors, sessions, n_days=n_days, seed=seed, as_of=as_of)
+
+    widths = id_widths(*([tutors] if tutors is not None else []), events)
+    events = events.assign(tutor_id=format_ids(events['tutor_id'], 'tutor_id', widths.get('tutor_id')),
+                           timestamp=pd.to_datetime(events['timestamp'], format='ISO8601'))
+    return events.sort_values('timestamp', kind='stable', ignore_index=True)
+
+
+def replay_speedup(events: pd.DataFrame, speedup: float = DEFAULT_SPEEDUP,
+                   rate: Optional[float] = None) -> float:
+    """
+    Time compression factor of a replay
+
+    With a target rate (events/s), the factor that sends the events in the average
+    gaps of that rate, keeping their relative timing and bursts.
+    """
+    if rate is None or len(events) < 2:
+        return speedup
+    span = (events['timestamp'].iloc[-1] - events['timestamp'].iloc[0]).total_seconds()
+    return rate * span / (len(events) - 1) if span > 0 else float('inf')
+
+
+def replay_schedule(events: pd.DataFrame, speedup: float, max_events: Optional[int] = None) -> Iterator[ScheduledRequest]:
+    """
+    Tracking API requests at the events' timestamps divided by speedup
+
+    Request bodies are built lazily, so replays of millions of events stay small in memory.
+    """
+    if max_events is not None:
+        events = events.iloc[:max_events]
+    if not len(events):
+        return
+    times = events['timestamp'].to_numpy(dtype='datetime64[us]')
+    offsets = (times - times[0]).astype(np.int64) / 1e6
+    offsets = offsets / speedup if np.isfinite(speedup) else np.zeros(len(offsets))
+    iso = np.datetime_as_string(times, unit='ms')
+    for offset, tutor_id, event_type, event_data, timestamp in zip(
+            offsets, events['tutor_id'], events['event_type'].astype(str), events['event_data'], iso):
+        body = {'tutorId': tutor_id, 'eventType': event_type, 'timestamp': timestamp + 'Z'}
+        if isinstance(event_data, str) and event_data:
+            body['eventData'] = json.loads(event_data)
+        yield float(offset), event_type, 'POST', TRACK_PATH, json.dumps(body).encode()
+
+
+async def replay(events: pd.DataFrame, url: Optional[str] = None, speedup: float = DEFAULT_SPEEDUP,
+                 rate: Optional[float] = None, connections: int = DEFAULT_CONNECTIONS,
+                 max_pending: Optional[int] = None, max_events: Optional[int] = None,
+                 duration: Optional[float] = None, timeout: float = DEFAULT_TIMEOUT,
+                 stand_in_latency_ms: float = 0.0) -> Dict:
+    """
+    Replay events against the tracking API and measure it
+
+    Args:
+        events: Events from load_events, in timestamp order
+        url: Base URL of the app (default: start a local stand-in server)
+        speedup: Generated seconds replayed per wall-clock second
+        rate: Target events/s; overrides speedup with the factor that reaches it
+        connections: Keep-alive connections in the pool
+        max_pending: Cap on sent but unanswered events before the replay stalls
+        max_events: Replay only the first events
+        duration: Stop after this many seconds
+        timeout: Seconds before a request counts as failed
+        stand_in_latency_ms: Response delay of the stand-in server
+
+    Returns:
+        Settings and summary of the run (see LoadStats.summary)
+    """
+    server = None
+    if url is None:
+        server, url, _ = await start_stand_in(latency_ms=stand_in_latency_ms)
+    factor = replay_speedup(events.iloc[:max_events] if max_events else events, speedup, rate)
+    pool = ConnectionPool(url, size=connections, timeout=timeout)
+    try:
+        stats, elapsed = await run_open_loop(replay_schedule(events, factor, max_events), pool,
+                                             max_pending=max_pending, duration=duration)
+    finally:
+        pool.close()
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+    return {
+        'settings': {'url': url, 'stand_in': server is not None, 'speedup': factor, 'target_rate': rate,
+                     'connections': connections, 'max_pending': max_pending, 'max_events': max_events,
+                     'duration': duration, 'events_available': len(events)},
+        'summary': stats.summary(elapsed, pool),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Replay generated engagement events against the tracking API')
+    parser.add_argument('--data-dir', type=str, default='data',
+                       help='Directory with the generated files (default: data)')
+    parser.add_argument('--url', type=str, default=None,
+                       help='Base URL of the app, e.g. http://localhost:3000 (default: a local stand-in server)')
+    parser.add_argument('--speedup', type=float, default=DEFAULT_SPEEDUP,
+                       help=f'Generated seconds replayed per second (default: {DEFAULT_SPEEDUP:g})')
+    parser.add_argument('--rate', type=float, default=None,
+                       help='Target events/s; sets the speed-up that reaches it on average')
+    parser.add_argument('--connections', type=int, default=DEFAULT_CONNECTIONS,
+                       help=f'Keep-alive connections (default: {DEFAULT_CONNECTIONS})')
+    parser.add_argument('--max-pending', type=int, default=None,
+                       help='Unanswered events before the replay stalls (default: 64 per connection)')
+    parser.add_argument('--max-events', type=int, default=None, help='Replay only the first N events')
+    parser.add_argument('--duration', type=float, default=None, help='Stop after this many seconds')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                       help=f'Request timeout in seconds (default: {DEFAULT_TIMEOUT:g})')
+    parser.add_argument('--stand-in-latency-ms', type=float, default=0.0,
+                       help='Response delay of the stand-in server (default: 0)')
+    parser.add_argument('--seed', type=int, default=42,
+                       help='Seed for events generated from sessions when none are saved (default: 42)')
+    parser.add_argument('--results', type=str, default=None, help='Write settings and results to this JSON file')
+
+    args = parser.parse_args()
+
+    print(f"\n📂 Loading events from {args.data_dir}...")
+    events = load_events(args.data_dir, seed=args.seed)
+    print(f"   ✓ {len(events):,} events from {events['timestamp'].min()} to {events['timestamp'].max()}")
+
+    print(f"\n🔁 Replaying to {args.url or 'a local stand-in server'}...")
+    results = asyncio.run(replay(events, args.url, args.speedup, args.rate, args.connections, args.max_pending,
+                                 args.max_events, args.duration, args.timeout, args.stand_in_latency_ms))
+    print(f"   Speed-up {results['settings']['speedup']:,.1f}x over {args.connections} connections")
+    print_summary(results['summary'], args.rate)
+
+    if args.results:
+        write_results(args.results, {'generated_at': datetime.now().isoformat(), **results})
+        print(f"\n💾 Results saved to {args.results}")
@@ -0,0 +1,218 @@
+"""
+Schema
+Compact in-memory dtypes for generated frames: integer surrogate keys, categoricals for
+low-cardinality strings, float32 for scores and percentages, nullable booleans for flags
+that only exist for completed sessions
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, Optional
+
+
+SUBJECTS = ['Math', 'Science', 'English', 'History', 'Test Prep', 'Programming']
+GRADE_LEVELS = ['Elementary', 'Middle School', 'High School', 'College', 'Adult']
+CONNECTION_QUALITIES = ['Excellent', 'Good', 'Fair', 'Poor']
+EVENT_TYPES = ['login', 'session_scheduled', 'session_completed', 'profile_updated', 'message_sent',
+               'coaching_scheduled', 'coaching_attended', 'email_opened', 'email_clicked']
+RISK_LEVELS = ['Low', 'Medium', 'High']
+# Alphabetical, so one-hot encoding drops the same first level as for plain strings
+CERTIFICATION_LEVELS = ['Advanced', 'Basic', 'Expert']
+
+# Surrogate key column -> (output prefix, minimum digits) and in-memory integer dtype.
+# Keys stay integers inside the pipeline; writers format them as e.g. 'S000042', widening
+# past the minimum when the largest key needs more digits.
+ID_FORMATS = {
+    'tutor_id': ('T', 4),
+    'session_id': ('S', 6),
+    'event_id': ('EV', 6),
+    'intervention_id': ('INT', 4),
+}
+KEY_DTYPES = {
+    'tutor_id': np.int32,
+    'session_id': np.int64,
+    'event_id': np.int64,
+    'intervention_id': np.int32,
+}
+
+# float32 columns -> decimals their values are rounded to
+FLOAT32_DECIMALS = {
+    'student_attention_pct': 1,
+    'tutor_camera_on_pct': 1,
+    'tutor_speak_ratio': 3,
+    'screen_share_pct': 1,
+    'overall_sentiment': 3,
+    'student_sentiment': 3,
+    'tutor_sentiment': 3,
+    'empathy_score': 2,
+    'clarity_score': 2,
+    'engagement_score': 2,
+    'student_rating': 1,
+    'student_satisfaction': 1,
+}
+
+# Daily rollup metric -> sessions column it sums over completed sessions (first-session
+# ratings over completed first sessions only); see daily_rollups.py
+ROLLUP_METRICS = {
+    'rating': 'student_rating',
+    'engagement': 'engagement_score',
+    'empathy': 'empathy_score',
+    'clarity': 'clarity_score',
+    'satisfaction': 'student_satisfaction',
+    'recommend': 'would_recommend',
+    'technical_issue': 'had_technical_issues',
+    'sentiment': 'overall_sentiment',
+    'first_session_rating': 'student_rating',
+}
+ROLLUP_COUNTS = ['sessions', 'completed_sessions', 'first_sessions']
+
+SCHEMAS: Dict[str, Dict[str, object]] = {
+    'sessions': {
+        'session_id': KEY_DTYPES['session_id'],
+        'tutor_id': KEY_DTYPES['tutor_id'],
+        'scheduled_duration_min': np.int16,
+        'actual_duration_min': np.int16,
+        'subject': pd.CategoricalDtype(SUBJECTS),
+        'grade_level': pd.CategoricalDtype(GRADE_LEVELS),
+        'is_first_session': 'boolean',
+        'connection_quality': pd.CategoricalDtype(CONNECTION_QUALITIES),
+        'had_technical_issues': 'boolean',
+        'would_recommend': 'boolean',
+        **{column: np.float32 for column in FLOAT32_DECIMALS},
+    },
+    'engagement_events': {
+        'event_id': KEY_DTYPES['event_id'],
+        'tutor_id': KEY_DTYPES['tutor_id'],
+        'event_type': pd.CategoricalDtype(EVENT_TYPES),
+    },
+    'tutor_profiles': {
+        'tutor_id': KEY_DTYPES['tutor_id'],
+        'primary_subject': pd.CategoricalDtype(SUBJECTS),
+        'certification_level': pd.CategoricalDtype(CERTIFICATION_LEVELS),
+    },
+    'tutor_aggregates': {
+        'tutor_id': KEY_DTYPES['tutor_id'],
+        'churn_risk_level': pd.CategoricalDtype(RISK_LEVELS),
+    },
+    'tutor_daily_rollups': {
+        'tutor_id': KEY_DTYPES['tutor_id'],
+        'day': 'datetime64[us]',
+        **{column: np.int32 for column in ROLLUP_COUNTS},
+        **{f'{metric}_count': np.int32 for metric in ROLLUP_METRICS},
+    },
+    'experiment_assignments': {
+        'tutor_id': KEY_DTYPES['tutor_id'],
+        'experiment_id': 'category',
+        'variant': 'category',
+    },
+    'interventions': {
+        'intervention_id': KEY_DTYPES['intervention_id'],
+        'tutor_id': KEY_DTYPES['tutor_id'],
+    },
+}
+
+
+def apply_schema(df: pd.DataFrame, table: str) -> pd.DataFrame:
+    """
+    Cast a frame's columns to the table's compact dtypes
+
+    Columns the schema does not cover, or that are missing from the frame, are left
+    alone, so frames read back from CSV (object/float64 columns, 'T0001'-style IDs)
+    come out the same as freshly generated ones.
+    """
+    casts = {column: dtype for column, dtype in SCHEMAS.get(table, {}).items()
+             if column in df.columns and df[column].dtype != dtype}
+    if not casts:
+        return df
+    df = df.copy(deep=False)
+    for column, dtype in casts.items():
+        if column in ID_FORMATS and not pd.api.types.is_integer_dtype(df[column]):
+            df[column] = parse_ids(df[column], column)
+        elif dtype == 'boolean' and not pd.api.types.is_bool_dtype(df[column]):
+            # True/False/None objects, or 'True'/'False' strings read from CSV
+            df[column] = df[column].map({True: True, False: False, 'True': True, 'False': False}).astype('boolean')
+        else:
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+def float_values(values, column: Optional[str] = None) -> np.ndarray:
+    """
+    Column values as float64 with NaN for missing ones
+
+    float32 columns are rounded back to their decimals, so sums and threshold
+    comparisons see the same decimal values as before the compact schema
+    (3.4 rather than 3.4000000953674316).
+    """
+    if pd.api.types.is_extension_array_dtype(getattr(values, 'dtype', None)):
+        # Nullable booleans/integers/floats: NA becomes NaN
+        values = pd.Series(values).to_numpy(dtype=float, na_value=np.nan)
+    values = np.asarray(values)
+    if values.dtype == np.float32 and column in FLOAT32_DECIMALS:
+        return np.round(values.astype(np.float64), FLOAT32_DECIMALS[column])
+    return values.astype(np.float64)
+
+
+def id_width(column: str, max_key: int) -> int:
+    """Digits used for a key column whose largest key is max_key (never below the column's minimum)"""
+    return max(ID_FORMATS[column][1], len(str(int(max_key))))
+
+
+def format_ids(keys, column: str, width: Optional[int] = None) -> np.ndarray:
+    """
+    Integer keys -> output ID strings, vectorized (e.g. 42 -> 'S000042')
+
+    Args:
+        keys: Integer keys
+        column: Key column name in ID_FORMATS
+        width: Digits to pad to; defaults to what the largest key needs
+
+    Returns:
+        Array of strings
+    """
+    keys = np.asarray(keys, dtype=np.int64)
+    if len(keys) == 0:
+        return np.array([], dtype=str)
+    prefix = ID_FORMATS[column][0]
+    if width is None:
+        width = id_width(column, keys.max())
+    return np.char.add(prefix, np.char.zfill(keys.astype(str), width))
+
+
+def parse_ids(values, column: str) -> np.ndarray:
+    """Output ID strings (or numbers) -> integer keys in the column's key dtype"""
+    values = pd.Series(values)
+    if not pd.api.types.is_numeric_dtype(values):
+        values = values.astype(str).str[len(ID_FORMATS[column][0]):]
+    return pd.to_numeric(values).to_numpy().astype(KEY_DTYPES[column])
+
+
+def id_widths(*frames: pd.DataFrame) -> Dict[str, int]:
+    """Widths fitting the largest key of every integer key column in the given frames"""
+    widths: Dict[str, int] = {}
+    for df in frames:
+        for column in ID_FORMATS:
+            if column in df.columns and len(df) and pd.api.types.is_integer_dtype(df[column]):
+                widths[column] = max(widths.get(column, 0), id_width(column, df[column].max()))
+    return widths
+
+
+def format_frame_ids(df: pd.DataFrame, widths: Optional[Dict[str, int]] = None) -> pd.DataFrame:
+    """
+    Copy of df with its integer key columns formatted as output ID strings
+
+    Args:
+        df: Frame with integer key columns
+        widths: Key column -> digits; columns not listed are padded to fit their own largest key
+
+    Returns:
+        df unchanged when it has no integer key columns, otherwise a shallow copy
+    """
+    columns = [column for column in ID_FORMATS
+               if column in df.columns and pd.api.types.is_integer_dtype(df[column])]
+    if not columns:
+        return df
+    df = df.copy(deep=False)
+    for column in columns:
+        df[column] = format_ids(df[column].to_numpy(), column, (widths or {}).get(column))
+    return df
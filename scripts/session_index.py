@@ -0,0 +1,159 @@
+"""
+Session Index
+Sessions sorted by (tutor, session_datetime) with per-tutor offsets, shared by
+aggregates, engagement events and interventions so they parse and scan sessions once
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Iterable, Optional, Tuple
+
+from schema import float_values
+
+
+def to_microseconds(values) -> np.ndarray:
+    """Parse datetimes (strings, datetime64 or Timestamps) to int64 microseconds since the epoch"""
+    return pd.to_datetime(pd.Series(values)).values.astype('datetime64[us]').astype(np.int64)
+
+
+def timestamp_us(value) -> int:
+    """Convert a single datetime (or int64 microseconds) to int64 microseconds"""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return int(np.datetime64(pd.Timestamp(value).to_datetime64(), 'us').astype(np.int64))
+
+
+class SessionIndex:
+    """
+    Sessions sorted by (tutor_id, session_datetime)
+
+    Tutor k's sessions occupy positions offsets[k]:offsets[k + 1] of the sorted
+    arrays, in time order, so "tutor X's sessions in (t0, t1]" is two binary
+    searches. The sessions frame is referenced, never modified.
+
+    Attributes:
+        tutor_ids: Index of tutor IDs; a tutor's position is its code
+        order: Row positions into sessions_df in sorted order
+        codes: Tutor code per sorted session
+        times: Session datetime per sorted session (int64 microseconds)
+        offsets: Segment boundaries per tutor code (length n_tutors + 1)
+    """
+
+    def __init__(self, sessions_df: pd.DataFrame, tutor_ids: Optional[Iterable] = None):
+        """
+        Args:
+            sessions_df: Session data with tutor_id and session_datetime
+            tutor_ids: Tutors to index, in code order (default: tutors in session order);
+                sessions of other tutors are left out
+        """
+        self.sessions_df = sessions_df
+        if tutor_ids is None:
+            tutor_ids = sessions_df['tutor_id']
+        self.tutor_ids = pd.Index(pd.unique(pd.Series(tutor_ids)))
+
+        row_codes = self.tutor_ids.get_indexer(sessions_df['tutor_id'])
+        row_times = to_microseconds(sessions_df['session_datetime'])
+        known = np.flatnonzero(row_codes >= 0)
+        self.order = known[np.lexsort((row_times[known], row_codes[known]))]
+        self.codes = row_codes[self.order]
+        self.times = row_times[self.order]
+        self.offsets = np.searchsorted(self.codes, np.arange(len(self.tutor_ids) + 1))
+        self._columns = {}
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    @property
+    def n_tutors(self) -> int:
+        return len(self.tutor_ids)
+
+    def matches(self, tutor_ids: Iterable) -> bool:
+        """Whether the index was built for exactly these tutors in this order"""
+        return self.tutor_ids.equals(pd.Index(pd.unique(pd.Series(tutor_ids))))
+
+    def column(self, name: str) -> np.ndarray:
+        """A sessions column in sorted order (cached)"""
+        if name not in self._columns:
+            self._columns[name] = self.sessions_df[name].values[self.order]
+        return self._columns[name]
+
+    def numeric_column(self, name: str) -> np.ndarray:
+        """A sessions column in sorted order as float64, with NaN for missing values"""
+        key = (name, float)
+        if key not in self._columns:
+            values = self.column(name)
+            if values.dtype == object:
+                values = pd.to_numeric(pd.Series(values), errors='coerce').values
+            self._columns[key] = float_values(values, name)
+        return self._columns[key]
+
+    def prefix_sums(self, name: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Running sums of a numeric column in sorted order, for O(1) window means
+
+        Returns:
+            (sums, counts) of length len(self) + 1, ignoring missing values; the values
+            at sorted positions lo:hi sum to sums[hi] - sums[lo] over counts[hi] - counts[lo] rows
+        """
+        key = (name, 'prefix')
+        if key not in self._columns:
+            values = self.numeric_column(name)
+            valid = ~np.isnan(values)
+            sums = np.concatenate([[0.0], np.cumsum(np.where(valid, values, 0.0))])
+            counts = np.concatenate([[0], np.cumsum(valid)])
+            self._columns[key] = (sums, counts)
+        return self._columns[key]
+
+    def tutor_slice(self, tutor_id) -> slice:
+        """Sorted positions of one tutor's sessions (empty for unknown tutors)"""
+        code = self.tutor_ids.get_indexer([tutor_id])[0]
+        if code < 0:
+            return slice(0, 0)
+        return slice(self.offsets[code], self.offsets[code + 1])
+
+    def window(self, tutor_id, start=None, end=None, closed: str = 'right') -> slice:
+        """
+        Sorted positions of a tutor's sessions within a time window, in O(log n)
+
+        Args:
+            tutor_id: Tutor to query
+            start: Window start (datetime or int64 microseconds; None for unbounded)
+            end: Window end (datetime or int64 microseconds; None for unbounded)
+            closed: Which bounds are inclusive: 'right' (start, end], 'left' [start, end),
+                'both' or 'neither'
+
+        Returns:
+            Slice into the sorted arrays (use order[...] for sessions_df rows)
+        """
+        segment = self.tutor_slice(tutor_id)
+        times = self.times[segment]
+        lo = 0
+        hi = len(times)
+        if start is not None:
+            side = 'left' if closed in ('left', 'both') else 'right'
+            lo = np.searchsorted(times, timestamp_us(start), side=side)
+        if end is not None:
+            side = 'right' if closed in ('right', 'both') else 'left'
+            hi = np.searchsorted(times, timestamp_us(end), side=side)
+        return slice(segment.start + lo, segment.start + max(lo, hi))
+
+    def rows(self, tutor_id, start=None, end=None, closed: str = 'right') -> np.ndarray:
+        """Row positions into sessions_df of a tutor's sessions within a time window"""
+        return self.order[self.window(tutor_id, start, end, closed)]
+
+    def search(self, tutor_codes: np.ndarray, times: np.ndarray, side: str = 'left') -> np.ndarray:
+        """
+        Vectorized binary search of many (tutor code, time) queries at once
+
+        Times are rank-compressed together with the queries so (code, time) packs
+        into a single int64 and one np.searchsorted call covers every tutor segment.
+
+        Returns:
+            Sorted positions; offsets[code + 1] means the tutor has no session at or after
+            (side='left') or strictly after (side='right') the query time
+        """
+        ranks = np.unique(np.concatenate([self.times, times]), return_inverse=True)[1]
+        n_ranks = ranks.max(initial=0) + 1
+        session_keys = self.codes.astype(np.int64) * n_ranks + ranks[:len(self.times)]
+        query_keys = np.asarray(tutor_codes).astype(np.int64) * n_ranks + ranks[len(self.times):]
+        return np.searchsorted(session_keys, query_keys, side=side)
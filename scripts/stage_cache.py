@@ -0,0 +1,195 @@
+"""
+Stage Cache
+Content-addressed on-disk cache of pipeline stage results, keyed on a hash of each
+stage's parameters, code and upstream stage keys, with eviction by total size and age
+"""
+
+import hashlib
+import importlib.util
+import json
+import os
+import pickle
+import sys
+import time
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+DEFAULT_MAX_MB = 2048
+DEFAULT_MAX_AGE_DAYS = 7
+CACHE_SUFFIX = '.pkl'
+
+
+def fingerprint(value: Any) -> Any:
+    """
+    JSON-serializable stand-in for a stage parameter
+
+    Values without a stable representation fall back to repr(), which for plain objects
+    includes their address, so such stages simply never hit the cache.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, np.random.SeedSequence):
+        return {'SeedSequence': [fingerprint(value.entropy), list(value.spawn_key), value.pool_size]}
+    if isinstance(value, np.ndarray):
+        return {'ndarray': [str(value.dtype), list(value.shape), hashlib.sha256(value.tobytes()).hexdigest()]}
+    if isinstance(value, dict):
+        return {str(key): fingerprint(item) for key, item in sorted(value.items(), key=lambda item: str(item[0]))}
+    if isinstance(value, (list, tuple)):
+        return [fingerprint(item) for item in value]
+    return repr(value)
+
+
+def module_path(name: str) -> Optional[str]:
+    """Source file of a module, imported or not (None if it has none)"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return getattr(module, '__file__', None)
+    spec = importlib.util.find_spec(name)
+    return spec.origin if spec is not None and spec.has_location else None
+
+
+class StageCache:
+    """
+    Stage results stored as pickles under cache_dir/<key[:2]>/<key>.pkl
+
+    A stage's key covers its name, seed, keyword arguments, the source of its
+    function's module and of the shared modules, and the keys of the stages it
+    depends on, so an unchanged key means the stage would compute the same result.
+    Editing a module therefore invalidates the stages that run its code and everything
+    downstream of them, while upstream stages are still loaded from the cache.
+    """
+
+    def __init__(self, cache_dir: str, max_mb: float = DEFAULT_MAX_MB,
+                 max_age_days: float = DEFAULT_MAX_AGE_DAYS, code_modules: Sequence[str] = ()):
+        """
+        Args:
+            cache_dir: Directory for cached results (created on first write)
+            max_mb: Total size evict() trims the cache to, least recently used first
+            max_age_days: Entries unused for longer are evicted
+            code_modules: Modules every stage depends on (e.g. shared schema helpers)
+        """
+        self.cache_dir = cache_dir
+        self.max_mb = max_mb
+        self.max_age_days = max_age_days
+        self.code_modules = list(code_modules)
+        self._module_hashes: Dict[str, Tuple[str, str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def code_version(self, modules: Iterable[str]) -> Dict[str, str]:
+        """
+        SHA-256 of each module's source file (hashed once per cache), by file name, so a
+        script run as __main__ and the same file imported as a module share entries
+        """
+        versions = {}
+        for name in list(self.code_modules) + list(modules):
+            if name not in self._module_hashes:
+                path = module_path(name)
+                if path is None or not os.path.exists(path):
+                    self._module_hashes[name] = (name, 'unknown')
+                else:
+                    with open(path, 'rb') as f:
+                        self._module_hashes[name] = (os.path.basename(path), hashlib.sha256(f.read()).hexdigest())
+            file, digest = self._module_hashes[name]
+            versions[file] = digest
+        return versions
+
+    def key(self, name: str, func: Callable, seed: int, kwargs: Dict[str, Any],
+            dep_keys: Sequence[str], code: Sequence[str] = ()) -> str:
+        """
+        Content address of a stage result
+
+        Args:
+            name: Stage name
+            func: Stage function (its module's source is part of the code version)
+            seed: Seed the stage runs with
+            kwargs: Keyword arguments of the stage
+            dep_keys: Keys of the stages whose results are its positional arguments
+            code: Further modules whose source the stage depends on
+        """
+        description = {
+            'stage': name,
+            'function': func.__qualname__,
+            'seed': int(seed),
+            'kwargs': fingerprint(kwargs),
+            'code': self.code_version([func.__module__, *code]),
+            'deps': list(dep_keys),
+        }
+        return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + CACHE_SUFFIX)
+
+    def load(self, key: str) -> Tuple[bool, Any]:
+        """
+        Returns:
+            (True, result) on a hit, (False, None) on a miss or an unreadable entry
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                result = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            self.misses += 1
+            return False, None
+        # The modification time doubles as last use, for eviction
+        os.utime(path)
+        self.hits += 1
+        return True, result
+
+    def save(self, key: str, result: Any) -> str:
+        """Store a result atomically (concurrent runs never see partial files)"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f'{path}.{os.getpid()}.tmp'
+        with open(temporary, 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, path)
+        return path
+
+    def entries(self) -> list:
+        """(last used, size in bytes, path) per cached result, least recently used first"""
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+        for directory, _, files in os.walk(self.cache_dir):
+            for file in files:
+                if file.endswith(CACHE_SUFFIX):
+                    path = os.path.join(directory, file)
+                    stat = os.stat(path)
+                    entries.append((stat.st_mtime, stat.st_size, path))
+        return sorted(entries)
+
+    def evict(self) -> Dict[str, float]:
+        """
+        Remove entries unused for max_age_days, then the least recently used ones until
+        the cache fits in max_mb
+
+        Returns:
+            Entries removed and MB kept
+        """
+        cutoff = time.time() - self.max_age_days * 86400
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for used, size, path in entries:
+            if used >= cutoff and total <= self.max_mb * 1024 * 1024:
+                break
+            os.remove(path)
+            total -= size
+            removed += 1
+        return {'removed': removed, 'kept_mb': total / (1024 * 1024)}
+
+    def clear(self) -> int:
+        """Remove every cached result; returns the number removed"""
+        entries = self.entries()
+        for _, _, path in entries:
+            os.remove(path)
+        return len(entries)
@@ -0,0 +1,250 @@
+"""
+Stage Runner
+Runs a graph of pipeline stages with explicit dependencies, in-process or in a process pool
+"""
+
+import numpy as np
+import random
+import sys
+import time
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def stage_seed(seed: int, name: str) -> int:
+    """Deterministic per-stage seed, independent of execution order and worker count"""
+    return int(np.random.SeedSequence([seed, zlib.crc32(name.encode())]).generate_state(1)[0])
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far, in MB (NaN where unsupported)"""
+    if resource is None:
+        return float('nan')
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _run_stage(func: Callable, args: List[Any], kwargs: Dict[str, Any], seed: int,
+               profile: Optional[str] = None, stacks: bool = False):
+    """
+    Run one stage with freshly seeded global RNGs (executes in a worker process when pooled)
+
+    With profile set to the stage name, the stage runs under cProfile/tracemalloc and the
+    profile record is returned alongside the result.
+    """
+    np.random.seed(seed)
+    random.seed(seed)
+    started = time.time()
+    record = None
+    if profile:
+        from profiling import profile_call
+        result, record = profile_call(profile, func, args, dict(kwargs, seed=seed), stacks=stacks)
+    else:
+        result = func(*args, seed=seed, **kwargs)
+    return result, started, time.time(), peak_rss_mb(), record
+
+
+class Stage:
+    def __init__(self, name: str, func: Callable, deps: Sequence[str] = (),
+                 label: Optional[str] = None, summary: Optional[Callable[[Any], str]] = None,
+                 optional: bool = True, fallback: Optional[str] = None, kwargs: Dict[str, Any] = None,
+                 cache: bool = False, code: Sequence[str] = ()):
+        """
+        Args:
+            name: Unique stage name (also keys the stage's RNG seed)
+            func: Module-level function called as func(*dep_results, seed=..., **kwargs)
+            deps: Names of stages whose results are passed as positional arguments
+            label: Progress line printed when the stage starts
+            summary: Formats the result for the completion line
+            optional: Failures of optional stages are reported and skip dependents
+                instead of aborting the run
+            fallback: Dependency whose result stands in if this stage fails or is skipped
+            kwargs: Extra keyword arguments for func
+            cache: Reuse the result from the runner's StageCache while the stage's key is
+                unchanged (only for stages without side effects such as file writes)
+            code: Modules besides func's own whose source the result depends on
+        """
+        self.name = name
+        self.func = func
+        self.deps = list(deps)
+        self.label = label or name
+        self.summary = summary
+        self.optional = optional
+        self.fallback = fallback
+        self.kwargs = kwargs or {}
+        self.cache = cache
+        self.code = list(code)
+
+
+class StageRunner:
+    """
+    Dependency-ordered stage execution
+
+    Every stage gets its own seed derived from (seed, stage name) and re-seeds the
+    global numpy/random state before running, so results are the same whether
+    stages run one after another or concurrently in any number of processes.
+    """
+
+    def __init__(self, seed: int = 42, workers: int = 1, profile: bool = False, profile_stacks: bool = False,
+                 cache=None):
+        """
+        Args:
+            seed: Base seed for the per-stage seeds
+            workers: Worker processes (1 runs stages in this process)
+            profile: Profile every stage (see profiling.profile_call); records go to self.profiles
+            profile_stacks: Also collect collapsed stacks when profiling
+            cache: StageCache for stages added with cache=True (see stage_cache.py)
+        """
+        self.seed = seed
+        self.workers = max(1, workers)
+        self.profile = profile
+        self.profile_stacks = profile_stacks
+        self.profiles: Dict[str, Dict] = {}
+        self.stages: Dict[str, Stage] = {}
+        self.results: Dict[str, Any] = {}
+        self.timings: Dict[str, Dict[str, float]] = {}
+        self.failed: Dict[str, str] = {}
+        self.cache = cache
+        # Cache keys of cacheable stages, and the stages loaded from the cache
+        self.keys: Dict[str, str] = {}
+        self.cached: List[str] = []
+
+    def add(self, name: str, func: Callable, deps: Sequence[str] = (), **options) -> None:
+        """Add a stage; dependencies must already be added"""
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        missing = [dep for dep in deps if dep not in self.stages]
+        if missing:
+            raise ValueError(f"Stage {name} depends on unknown stages: {missing}")
+        self.stages[name] = Stage(name, func, deps, **options)
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Run all stages, concurrently when workers > 1
+
+        Returns:
+            Results by stage name (failed or skipped stages hold their fallback's result, if any)
+        """
+        self.run_start = time.time()
+        if self.workers == 1:
+            for stage in self.stages.values():
+                if self._ready(stage) and not self._load_cached(stage):
+                    self._start(stage)
+                    try:
+                        outcome = _run_stage(stage.func, self._args(stage), stage.kwargs,
+                                             stage_seed(self.seed, stage.name), *self._profiling(stage))
+                    except Exception as e:
+                        self._fail(stage, e)
+                    else:
+                        self._finish(stage, *outcome)
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                pending = dict(self.stages)
+                running = {}
+                while pending or running:
+                    # Submit every stage whose dependencies are settled
+                    for name, stage in list(pending.items()):
+                        if all(dep in self.results or dep in self.failed for dep in stage.deps):
+                            del pending[name]
+                            if self._ready(stage) and not self._load_cached(stage):
+                                self._start(stage)
+                                future = pool.submit(_run_stage, stage.func, self._args(stage), stage.kwargs,
+                                                     stage_seed(self.seed, stage.name), *self._profiling(stage))
+                                running[future] = stage
+                    if not running:
+                        continue
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        stage = running.pop(future)
+                        try:
+                            outcome = future.result()
+                        except Exception as e:
+                            self._fail(stage, e)
+                        else:
+                            self._finish(stage, *outcome)
+        self.wall_time = time.time() - self.run_start
+        return self.results
+
+    def _ready(self, stage: Stage) -> bool:
+        """Check dependencies; a stage with a failed dependency is skipped"""
+        failed = [dep for dep in stage.deps if dep not in self.results]
+        if failed:
+            self.failed[stage.name] = f"skipped (needs {', '.join(failed)})"
+            self._apply_fallback(stage)
+            print(f"\n   ⚠️  Skipped {stage.name}: {', '.join(failed)} failed")
+            return False
+        return True
+
+    def _load_cached(self, stage: Stage) -> bool:
+        """Compute the stage's cache key and load its result on a hit (False: run the stage)"""
+        if self.cache is None or not stage.cache or any(dep not in self.keys for dep in stage.deps):
+            return False
+        key = self.cache.key(stage.name, stage.func, stage_seed(self.seed, stage.name), stage.kwargs,
+                             [self.keys[dep] for dep in stage.deps], stage.code)
+        self.keys[stage.name] = key
+        started = time.time()
+        hit, result = self.cache.load(key)
+        if not hit:
+            return False
+        self._start(stage)
+        self.cached.append(stage.name)
+        self._finish(stage, result, started, time.time(), peak_rss_mb())
+        return True
+
+    def _args(self, stage: Stage) -> List[Any]:
+        return [self.results[dep] for dep in stage.deps]
+
+    def _profiling(self, stage: Stage) -> tuple:
+        return (stage.name if self.profile else None, self.profile_stacks)
+
+    def _start(self, stage: Stage) -> None:
+        print(f"\n{stage.label}")
+
+    def _finish(self, stage: Stage, result: Any, started: float, finished: float, peak_rss: float,
+                profile: Optional[Dict] = None) -> None:
+        self.results[stage.name] = result
+        if profile is not None:
+            self.profiles[stage.name] = profile
+        # Peak RSS is the high-water mark of the process that ran the stage, as of its end
+        self.timings[stage.name] = {'start': started - self.run_start, 'duration': finished - started,
+                                    'peak_rss_mb': peak_rss}
+        if stage.name in self.keys and stage.name not in self.cached:
+            self.cache.save(self.keys[stage.name], result)
+        message = stage.summary(result) if stage.summary else f"Finished {stage.name}"
+        source = " from cache" if stage.name in self.cached else ""
+        print(f"   ✓ {message}{source} in {finished - started:.2f}s")
+
+    def _fail(self, stage: Stage, error: Exception) -> None:
+        if not stage.optional:
+            raise error
+        self.failed[stage.name] = str(error)
+        self._apply_fallback(stage)
+        print(f"   ⚠️  Failed {stage.name}: {error}")
+
+    def _apply_fallback(self, stage: Stage) -> None:
+        if stage.fallback is not None and stage.fallback in self.results:
+            self.results[stage.name] = self.results[stage.fallback]
+            if stage.fallback in self.keys:
+                self.keys[stage.name] = self.keys[stage.fallback]
+            else:
+                self.keys.pop(stage.name, None)
+
+    def print_timings(self) -> None:
+        """Print start offset and duration per stage, in start order"""
+        print(f"\n⏱️  Stage timings ({self.workers} worker{'s' if self.workers != 1 else ''}):")
+        print(f"   {'stage':<28}{'start':>9}{'time':>9}")
+        for name, timing in sorted(self.timings.items(), key=lambda item: item[1]['start']):
+            cached = "  (cached)" if name in self.cached else ""
+            print(f"   {name:<28}{timing['start']:>8.2f}s{timing['duration']:>8.2f}s{cached}")
+        for name, reason in self.failed.items():
+            print(f"   {name:<28}{'':>9}{'—':>9}  ({reason})")
+        stage_time = sum(timing['duration'] for timing in self.timings.values())
+        print(f"   Wall time {self.wall_time:.2f}s for {stage_time:.2f}s of stage work "
+              f"({stage_time / max(self.wall_time, 1e-9):.1f}x concurrency)")
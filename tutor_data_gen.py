@@ -6,282 +6,351 @@ import sys
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import random
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Union
 import argparse
+import json
 import os
 import time
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import classification_report
+from sklearn.pipeline import Pipeline
 import matplotlib.pyplot as plt
 
+# Shared helpers and the additional generators live in scripts/
+scripts_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts')
+if os.path.exists(scripts_dir):
+    sys.path.insert(0, scripts_dir)
+else:
+    # Fallback: try current directory
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from churn_model import (DEFAULT_CHUNK_ROWS, DEFAULT_EPOCHS, FEATURES, SIGNAL_NOISE, TRAINING_MODES,
+                         calibrate_probability, churn_features, churn_labels, data_fingerprint,
+                         format_probability_map, iter_training_chunks, load_model, model_coefficients, risk_levels,
+                         save_model, score_churn, signal_probability, train_incremental, tutor_features)
+from daily_rollups import daily_rollups, merge_rollups, window_mean, window_totals
+from data_io import append_frame, output_path, read_frame, write_frame
+from db_loader import DEFAULT_BATCH_ROWS, LOAD_TABLES
+from schema import (FLOAT32_DECIMALS, GRADE_LEVELS, ID_FORMATS, SCHEMAS, SUBJECTS, apply_schema, id_width,
+                    id_widths)
+from session_index import SessionIndex
+from stage_cache import DEFAULT_MAX_AGE_DAYS, DEFAULT_MAX_MB, StageCache
+from stage_runner import StageRunner, stage_seed
+
 class TutorDataGenerator:
-    def __init__(self, seed: int = 42):
-        np.random.seed(seed)
-        random.seed(seed)
+    def __init__(self, seed: Union[int, np.random.SeedSequence] = 42, as_of: Optional[datetime] = None):
+        # Own random stream (seed may be a SeedSequence spawned per shard) and a fixed
+        # reference time, so the generator never touches global state
+        self.rng = np.random.default_rng(seed)
+        self.as_of = as_of or datetime.now()
         
         # Realistic constraints from PRD
-        self.subjects = ['Math', 'Science', 'English', 'History', 'Test Prep', 'Programming']
-        self.grade_levels = ['Elementary', 'Middle School', 'High School', 'College', 'Adult']
+        self.subjects = list(SUBJECTS)
+        self.grade_levels = list(GRADE_LEVELS)
         
-    def generate_tutor_profiles(self, n_tutors: int = 150) -> pd.DataFrame:
-        """Generate tutor profile data with realistic distributions"""
+        # Per-metric trend ranges by reliability tier: < 0.6, mid-range, > 0.8
+        self.trend_bounds = {
+            'engagement': [(-0.15, -0.05), (-0.08, 0.05), (-0.02, 0.10)],
+            'empathy': [(-0.12, -0.03), (-0.06, 0.04), (-0.02, 0.08)],
+            'clarity': [(-0.13, -0.04), (-0.07, 0.05), (-0.01, 0.09)],
+            'satisfaction': [(-0.14, -0.05), (-0.08, 0.06), (-0.02, 0.10)]
+        }
         
-        tutors = []
-        for tutor_id in range(1, n_tutors + 1):
-            # Experience follows power law (many new, few veterans)
-            months_experience = int(np.random.gamma(shape=2, scale=12))
-            months_experience = max(1, min(months_experience, 120))  # Cap at 10 years
-            
-            # Total sessions correlates with experience
-            base_sessions = months_experience * np.random.uniform(8, 25)
-            total_sessions = int(base_sessions * np.random.uniform(0.7, 1.3))
-            
-            # Base reliability (most tutors are reliable)
-            base_reliability = np.random.beta(a=8, b=2)  # Skewed toward high reliability
-            
-            # Historical rating (correlates with experience and reliability)
-            experience_bonus = min(months_experience / 60, 0.15)  # Up to +0.15 for experience
-            avg_historical_rating = np.clip(
-                3.5 + base_reliability * 1.2 + experience_bonus + np.random.normal(0, 0.15),
-                2.0, 5.0
-            )
-            
-            # Reschedule rate (inverse correlation with reliability)
-            reschedule_rate = np.clip(
-                (1 - base_reliability) * 0.25 + np.random.uniform(0, 0.05),
-                0.0, 0.35
-            )
-            
-            # No-show count (rare but impactful - 16% have issues per PRD)
-            has_no_show_issue = np.random.random() < 0.16
-            no_show_count = int(np.random.poisson(3)) if has_no_show_issue else 0
-            
-            # Subject specialization
-            primary_subject = random.choice(self.subjects)
-            num_subjects = np.random.choice([1, 2, 3], p=[0.4, 0.4, 0.2])
-            subjects_taught = random.sample(self.subjects, num_subjects)
-            if primary_subject not in subjects_taught:
-                subjects_taught[0] = primary_subject
-            
-            tutors.append({
-                'tutor_id': f'T{tutor_id:04d}',
-                'months_experience': months_experience,
-                'total_sessions_completed': total_sessions,
-                'avg_historical_rating': round(avg_historical_rating, 2),
-                'subjects_taught': ','.join(subjects_taught),
-                'primary_subject': primary_subject,
-                'reschedule_rate': round(reschedule_rate, 3),
-                'no_show_count': no_show_count,
-                'reliability_score': round(base_reliability, 3),
-                'certification_level': np.random.choice(['Basic', 'Advanced', 'Expert'], 
-                                                       p=[0.5, 0.35, 0.15]),
-                'active_status': np.random.choice([True, False], p=[0.92, 0.08]),
-                'last_login': None  # Will be updated later from engagement events
-            })
-        
-        return pd.DataFrame(tutors)
-    
-    def generate_sessions(self, tutors_df: pd.DataFrame, 
-                         n_days: int = 30, 
-                         sessions_per_day: int = 750) -> pd.DataFrame:
-        """Generate session data with realistic patterns and correlations (vectorized)"""
+    def generate_tutor_profiles(self, n_tutors: int = 150, first_tutor_number: int = 1) -> pd.DataFrame:
+        """Generate tutor profile data with realistic distributions (IDs start at first_tutor_number)"""
         
-        start_date = datetime.now() - timedelta(days=n_days)
+        # Each attribute is drawn for every tutor at once
+        tutor_ids = np.arange(first_tutor_number, first_tutor_number + n_tutors)
         
-        # Calculate total sessions accounting for weekends
-        total_sessions = 0
-        session_days = []
-        for day in range(n_days):
-            current_date = start_date + timedelta(days=day)
-            day_of_week = current_date.weekday()
-            daily_sessions = int(sessions_per_day * 0.7) if day_of_week >= 5 else sessions_per_day
-            total_sessions += daily_sessions
-            session_days.extend([day] * daily_sessions)
+        # Experience follows power law (many new, few veterans)
+        months_experience = self.rng.gamma(shape=2, scale=12, size=n_tutors).astype(int)
+        months_experience = np.clip(months_experience, 1, 120)  # Cap at 10 years
         
-        session_days = np.array(session_days)
+        # Total sessions correlates with experience
+        base_sessions = months_experience * self.rng.uniform(8, 25, n_tutors)
+        total_sessions = (base_sessions * self.rng.uniform(0.7, 1.3, n_tutors)).astype(int)
         
-        # Prepare tutor data for vectorized selection
-        active_tutors = tutors_df[tutors_df['active_status'] == True].copy()
-        tutor_weights = active_tutors['total_sessions_completed'].values
-        tutor_weights = tutor_weights / tutor_weights.sum()  # Normalize
+        # Base reliability (most tutors are reliable)
+        base_reliability = self.rng.beta(a=8, b=2, size=n_tutors)  # Skewed toward high reliability
+        
+        # Historical rating (correlates with experience and reliability)
+        experience_bonus = np.minimum(months_experience / 60, 0.15)  # Up to +0.15 for experience
+        avg_historical_rating = np.clip(
+            3.5 + base_reliability * 1.2 + experience_bonus + self.rng.normal(0, 0.15, n_tutors),
+            2.0, 5.0
+        )
         
-        # Create tutor lookup arrays
-        tutor_ids_array = active_tutors['tutor_id'].values
-        tutor_idx_to_id = {i: tid for i, tid in enumerate(tutor_ids_array)}
+        # Reschedule rate (inverse correlation with reliability)
+        reschedule_rate = np.clip(
+            (1 - base_reliability) * 0.25 + self.rng.uniform(0, 0.05, n_tutors),
+            0.0, 0.35
+        )
+        
+        # No-show count (rare but impactful - 16% have issues per PRD)
+        has_no_show_issue = self.rng.random(n_tutors) < 0.16
+        no_show_count = np.where(has_no_show_issue, self.rng.poisson(3, n_tutors), 0)
         
-        # Pre-build tutor attribute arrays for fast lookup
-        tutor_reliability = active_tutors['reliability_score'].values
-        tutor_no_show_count = active_tutors['no_show_count'].values
-        tutor_months_exp = active_tutors['months_experience'].values
-        tutor_subjects_dict = {row['tutor_id']: row['subjects_taught'].split(',') 
-                              for _, row in active_tutors.iterrows()}
+        # Subject specialization: the first num_subjects of a random permutation of the
+        # subjects per tutor, with the primary subject in the first slot if not among them
+        n_subjects = len(self.subjects)
+        primary_codes = self.rng.integers(0, n_subjects, n_tutors)
+        num_subjects = self.rng.choice([1, 2, 3], size=n_tutors, p=[0.4, 0.4, 0.2])
+        taught_codes = np.argsort(self.rng.random((n_tutors, n_subjects)), axis=1)[:, :3]
+        in_taught = ((taught_codes == primary_codes[:, None]) & (np.arange(3) < num_subjects[:, None])).any(axis=1)
+        taught_codes[:, 0] = np.where(in_taught, taught_codes[:, 0], primary_codes)
+        
+        # Join names per distinct (codes, count) combination rather than per tutor
+        combo = (taught_codes * n_subjects ** np.arange(3)).sum(axis=1) * 4 + num_subjects
+        combos, combo_codes = np.unique(combo, return_inverse=True)
+        combo_names = np.array([
+            ','.join(self.subjects[(value // 4) // n_subjects ** slot % n_subjects] for slot in range(value % 4))
+            for value in combos
+        ], dtype=object)
+        
+        return apply_schema(pd.DataFrame({
+            'tutor_id': tutor_ids,
+            'months_experience': months_experience,
+            'total_sessions_completed': total_sessions,
+            'avg_historical_rating': np.round(avg_historical_rating, 2),
+            'subjects_taught': combo_names[combo_codes],
+            'primary_subject': np.array(self.subjects, dtype=object)[primary_codes],
+            'reschedule_rate': np.round(reschedule_rate, 3),
+            'no_show_count': no_show_count,
+            'reliability_score': np.round(base_reliability, 3),
+            'certification_level': self.rng.choice(np.array(['Basic', 'Advanced', 'Expert'], dtype=object),
+                                                   size=n_tutors, p=[0.5, 0.35, 0.15]),
+            'active_status': self.rng.random(n_tutors) < 0.92,
+            'last_login': np.full(n_tutors, None, dtype=object)  # Will be updated later from engagement events
+        }), 'tutor_profiles')
+    
+    def _build_session_params(self, tutors_df: pd.DataFrame, n_days: int) -> Dict:
+        """Draw per-tutor and per-day session parameters as arrays aligned to active tutors"""
+        
+        active_tutors = tutors_df[tutors_df['active_status'] == True]
+        n_active = len(active_tutors)
+        
+        tutor_weights = active_tutors['total_sessions_completed'].values.astype(float)
+        tutor_weights = tutor_weights / tutor_weights.sum()  # Normalize
+        tutor_reliability = active_tutors['reliability_score'].values.astype(float)
+        
+        # Subjects as a padded code matrix (-1 marks unused slots)
+        subject_matrix = active_tutors['subjects_taught'].str.split(',', expand=True)
+        subject_codes = np.column_stack([
+            pd.Categorical(subject_matrix[col], categories=self.subjects).codes
+            for col in subject_matrix.columns
+        ]) if n_active else np.zeros((0, 1), dtype=np.int8)
+        subject_counts = (subject_codes >= 0).sum(axis=1)
         
         # Create tutor-specific peak hours (some morning, some evening)
-        tutor_peak_hours = {}
-        for idx, tutor_id in enumerate(tutor_ids_array):
-            reliability = tutor_reliability[idx]
-            # Morning people: 35% of tutors prefer 8-12am
-            # Evening people: 65% prefer 3-9pm
-            is_morning_person = np.random.random() < 0.35
-            if is_morning_person:
-                preferred_start = random.choice([8, 9, 10])
-                preferred_end = preferred_start + 4
-            else:
-                preferred_start = random.choice([15, 16, 17, 18])
-                preferred_end = min(preferred_start + 4, 21)
-            
-            tutor_peak_hours[tutor_id] = {
-                'preferred_start': preferred_start,
-                'preferred_end': preferred_end,
-                'is_morning': is_morning_person
-            }
+        # Morning people: 35% of tutors prefer 8-12am
+        # Evening people: 65% prefer 3-9pm
+        is_morning = self.rng.random(n_active) < 0.35
+        preferred_start = np.where(
+            is_morning,
+            self.rng.choice([8, 9, 10], size=n_active),
+            self.rng.choice([15, 16, 17, 18], size=n_active)
+        )
+        preferred_end = np.where(is_morning, preferred_start + 4, np.minimum(preferred_start + 4, 21))
         
         # Generate tutor-specific trends based on reliability
+        # Lower reliability tutors have declining trends (tier 0), higher reliability
+        # tutors improve or stay stable (tier 2), mid-range tutors have mixed trends (tier 1)
+        trend_tier = np.where(tutor_reliability < 0.6, 0, np.where(tutor_reliability > 0.8, 2, 1))
         tutor_trends = {}
-        for idx, tutor_id in enumerate(tutor_ids_array):
-            reliability = tutor_reliability[idx]
-            
-            # Lower reliability tutors have declining trends
-            if reliability < 0.6:
-                engagement_trend = np.random.uniform(-0.15, -0.05)
-                empathy_trend = np.random.uniform(-0.12, -0.03)
-                clarity_trend = np.random.uniform(-0.13, -0.04)
-                satisfaction_trend = np.random.uniform(-0.14, -0.05)
-            # Higher reliability tutors improve or stay stable
-            elif reliability > 0.8:
-                engagement_trend = np.random.uniform(-0.02, 0.10)
-                empathy_trend = np.random.uniform(-0.02, 0.08)
-                clarity_trend = np.random.uniform(-0.01, 0.09)
-                satisfaction_trend = np.random.uniform(-0.02, 0.10)
-            # Mid-range tutors have mixed trends
-            else:
-                engagement_trend = np.random.uniform(-0.08, 0.05)
-                empathy_trend = np.random.uniform(-0.06, 0.04)
-                clarity_trend = np.random.uniform(-0.07, 0.05)
-                satisfaction_trend = np.random.uniform(-0.08, 0.06)
-            
-            tutor_trends[tutor_id] = {
-                'engagement': engagement_trend,
-                'empathy': empathy_trend,
-                'clarity': clarity_trend,
-                'satisfaction': satisfaction_trend
-            }
+        for metric, bounds in self.trend_bounds.items():
+            bounds = np.array(bounds)
+            tutor_trends[metric] = self.rng.uniform(bounds[trend_tier, 0], bounds[trend_tier, 1])
         
         # Generate daily variance factors for each metric
         daily_variance = {
-            'engagement': np.random.uniform(0.85, 1.15, n_days),
-            'empathy': np.random.uniform(0.92, 1.08, n_days),
-            'clarity': np.random.uniform(0.90, 1.10, n_days),
-            'satisfaction': np.random.uniform(0.88, 1.12, n_days)
+            'engagement': self.rng.uniform(0.85, 1.15, n_days),
+            'empathy': self.rng.uniform(0.92, 1.08, n_days),
+            'clarity': self.rng.uniform(0.90, 1.10, n_days),
+            'satisfaction': self.rng.uniform(0.88, 1.12, n_days)
+        }
+        
+        return {
+            'tutor_ids': active_tutors['tutor_id'].values,
+            'tutor_weights': tutor_weights,
+            'reliability': tutor_reliability,
+            'no_show_count': active_tutors['no_show_count'].values,
+            'months_experience': active_tutors['months_experience'].values,
+            'subject_codes': subject_codes,
+            'subject_counts': subject_counts,
+            'preferred_start': preferred_start,
+            'preferred_end': preferred_end,
+            'tutor_trends': tutor_trends,
+            'daily_variance': daily_variance,
+            # Trends run over trend_days; day 0 of this window is day first_day of the trend
+            'trend_days': n_days,
+            'first_day': 0
         }
+    
+    def resume_session_params(self, tutors_df: pd.DataFrame, state: Dict, n_days: int) -> Dict:
+        """
+        Session parameters for the n_days after a saved run (see generator_state)
+        
+        Tutors keep their saved peak hours and trends, and the trends continue along the
+        original time axis; daily variance is drawn for the new days. Tutors missing from
+        the state get fresh parameters.
+        """
+        params = self._build_session_params(tutors_df, n_days)
+        saved = state['tutors']
+        positions = pd.Index(saved['tutor_id']).get_indexer(params['tutor_ids'])
+        known = positions >= 0
+        for key in ('preferred_start', 'preferred_end'):
+            params[key] = np.where(known, np.asarray(saved[key])[positions], params[key])
+        for metric in params['tutor_trends']:
+            params['tutor_trends'][metric] = np.where(known, np.asarray(saved['trends'][metric])[positions],
+                                                      params['tutor_trends'][metric])
+        params['trend_days'] = state['trend_days']
+        params['first_day'] = state['n_days']
+        return params
+    
+    def generate_sessions(self, tutors_df: pd.DataFrame, 
+                         n_days: int = 30, 
+                         sessions_per_day: int = 750,
+                         first_session_number: int = 1,
+                         params: Optional[Dict] = None) -> pd.DataFrame:
+        """Generate session data with realistic patterns and correlations (vectorized)"""
+        
+        return next(self.iter_sessions(tutors_df, n_days, sessions_per_day, chunk_days=max(n_days, 1),
+                                       first_session_number=first_session_number, params=params))
+    
+    def iter_sessions(self, tutors_df: pd.DataFrame,
+                      n_days: int = 30,
+                      sessions_per_day: int = 750,
+                      chunk_days: int = 1,
+                      max_chunk_rows: Optional[int] = None,
+                      first_session_number: int = 1,
+                      params: Optional[Dict] = None) -> Iterator[pd.DataFrame]:
+        """
+        Generate sessions as a stream of bounded chunks
+        
+        Per-tutor peak hours, trends and the daily variance factors are drawn once up
+        front and shared by every chunk, so concatenating the chunks follows the same
+        distribution as a single generate_sessions call. Session IDs continue across chunks.
+        
+        Args:
+            tutors_df: DataFrame with tutor profiles
+            n_days: Number of days to generate sessions for
+            sessions_per_day: Weekday session volume (weekends run at 70%)
+            chunk_days: Maximum number of days per chunk
+            max_chunk_rows: Optional maximum number of sessions per chunk
+            first_session_number: Number of the first session ID (for tutor shards)
+            params: Session parameters to use instead of fresh draws (resume_session_params)
+        
+        Yields:
+            DataFrames of sessions in chronological day order
+        """
+        start_date = self.as_of - timedelta(days=n_days)
+        params = params or self._build_session_params(tutors_df, n_days)
+        daily_sessions = self.daily_session_counts(start_date, n_days, sessions_per_day)
+        
+        sessions_emitted = first_session_number - 1
+        for first_day in range(0, max(n_days, 1), max(chunk_days, 1)):
+            days = np.arange(first_day, min(first_day + max(chunk_days, 1), n_days))
+            session_days = np.repeat(days, daily_sessions[days])
+            step = max_chunk_rows or max(len(session_days), 1)
+            for offset in range(0, max(len(session_days), 1), step):
+                chunk_days_arr = session_days[offset:offset + step]
+                yield self._synthesize_sessions(params, chunk_days_arr, start_date, n_days,
+                                                first_session_number=sessions_emitted + 1)
+                sessions_emitted += len(chunk_days_arr)
+    
+    @classmethod
+    def daily_session_counts(cls, start_date: datetime, n_days: int, sessions_per_day: int) -> np.ndarray:
+        """Sessions per day offset from start_date; weekends run at 70% of weekday volume"""
+        return np.where(cls._weekend_days(start_date, n_days), int(sessions_per_day * 0.7), sessions_per_day)
+    
+    @staticmethod
+    def _weekend_days(start_date: datetime, n_days: int) -> np.ndarray:
+        """Boolean array marking which day offsets from start_date fall on a weekend"""
+        first_day = np.datetime64(start_date.date(), 'D').astype(np.int64)
+        # 1970-01-01 was a Thursday (weekday 3)
+        return (first_day + np.arange(n_days) + 3) % 7 >= 5
+    
+    def _synthesize_sessions(self, params: Dict, session_days: np.ndarray,
+                             start_date: datetime, n_days: int,
+                             first_session_number: int = 1) -> pd.DataFrame:
+        """Build the sessions frame for the given day offsets from per-tutor parameter arrays"""
+        
+        total_sessions = len(session_days)
         
         # Vectorized tutor selection (weighted by total_sessions_completed)
-        tutor_indices = np.random.choice(len(active_tutors), size=total_sessions, p=tutor_weights)
-        tutor_ids = tutor_ids_array[tutor_indices]
+        tutor_indices = self.rng.choice(len(params['tutor_ids']), size=total_sessions,
+                                         p=params['tutor_weights'])
+        tutor_ids = params['tutor_ids'][tutor_indices]
         
         # Get tutor attributes for each session
-        tutor_reliability_arr = tutor_reliability[tutor_indices]
-        tutor_no_show_count_arr = tutor_no_show_count[tutor_indices]
-        tutor_months_exp_arr = tutor_months_exp[tutor_indices]
-        
-        # Pre-generate all random values with tutor-specific peak hours
-        hours = []
-        for tutor_id in tutor_ids:
-            pattern = tutor_peak_hours[tutor_id]
-            preferred_start = pattern['preferred_start']
-            preferred_end = pattern['preferred_end']
-            
-            # 70% of sessions in preferred hours, 30% outside
-            if np.random.random() < 0.7:
-                # Within preferred hours
-                hour = random.randint(preferred_start, preferred_end)
-            else:
-                # Outside preferred hours (struggling tutors more likely to take odd hours)
-                tutor_idx = tutor_ids_array.tolist().index(tutor_id)
-                reliability = tutor_reliability[tutor_idx]
-                if reliability < 0.6:
-                    # Struggling tutors take odd hours more often
-                    hour = random.choice([6, 7, 22, 23] + list(range(9, 22)))
-                else:
-                    # Regular tutors take standard hours
-                    hour = random.choice(range(9, 22))
-            
-            hours.append(hour)
+        tutor_reliability_arr = params['reliability'][tutor_indices]
+        tutor_no_show_count_arr = params['no_show_count'][tutor_indices]
+        tutor_months_exp_arr = params['months_experience'][tutor_indices]
+        is_weekend = self._weekend_days(start_date, n_days)[session_days]
         
-        hours = np.array(hours)
-        minutes = np.random.randint(0, 60, size=total_sessions)
+        # 70% of sessions in the tutor's preferred hours, 30% outside
+        preferred_start = params['preferred_start'][tutor_indices]
+        preferred_end = params['preferred_end'][tutor_indices]
+        in_preferred = self.rng.random(size=total_sessions) < 0.7
+        preferred_hours = self.rng.integers(preferred_start, preferred_end + 1)
+        
+        # Outside preferred hours, struggling tutors take odd hours more often
+        odd_hours = np.array([6, 7, 22, 23] + list(range(9, 22)))
+        standard_hours = np.arange(9, 22)
+        outside_draw = self.rng.random(size=total_sessions)
+        outside_hours = np.where(
+            tutor_reliability_arr < 0.6,
+            odd_hours[(outside_draw * len(odd_hours)).astype(int)],
+            standard_hours[(outside_draw * len(standard_hours)).astype(int)]
+        )
+        hours = np.where(in_preferred, preferred_hours, outside_hours)
+        minutes = self.rng.integers(0, 60, size=total_sessions)
         
         # Session duration
-        scheduled_durations = np.random.choice([30, 60, 90], size=total_sessions, p=[0.15, 0.75, 0.10])
-        actual_durations = (scheduled_durations * np.random.uniform(0.85, 1.15, size=total_sessions)).astype(int)
+        scheduled_durations = self.rng.choice([30, 60, 90], size=total_sessions, p=[0.15, 0.75, 0.10])
+        actual_durations = (scheduled_durations * self.rng.uniform(0.85, 1.15, size=total_sessions)).astype(int)
         
-        # Subject and grade level (need to handle subject selection from tutor's subjects)
-        subjects_list = []
-        for tutor_id in tutor_ids:
-            subjects = tutor_subjects_dict[tutor_id]
-            subjects_list.append(np.random.choice(subjects))
-        subjects_arr = np.array(subjects_list)
+        # Subject drawn uniformly from each tutor's own subjects
+        subject_slot = (self.rng.random(size=total_sessions) *
+                        params['subject_counts'][tutor_indices]).astype(int)
+        subject_codes = params['subject_codes'][tutor_indices, subject_slot]
         
-        grade_levels_arr = np.random.choice(self.grade_levels, size=total_sessions)
+        grade_codes = self.rng.choice(len(self.grade_levels), size=total_sessions)
         
         # Connection quality - correlate with peak usage hours (6-9pm has more issues)
-        connection_qualities = []
-        for i, hour in enumerate(hours):
-            day_idx = session_days[i]
-            day_of_week = (start_date + timedelta(days=int(day_idx))).weekday()
-            
-            # Peak hours (6-9pm) have more connection issues
-            if 18 <= hour <= 21:
-                # Peak hours: more "Fair" and "Poor" connections
-                quality = np.random.choice(
-                    ['Excellent', 'Good', 'Fair', 'Poor'],
-                    p=[0.50, 0.30, 0.15, 0.05]
-                )
-            elif day_of_week >= 5:  # Weekend
-                # Weekends slightly better connection
-                quality = np.random.choice(
-                    ['Excellent', 'Good', 'Fair', 'Poor'],
-                    p=[0.65, 0.28, 0.06, 0.01]
-                )
-            else:
-                # Normal hours
-                quality = np.random.choice(
-                    ['Excellent', 'Good', 'Fair', 'Poor'],
-                    p=[0.60, 0.30, 0.08, 0.02]
-                )
-            connection_qualities.append(quality)
-        
-        connection_qualities = np.array(connection_qualities)
-        connection_penalty_map = {'Excellent': 0, 'Good': -0.1, 'Fair': -0.3, 'Poor': -0.6}
-        connection_penalties = np.array([connection_penalty_map[cq] for cq in connection_qualities])
+        # Rows: normal hours, weekend (slightly better), peak hours (more "Fair" and "Poor")
+        quality_cdf = np.cumsum(np.array([
+            [0.60, 0.30, 0.08, 0.02],
+            [0.65, 0.28, 0.06, 0.01],
+            [0.50, 0.30, 0.15, 0.05]
+        ]), axis=1)
+        quality_row = np.where((hours >= 18) & (hours <= 21), 2, np.where(is_weekend, 1, 0))
+        quality_codes = (self.rng.random(size=total_sessions)[:, None] > quality_cdf[quality_row]).sum(axis=1)
+        quality_codes = np.minimum(quality_codes, 3)
+        connection_penalties = np.array([0, -0.1, -0.3, -0.6])[quality_codes]
         
         # Student and tutor show-up
-        student_showed = np.random.random(size=total_sessions) > 0.03
+        student_showed = self.rng.random(size=total_sessions) > 0.03
         tutor_no_show_probs = np.clip(tutor_no_show_count_arr * 0.01, 0, 0.15)
-        tutor_showed = np.random.random(size=total_sessions) > tutor_no_show_probs
+        tutor_showed = self.rng.random(size=total_sessions) > tutor_no_show_probs
         session_completed = student_showed & tutor_showed
         
         # First session indicator (only for completed sessions)
         is_first_session = np.zeros(total_sessions, dtype=bool)
-        is_first_session[session_completed] = np.random.random(size=session_completed.sum()) < 0.15
+        is_first_session[session_completed] = self.rng.random(size=session_completed.sum()) < 0.15
         
-        # Generate datetime array with weekend patterns
-        session_datetimes = []
-        for i, day in enumerate(session_days):
-            current_date = start_date + timedelta(days=int(day))
-            day_of_week = current_date.weekday()
-            
-            # Adjust hours for weekends (more flexible hours)
-            hour = int(hours[i])
-            if day_of_week >= 5:  # Weekend
-                # Weekends have more spread out hours
-                hour = max(8, min(hour + random.randint(-1, 1), 21))
-            
-            dt = current_date.replace(hour=hour, minute=int(minutes[i]))
-            session_datetimes.append(dt)
+        # Weekends have more spread out hours
+        weekend_shift = self.rng.integers(-1, 2, size=total_sessions)
+        hours = np.where(is_weekend, np.clip(hours + weekend_shift, 8, 21), hours)
+        
+        # Session start keeps the generation clock's seconds, like datetime.replace(hour, minute)
+        first_midnight = np.datetime64(start_date.replace(hour=0, minute=0), 'us')
+        session_datetimes = (first_midnight +
+                             session_days.astype('timedelta64[D]') +
+                             hours.astype('timedelta64[h]') +
+                             minutes.astype('timedelta64[m]'))
         
         # Pre-allocate arrays for completed session metrics
         completed_mask = session_completed
@@ -313,88 +382,68 @@ class TutorDataGenerator:
             
             # Video engagement metrics
             student_attention_pct[completed_mask] = np.clip(
-                np.random.beta(5, 2, size=n_completed) * 100 * 
+                self.rng.beta(5, 2, size=n_completed) * 100 * 
                 (0.8 + completed_tutor_reliability * 0.2),
                         10, 100
                     )
                     
             tutor_camera_on_pct[completed_mask] = np.clip(
-                np.random.beta(9, 1, size=n_completed) * 100,
+                self.rng.beta(9, 1, size=n_completed) * 100,
                         70, 100
                     )
                     
             tutor_speak_ratio[completed_mask] = np.clip(
-                np.random.normal(0.50, 0.12, size=n_completed),
+                self.rng.normal(0.50, 0.12, size=n_completed),
                         0.20, 0.80
                     )
                     
             screen_share_pct[completed_mask] = np.clip(
-                np.random.beta(3, 2, size=n_completed) * 100,
+                self.rng.beta(3, 2, size=n_completed) * 100,
                         10, 95
                     )
                     
             # Sentiment scores
             overall_sentiment[completed_mask] = np.clip(
-                np.random.normal(0.3 + completed_tutor_reliability * 0.4, 0.15, size=n_completed),
+                self.rng.normal(0.3 + completed_tutor_reliability * 0.4, 0.15, size=n_completed),
                         -0.5, 0.95
                     )
                     
             student_sentiment[completed_mask] = np.clip(
-                overall_sentiment[completed_mask] + np.random.normal(0.05, 0.1, size=n_completed),
+                overall_sentiment[completed_mask] + self.rng.normal(0.05, 0.1, size=n_completed),
                         -0.5, 0.95
                     )
                     
             tutor_sentiment[completed_mask] = np.clip(
-                np.random.normal(0.5, 0.15, size=n_completed),
+                self.rng.normal(0.5, 0.15, size=n_completed),
                         -0.2, 0.95
                     )
                     
             # Quality scores with time-based trends and daily variance
-            # Get tutor IDs for completed sessions
-            completed_tutor_ids = tutor_ids[completed_mask]
+            completed_tutor_indices = tutor_indices[completed_mask]
             completed_session_days = session_days[completed_mask]
+            time_position = (params['first_day'] + completed_session_days) / params['trend_days']
+            
+            def apply_trend(base: np.ndarray, metric: str) -> np.ndarray:
+                """Scale base scores by the tutor's trend over time and the day's variance"""
+                time_factor = 1 + params['tutor_trends'][metric][completed_tutor_indices] * time_position
+                return base * time_factor * params['daily_variance'][metric][completed_session_days]
             
             # Empathy score with trends
             base_empathy = (5 + completed_tutor_reliability * 3 + 
                            (completed_tutor_months_exp / 60) * 1.5 +
-                           np.random.normal(0, 0.8, size=n_completed))
-            
-            # Apply tutor-specific trends and daily variance
-            empathy_with_variance = np.zeros(n_completed)
-            for i, (tutor_id, day) in enumerate(zip(completed_tutor_ids, completed_session_days)):
-                trend = tutor_trends[tutor_id]['empathy']
-                daily_var = daily_variance['empathy'][day]
-                time_factor = 1 + (trend * (day / n_days))
-                empathy_with_variance[i] = base_empathy[i] * time_factor * daily_var
-            
-            empathy_score[completed_mask] = np.clip(empathy_with_variance, 1, 10)
+                           self.rng.normal(0, 0.8, size=n_completed))
+            empathy_score[completed_mask] = np.clip(apply_trend(base_empathy, 'empathy'), 1, 10)
                     
             # Clarity score with trends
             base_clarity = (5 + completed_tutor_reliability * 3 +
-                           np.random.normal(0, 1, size=n_completed))
-            
-            clarity_with_variance = np.zeros(n_completed)
-            for i, (tutor_id, day) in enumerate(zip(completed_tutor_ids, completed_session_days)):
-                trend = tutor_trends[tutor_id]['clarity']
-                daily_var = daily_variance['clarity'][day]
-                time_factor = 1 + (trend * (day / n_days))
-                clarity_with_variance[i] = base_clarity[i] * time_factor * daily_var
-            
-            clarity_score[completed_mask] = np.clip(clarity_with_variance, 1, 10)
+                           self.rng.normal(0, 1, size=n_completed))
+            clarity_score[completed_mask] = np.clip(apply_trend(base_clarity, 'clarity'), 1, 10)
                     
             # Engagement score with trends
             base_engagement = ((student_attention_pct[completed_mask] * 0.4 +
                                (1 - np.abs(tutor_speak_ratio[completed_mask] - 0.5) * 2) * 30 +
                                (overall_sentiment[completed_mask] + 1) * 15) / 10)
-            
-            engagement_with_variance = np.zeros(n_completed)
-            for i, (tutor_id, day) in enumerate(zip(completed_tutor_ids, completed_session_days)):
-                trend = tutor_trends[tutor_id]['engagement']
-                daily_var = daily_variance['engagement'][day]
-                time_factor = 1 + (trend * (day / n_days))
-                engagement_with_variance[i] = base_engagement[i] * time_factor * daily_var
-            
-            engagement_score[completed_mask] = np.clip(engagement_with_variance, 1, 10)
+            engagement_score[completed_mask] = np.clip(apply_trend(base_engagement, 'engagement'), 1, 10)
             
             # Student rating
             quality_factor = (empathy_score[completed_mask] + 
@@ -406,249 +455,244 @@ class TutorDataGenerator:
             student_rating[completed_mask] = np.clip(
                 2.0 + quality_factor * 2.8 + first_session_penalties + 
                 completed_connection_penalties + 
-                np.random.normal(0, 0.4, size=n_completed),
+                self.rng.normal(0, 0.4, size=n_completed),
                 1, 5
             )
             
             # Student satisfaction with trends
             base_satisfaction = (student_rating[completed_mask] * 2 + 
-                                np.random.normal(0, 0.5, size=n_completed))
-            
-            satisfaction_with_variance = np.zeros(n_completed)
-            for i, (tutor_id, day) in enumerate(zip(completed_tutor_ids, completed_session_days)):
-                trend = tutor_trends[tutor_id]['satisfaction']
-                daily_var = daily_variance['satisfaction'][day]
-                time_factor = 1 + (trend * (day / n_days))
-                satisfaction_with_variance[i] = base_satisfaction[i] * time_factor * daily_var
+                                self.rng.normal(0, 0.5, size=n_completed))
             
-            student_satisfaction[completed_mask] = np.clip(satisfaction_with_variance, 1, 10)
+            student_satisfaction[completed_mask] = np.clip(
+                apply_trend(base_satisfaction, 'satisfaction'), 1, 10
+            )
                     
             # Would recommend
             would_recommend[completed_mask] = student_satisfaction[completed_mask] >= 7.0
             
             # Technical issues
-            had_technical_issues[completed_mask] = np.random.random(size=n_completed) < 0.08
+            had_technical_issues[completed_mask] = self.rng.random(size=n_completed) < 0.08
+        
+        # Integer session keys (formatted as 'S000001' IDs when written)
+        session_ids = np.arange(first_session_number, first_session_number + total_sessions, dtype=np.int64)
+        
+        # Compact schema: flags and metrics only exist for completed sessions (NA otherwise)
+        not_completed = ~session_completed
         
-        # Set is_first_session to None for incomplete sessions (handle as object array)
-        is_first_session_series = np.where(session_completed, is_first_session.astype(object), None)
+        def flag(values: np.ndarray) -> pd.arrays.BooleanArray:
+            return pd.arrays.BooleanArray(values.astype(bool), not_completed.copy())
         
-        # Create session IDs
-        session_ids = [f'S{i+1:06d}' for i in range(total_sessions)]
+        def metric(values: np.ndarray, column: str) -> np.ndarray:
+            return np.round(values, FLOAT32_DECIMALS[column]).astype(np.float32)
         
         # Build DataFrame from arrays
         df = pd.DataFrame({
             'session_id': session_ids,
             'tutor_id': tutor_ids,
             'session_datetime': session_datetimes,
-            'scheduled_duration_min': scheduled_durations,
-            'actual_duration_min': actual_durations,
-            'subject': subjects_arr,
-            'grade_level': grade_levels_arr,
-            'is_first_session': is_first_session_series,
-                    'session_completed': session_completed,
-                    'student_showed': student_showed,
-                    'tutor_showed': tutor_showed,
-            'connection_quality': connection_qualities,
-            'had_technical_issues': np.where(~np.isnan(had_technical_issues), 
-                                            had_technical_issues.astype(bool), None),
-            'student_attention_pct': np.where(~np.isnan(student_attention_pct), 
-                                            np.round(student_attention_pct, 1), None),
-            'tutor_camera_on_pct': np.where(~np.isnan(tutor_camera_on_pct), 
-                                          np.round(tutor_camera_on_pct, 1), None),
-            'tutor_speak_ratio': np.where(~np.isnan(tutor_speak_ratio), 
-                                        np.round(tutor_speak_ratio, 3), None),
-            'screen_share_pct': np.where(~np.isnan(screen_share_pct), 
-                                       np.round(screen_share_pct, 1), None),
-            'overall_sentiment': np.where(~np.isnan(overall_sentiment), 
-                                        np.round(overall_sentiment, 3), None),
-            'student_sentiment': np.where(~np.isnan(student_sentiment), 
-                                        np.round(student_sentiment, 3), None),
-            'tutor_sentiment': np.where(~np.isnan(tutor_sentiment), 
-                                      np.round(tutor_sentiment, 3), None),
-            'empathy_score': np.where(~np.isnan(empathy_score), 
-                                    np.round(empathy_score, 2), None),
-            'clarity_score': np.where(~np.isnan(clarity_score), 
-                                    np.round(clarity_score, 2), None),
-            'engagement_score': np.where(~np.isnan(engagement_score), 
-                                       np.round(engagement_score, 2), None),
-            'student_rating': np.where(~np.isnan(student_rating), 
-                                     np.round(student_rating, 1), None),
-            'student_satisfaction': np.where(~np.isnan(student_satisfaction), 
-                                           np.round(student_satisfaction, 1), None),
-            'would_recommend': np.where(~np.isnan(would_recommend), 
-                                      would_recommend.astype(bool), None)
+            'scheduled_duration_min': scheduled_durations.astype(np.int16),
+            'actual_duration_min': actual_durations.astype(np.int16),
+            'subject': pd.Categorical.from_codes(subject_codes, dtype=SCHEMAS['sessions']['subject']),
+            'grade_level': pd.Categorical.from_codes(grade_codes, dtype=SCHEMAS['sessions']['grade_level']),
+            'is_first_session': flag(is_first_session),
+            'session_completed': session_completed,
+            'student_showed': student_showed,
+            'tutor_showed': tutor_showed,
+            'connection_quality': pd.Categorical.from_codes(quality_codes,
+                                                            dtype=SCHEMAS['sessions']['connection_quality']),
+            'had_technical_issues': flag(np.nan_to_num(had_technical_issues)),
+            'student_attention_pct': metric(student_attention_pct, 'student_attention_pct'),
+            'tutor_camera_on_pct': metric(tutor_camera_on_pct, 'tutor_camera_on_pct'),
+            'tutor_speak_ratio': metric(tutor_speak_ratio, 'tutor_speak_ratio'),
+            'screen_share_pct': metric(screen_share_pct, 'screen_share_pct'),
+            'overall_sentiment': metric(overall_sentiment, 'overall_sentiment'),
+            'student_sentiment': metric(student_sentiment, 'student_sentiment'),
+            'tutor_sentiment': metric(tutor_sentiment, 'tutor_sentiment'),
+            'empathy_score': metric(empathy_score, 'empathy_score'),
+            'clarity_score': metric(clarity_score, 'clarity_score'),
+            'engagement_score': metric(engagement_score, 'engagement_score'),
+            'student_rating': metric(student_rating, 'student_rating'),
+            'student_satisfaction': metric(student_satisfaction, 'student_satisfaction'),
+            'would_recommend': flag(np.nan_to_num(would_recommend))
         })
         
         return df
     
-    def calculate_tutor_aggregates(self, sessions_df: pd.DataFrame, 
-                                   tutors_df: pd.DataFrame) -> pd.DataFrame:
-        """Calculate rolling tutor metrics for churn prediction"""
+    def calculate_tutor_aggregates(self, sessions_df: Optional[pd.DataFrame], 
+                                   tutors_df: pd.DataFrame,
+                                   session_index: Optional[SessionIndex] = None,
+                                   rollups: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """
+        Calculate rolling tutor metrics for churn prediction from daily per-tutor rollups
         
-        # Merge to get tutor info
-        df = sessions_df.merge(tutors_df[['tutor_id', 'months_experience']], on='tutor_id')
+        The 7- and 30-day windows are calendar days up to the day of the latest session.
+        Pass rollups (see daily_rollups.py) to skip rolling up sessions_df, e.g. after
+        merging the rollups of newly added sessions into saved ones. The churn columns
+        come from the signal-count heuristic; churn_model.score_churn replaces them with
+        model scores once a model is saved.
+        """
         
-        # Only completed sessions
-        completed = df[df['session_completed'] == True].copy()
+        tutor_info = tutors_df.drop_duplicates('tutor_id').set_index('tutor_id')
         
-        # Calculate per-tutor aggregates
-        tutor_metrics = []
+        if rollups is None:
+            rollups = daily_rollups(sessions_df, tutor_info.index, session_index)
         
-        for tutor_id in df['tutor_id'].unique():
-            tutor_sessions = completed[completed['tutor_id'] == tutor_id]
-            
-            if len(tutor_sessions) == 0:
-                continue
-            
-            # Time-based metrics (last 7, 30 days)
-            now = df['session_datetime'].max()
-            last_7d = tutor_sessions[tutor_sessions['session_datetime'] >= now - timedelta(days=7)]
-            last_30d = tutor_sessions[tutor_sessions['session_datetime'] >= now - timedelta(days=30)]
-            
-            # Calculate churn indicators
-            tutor_info = tutors_df[tutors_df['tutor_id'] == tutor_id].iloc[0]
-            
-            # Churn probability based on multiple factors
-            churn_signals = 0
-            
+        # Tutors without completed sessions are skipped
+        all_days = window_totals(rollups, tutor_info.index)
+        all_days = all_days[all_days['completed_sessions'] > 0]
+        last_7d = window_totals(rollups, all_days.index, days=7)
+        last_30d = window_totals(rollups, all_days.index, days=30)
+        
+        agg = pd.DataFrame({
+            'total_sessions_30d': last_30d['completed_sessions'].values,
+            'total_sessions_7d': last_7d['completed_sessions'].values,
+            'avg_rating_30d': window_mean(last_30d, 'rating'),
+            'avg_rating_7d': window_mean(last_7d, 'rating'),
+            'overall_rating': window_mean(all_days, 'rating'),
+            'avg_engagement_score': window_mean(all_days, 'engagement'),
+            'avg_empathy_score': window_mean(all_days, 'empathy'),
+            'avg_clarity_score': window_mean(all_days, 'clarity'),
+            'avg_student_satisfaction': window_mean(all_days, 'satisfaction'),
+            'first_session_avg_rating': window_mean(all_days, 'first_session_rating'),
+            'first_session_count': all_days['first_sessions'].values,
+            'recommendation_rate': window_mean(all_days, 'recommend'),
+            'technical_issue_rate': window_mean(all_days, 'technical_issue'),
+            'sentiment_trend_7d': window_mean(last_7d, 'sentiment')
+        }, index=all_days.index)
+        info = tutor_info.loc[agg.index]
+        
+        n7 = agg['total_sessions_7d'].values
+        n30 = agg['total_sessions_30d'].values
+        poor_first_session = ((agg['first_session_count'] > 0) &
+                              (agg['first_session_avg_rating'] < 3.5)).values
+        
+        # Churn probability based on multiple factors
+        churn_signals = (
             # Signal 1: Declining ratings
-            if len(last_7d) >= 3:
-                recent_rating = last_7d['student_rating'].mean()
-                overall_rating = tutor_sessions['student_rating'].mean()
-                if recent_rating < overall_rating - 0.3:
-                    churn_signals += 1
-            
+            ((n7 >= 3) & (agg['avg_rating_7d'] < agg['overall_rating'] - 0.3).values).astype(int) +
             # Signal 2: Low engagement
-            if tutor_sessions['engagement_score'].mean() < 5.5:
-                churn_signals += 1
-            
+            (agg['avg_engagement_score'] < 5.5).values.astype(int) +
             # Signal 3: High reschedule rate
-            if tutor_info['reschedule_rate'] > 0.15:
-                churn_signals += 1
-            
-            # Signal 4: Poor first sessions (24% churn indicator)
-            first_sessions = tutor_sessions[tutor_sessions['is_first_session'] == True]
-            if len(first_sessions) > 0 and first_sessions['student_rating'].mean() < 3.5:
-                churn_signals += 2  # Weighted higher per PRD
-            
+            (info['reschedule_rate'] > 0.15).values.astype(int) +
+            # Signal 4: Poor first sessions (24% churn indicator), weighted higher per PRD
+            poor_first_session.astype(int) * 2 +
             # Signal 5: No-shows
-            if tutor_info['no_show_count'] > 2:
-                churn_signals += 1
-            
-            # Signal 6: Declining activity
-            if len(last_7d) < len(last_30d) / 4:  # Less than expected
-                churn_signals += 1
-            
-            # Convert signals to probability
-            churn_probability = min(churn_signals * 0.12, 0.85)
-            churn_probability += np.random.uniform(0, 0.1)  # Add noise
-            
-            # Risk category
-            if churn_probability >= 0.5:
-                risk_level = 'High'
-            elif churn_probability >= 0.3:
-                risk_level = 'Medium'
-            else:
-                risk_level = 'Low'
-            
-            tutor_metrics.append({
-                'tutor_id': tutor_id,
-                'total_sessions_30d': len(last_30d),
-                'total_sessions_7d': len(last_7d),
-                'avg_rating_30d': round(last_30d['student_rating'].mean(), 2) if len(last_30d) > 0 else None,
-                'avg_rating_7d': round(last_7d['student_rating'].mean(), 2) if len(last_7d) > 0 else None,
-                'avg_engagement_score': round(tutor_sessions['engagement_score'].mean(), 2),
-                'avg_empathy_score': round(tutor_sessions['empathy_score'].mean(), 2),
-                'avg_clarity_score': round(tutor_sessions['clarity_score'].mean(), 2),
-                'avg_student_satisfaction': round(tutor_sessions['student_satisfaction'].mean(), 2),
-                'first_session_avg_rating': round(first_sessions['student_rating'].mean(), 2) if len(first_sessions) > 0 else None,
-                'first_session_count': len(first_sessions),
-                'poor_first_session_flag': len(first_sessions) > 0 and first_sessions['student_rating'].mean() < 3.5,
-                'recommendation_rate': round(tutor_sessions['would_recommend'].mean(), 3),
-                'technical_issue_rate': round(tutor_sessions['had_technical_issues'].mean(), 3),
-                'sentiment_trend_7d': round(last_7d['overall_sentiment'].mean(), 3) if len(last_7d) > 0 else None,
-                'churn_probability': round(churn_probability, 3),
-                'churn_risk_level': risk_level,
-                'churn_signals_detected': churn_signals
-            })
-        
-        return pd.DataFrame(tutor_metrics)
-    
-    def train_churn_model(self, tutors_df: pd.DataFrame, 
-                         tutor_aggregates_df: pd.DataFrame,
-                         output_dir: str = "data") -> None:
-        """Train logistic regression model on churn data and generate feature importance"""
-        
-        # Merge tutor and aggregate data
-        tutor_agg = tutor_aggregates_df.merge(
-            tutors_df[['tutor_id', 'certification_level', 'months_experience']], 
-            on='tutor_id', 
-            how='left'
-        )
-        
-        # Create experience_level from months_experience
-        tutor_agg['experience_level'] = pd.cut(
-            tutor_agg['months_experience'],
-            bins=[0, 12, 36, 120],
-            labels=['Junior', 'Mid', 'Senior']
+            (info['no_show_count'] > 2).values.astype(int) +
+            # Signal 6: Declining activity (less than expected)
+            (n7 < n30 / 4).astype(int)
         )
         
-        # Add region (default to US-East for now, can be enhanced later)
-        tutor_agg['region'] = 'US-East'
+        # Convert signals to probability (kept when no churn model is trained for this data)
+        churn_probability = signal_probability(churn_signals)
+        churn_probability = churn_probability + self.rng.uniform(0, SIGNAL_NOISE, size=len(agg))  # Add noise
         
-        # Encode categorical variables
-        tutor_agg_encoded = pd.get_dummies(
-            tutor_agg, 
-            columns=['experience_level', 'region', 'certification_level'], 
-            drop_first=True,
-            dummy_na=True
-        )
+        # Risk category
+        risk_level = risk_levels(churn_probability)
         
-        # Create churned target variable from churn_probability
-        # Use a threshold to create binary target
-        tutor_agg_encoded['churned'] = (tutor_agg_encoded['churn_probability'] > 0.5).astype(int)
-        
-        # Select features for model
-        feature_cols = [col for col in tutor_agg_encoded.columns 
-                       if col not in ['tutor_id', 'churned', 'churn_probability', 'churn_risk_level', 'churn_signals_detected']]
-        
-        X = tutor_agg_encoded[feature_cols].fillna(0)
-        y = tutor_agg_encoded['churned']
-        
-        # Skip if no churned tutors or all churned
-        if y.sum() == 0 or y.sum() == len(y):
-            print("⚠️  All tutors have same churn status. Skipping model training.")
-            return
+        return pd.DataFrame({
+            'tutor_id': agg.index.values,
+            'total_sessions_30d': n30,
+            'total_sessions_7d': n7,
+            'avg_rating_30d': agg['avg_rating_30d'].round(2).values,
+            'avg_rating_7d': agg['avg_rating_7d'].round(2).values,
+            'avg_engagement_score': agg['avg_engagement_score'].round(2).values,
+            'avg_empathy_score': agg['avg_empathy_score'].round(2).values,
+            'avg_clarity_score': agg['avg_clarity_score'].round(2).values,
+            'avg_student_satisfaction': agg['avg_student_satisfaction'].round(2).values,
+            'first_session_avg_rating': agg['first_session_avg_rating'].round(2).values,
+            'first_session_count': agg['first_session_count'].values,
+            'poor_first_session_flag': poor_first_session,
+            'recommendation_rate': agg['recommendation_rate'].round(3).values,
+            'technical_issue_rate': agg['technical_issue_rate'].round(3).values,
+            'sentiment_trend_7d': agg['sentiment_trend_7d'].round(3).values,
+            'churn_probability': np.round(churn_probability, 3),
+            'churn_risk_level': risk_level,
+            'churn_signals_detected': churn_signals
+        }).pipe(apply_schema, 'tutor_aggregates')
+    
+    def train_churn_model(self, tutors_df: pd.DataFrame, 
+                         tutor_aggregates_df: pd.DataFrame,
+                         output_dir: str = "data",
+                         training: str = 'batch',
+                         model_dir: Optional[str] = None,
+                         chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                         epochs: int = DEFAULT_EPOCHS) -> Optional[str]:
+        """
+        Train the churn model and generate feature importance
         
-        # Split data (use stratify if both classes present)
-        try:
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.25, random_state=42, stratify=y
-            )
-        except ValueError:
-            # Fallback if stratify fails
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.25, random_state=42
-            )
+        'batch' fits a logistic regression on the whole feature matrix; 'incremental'
+        streams chunk_rows aggregate rows at a time through a running scaler and
+        SGDClassifier.partial_fit (see churn_model.py). The fitted scaler + model pipeline
+        is saved to model_dir (default: <output_dir>/models) under a fingerprint of the
+        training data, and reused instead of retrained while the data is unchanged. Its
+        scores are mapped onto the heuristic's probability scale by a map fitted on the
+        same rows (see churn_model.fit_probability_map).
         
-        # Scale features
-        scaler = StandardScaler()
-        X_train_scaled = scaler.fit_transform(X_train)
-        X_test_scaled = scaler.transform(X_test)
+        Returns:
+            Training data fingerprint of the saved model, or None if training was skipped
+        """
         
-        # Train model
-        model = LogisticRegression(max_iter=500, random_state=42)
-        model.fit(X_train_scaled, y_train)
-        y_pred = model.predict(X_test_scaled)
+        model_dir = model_dir or os.path.join(output_dir, 'models')
+        tutor_info = tutor_features(tutors_df)
+        if training == 'incremental':
+            params = {'training': training, 'epochs': epochs, 'chunk_rows': chunk_rows, 'seed': 42}
+        else:
+            params = {'training': training, 'seed': 42}
+            chunk_rows = max(len(tutor_aggregates_df), 1)
+        chunks = lambda: iter_training_chunks(tutor_aggregates_df, tutor_info, chunk_rows)
+        fingerprint, counts = data_fingerprint(chunks(), params)
         
-        # Print report
-        print("\n📊 Logistic Regression Churn Model Report:")
-        print(classification_report(y_test, y_pred))
+        saved = load_model(model_dir, fingerprint)
+        if saved is not None:
+            pipeline, manifest = saved
+            path = os.path.join(model_dir, manifest['artifact'])
+            print(f"\n♻️  Training data unchanged; reusing churn model {path}")
+        else:
+            # Skip if no churned tutors or all churned
+            labelled = ('train_rows', 'train_positives') if training == 'incremental' else ('rows', 'positives')
+            if counts[labelled[1]] == 0 or counts[labelled[1]] == counts[labelled[0]]:
+                print("⚠️  All tutors have same churn status. Skipping model training.")
+                return None
+            
+            if training == 'incremental':
+                pipeline, y_test, y_pred = train_incremental(chunks, epochs=epochs, seed=42)
+                title = "SGD Logistic Regression"
+            else:
+                X = churn_features(tutor_aggregates_df, tutor_info)
+                y = churn_labels(tutor_aggregates_df)
+                
+                # Split data (use stratify if both classes present)
+                try:
+                    X_train, X_test, y_train, y_test = train_test_split(
+                        X, y, test_size=0.25, random_state=42, stratify=y
+                    )
+                except ValueError:
+                    # Fallback if stratify fails
+                    X_train, X_test, y_train, y_test = train_test_split(
+                        X, y, test_size=0.25, random_state=42
+                    )
+                
+                # Scale features and train model
+                pipeline = Pipeline([('scaler', StandardScaler()),
+                                     ('model', LogisticRegression(max_iter=500, random_state=42))])
+                pipeline.fit(X_train, y_train)
+                y_pred = pipeline.predict(X_test)
+                title = "Logistic Regression"
+            
+            # Print report
+            report = classification_report(y_test, y_pred, zero_division=0)
+            print(f"\n📊 {title} Churn Model Report:")
+            print(report)
+            probability_map = calibrate_probability(pipeline, tutor_aggregates_df, tutor_info, chunk_rows)
+            print(f"🎚️  Probability map: {format_probability_map(probability_map)}")
+            path = save_model(pipeline, model_dir, fingerprint,
+                              {**params, **counts, 'report': report, 'probability_map': probability_map})
+            print(f"💾 Churn model saved: {path}")
         
         # Feature importance
         importance = pd.DataFrame({
-            "feature": feature_cols,
-            "importance": model.coef_[0]
+            "feature": FEATURES,
+            "importance": model_coefficients(pipeline)
         }).sort_values(by="importance", ascending=False)
         
         importance_path = os.path.join(output_dir, "churn_feature_importance.csv")
@@ -668,6 +712,667 @@ class TutorDataGenerator:
         plt.savefig(viz_path, dpi=150, bbox_inches='tight')
         print(f"📈 Feature importance visualization saved: {viz_path}")
         plt.close()
+        return fingerprint
+
+# Pipeline stages: module-level so they can run in worker processes. Each receives its
+# dependencies' results positionally and a per-stage seed from the StageRunner.
+#
+# Only the last SessionIndex built in a process is kept, so stages sharing a sessions frame
+# in one process index it once while earlier datasets (and, in worker processes, the
+# frames unpickled for earlier stages) can be freed.
+_last_session_index: Optional[SessionIndex] = None
+
+
+def _session_index(sessions: pd.DataFrame, tutors: pd.DataFrame) -> SessionIndex:
+    """SessionIndex of this sessions frame and these tutors, reusing the last one built"""
+    global _last_session_index
+    index = _last_session_index
+    # The index holds its frame, so the identity check cannot match a different frame
+    if index is None or index.sessions_df is not sessions or not index.matches(tutors['tutor_id']):
+        index = _last_session_index = SessionIndex(sessions, tutors['tutor_id'])
+    return index
+
+
+def stage_profiles(n_tutors: int, seed: int, as_of: Optional[datetime] = None) -> pd.DataFrame:
+    return TutorDataGenerator(seed=seed, as_of=as_of).generate_tutor_profiles(n_tutors=n_tutors)
+
+
+def stage_sessions(tutors: pd.DataFrame, n_days: int, sessions_per_day: int, seed: int,
+                   as_of: Optional[datetime] = None) -> pd.DataFrame:
+    return TutorDataGenerator(seed=seed, as_of=as_of).generate_sessions(tutors, n_days=n_days,
+                                                                       sessions_per_day=sessions_per_day)
+
+
+def stage_rollups(tutors: pd.DataFrame, sessions: pd.DataFrame, seed: int) -> pd.DataFrame:
+    return daily_rollups(sessions, tutors['tutor_id'], _session_index(sessions, tutors))
+
+
+def stage_aggregates(tutors: pd.DataFrame, rollups: pd.DataFrame, seed: int,
+                     as_of: Optional[datetime] = None) -> pd.DataFrame:
+    return TutorDataGenerator(seed=seed, as_of=as_of).calculate_tutor_aggregates(None, tutors, rollups=rollups)
+
+
+def stage_engagement_events(tutors: pd.DataFrame, sessions: pd.DataFrame, n_days: int, seed: int,
+                            as_of: Optional[datetime] = None) -> pd.DataFrame:
+    from generate_engagement_events import generate_engagement_events
+    return generate_engagement_events(tutors, sessions, None, n_days, seed,
+                                      session_index=_session_index(sessions, tutors), as_of=as_of)
+
+
+def stage_experiments(n_days: int, seed: int, as_of: Optional[datetime] = None) -> pd.DataFrame:
+    from generate_experiments import generate_experiments
+    return generate_experiments(n_days, seed, as_of=as_of)
+
+
+def stage_experiment_assignments(experiments: pd.DataFrame, tutors: pd.DataFrame,
+                                 tutor_aggregates: pd.DataFrame, seed: int,
+                                 as_of: Optional[datetime] = None) -> pd.DataFrame:
+    from generate_experiment_assignments import generate_experiment_assignments
+    return generate_experiment_assignments(experiments, tutors, tutor_aggregates, seed, as_of=as_of)
+
+
+def stage_interventions(tutors: pd.DataFrame, tutor_aggregates: pd.DataFrame, sessions: pd.DataFrame,
+                        experiments: pd.DataFrame, experiment_assignments: pd.DataFrame,
+                        n_days: int, num_interventions: Optional[int], max_per_tutor: int,
+                        seed: int, as_of: Optional[datetime] = None) -> pd.DataFrame:
+    from generate_interventions import generate_interventions
+    return generate_interventions(tutors, tutor_aggregates, sessions, experiments, experiment_assignments,
+                                  n_days, seed, session_index=_session_index(sessions, tutors),
+                                  num_interventions=num_interventions, max_per_tutor=max_per_tutor,
+                                  as_of=as_of)
+
+
+def stage_email_events(engagement_events: pd.DataFrame, interventions: pd.DataFrame, seed: int,
+                       as_of: Optional[datetime] = None) -> pd.DataFrame:
+    from generate_engagement_events import append_email_events
+    return append_email_events(engagement_events, interventions, seed, as_of=as_of)
+
+
+def stage_last_login(tutors: pd.DataFrame, engagement_events: pd.DataFrame, seed: int,
+                     as_of: Optional[datetime] = None) -> pd.DataFrame:
+    """Tutor profiles with last_login taken from login events (the input frame is not modified)"""
+    rng = np.random.default_rng(seed)
+    as_of = as_of or datetime.now()
+    tutors = tutors.copy()
+    login_events = engagement_events[engagement_events['event_type'] == 'login'].copy()
+    if len(login_events) > 0:
+        login_events['timestamp'] = pd.to_datetime(login_events['timestamp'])
+        last_logins = login_events.groupby('tutor_id')['timestamp'].max()
+        
+        # Join the latest login back by tutor ID
+        latest = last_logins.reindex(tutors['tutor_id']).to_numpy(copy=True)
+        has_login = ~pd.isna(latest)
+        
+        # For tutors without logins, set to 7-30 days ago (drawn in tutor order)
+        days_ago = rng.integers(7, 31, size=int((~has_login).sum()))
+        latest[~has_login] = np.datetime64(as_of) - days_ago.astype('timedelta64[D]')
+        # Timestamp objects, as before, so written files keep their per-value formatting
+        tutors['last_login'] = pd.Series(latest, index=tutors.index).astype(object)
+    return tutors
+
+
+# Tutor shards: each shard draws its tutors, sessions and events from its own
+# SeedSequence child, so output depends on (seed, shards) but not on --workers.
+def shard_sizes(total: int, shards: int) -> List[int]:
+    """Split total into shards near-equal parts (earlier shards take the remainder)"""
+    return [total // shards + (1 if shard < total % shards else 0) for shard in range(shards)]
+
+
+def stage_shard_profiles(n_tutors: int, first_tutor_number: int, shard_seed: np.random.SeedSequence,
+                         seed: int, as_of: Optional[datetime] = None) -> pd.DataFrame:
+    return TutorDataGenerator(seed=shard_seed, as_of=as_of).generate_tutor_profiles(
+        n_tutors=n_tutors, first_tutor_number=first_tutor_number)
+
+
+def stage_merge_profiles(*shard_profiles: pd.DataFrame, seed: int) -> pd.DataFrame:
+    return pd.concat(shard_profiles, ignore_index=True)
+
+
+def stage_session_plan(*shard_profiles: pd.DataFrame, n_days: int, sessions_per_day: int, seed: int,
+                       as_of: Optional[datetime] = None) -> List[Dict]:
+    """
+    Per-shard session volume and first session number
+    
+    Daily volume is split by each shard's share of active-tutor session weight (largest
+    remainder), so the merged sessions follow the same tutor distribution as one unsharded
+    run, and session numbers are assigned in shard order so IDs are globally unique.
+    """
+    weights = np.array([
+        profiles.loc[profiles['active_status'] == True, 'total_sessions_completed'].sum()
+        for profiles in shard_profiles
+    ], dtype=float)
+    quotas = sessions_per_day * weights / max(weights.sum(), 1.0)
+    volumes = np.floor(quotas).astype(int)
+    remainder = sessions_per_day - volumes.sum()
+    if weights.sum() > 0 and remainder > 0:
+        volumes[np.argsort(-(quotas - volumes), kind='stable')[:remainder]] += 1
+    
+    start_date = (as_of or datetime.now()) - timedelta(days=n_days)
+    counts = np.array([TutorDataGenerator.daily_session_counts(start_date, n_days, volume).sum()
+                       for volume in volumes], dtype=int)
+    first_numbers = np.concatenate([[1], 1 + np.cumsum(counts)[:-1]])
+    return [{'sessions_per_day': int(volume), 'first_session_number': int(first), 'n_sessions': int(count)}
+            for volume, first, count in zip(volumes, first_numbers, counts)]
+
+
+def stage_shard_sessions(tutors: pd.DataFrame, plan: List[Dict], shard: int, n_days: int,
+                         shard_seed: np.random.SeedSequence, seed: int,
+                         as_of: Optional[datetime] = None) -> pd.DataFrame:
+    generator = TutorDataGenerator(seed=shard_seed, as_of=as_of)
+    return generator.generate_sessions(tutors, n_days=n_days, sessions_per_day=plan[shard]['sessions_per_day'],
+                                       first_session_number=plan[shard]['first_session_number'])
+
+
+def stage_merge_sessions(*shard_sessions: pd.DataFrame, seed: int) -> pd.DataFrame:
+    # Shards are numbered consecutively by the session plan, so concatenation keeps IDs unique
+    return pd.concat(shard_sessions, ignore_index=True)
+
+
+def stage_merge_rollups(*shard_rollups: pd.DataFrame, seed: int) -> pd.DataFrame:
+    return merge_rollups(*shard_rollups)
+
+
+def stage_shard_events(tutors: pd.DataFrame, sessions: pd.DataFrame, plan: List[Dict], n_days: int,
+                       shard_seed: np.random.SeedSequence, seed: int,
+                       as_of: Optional[datetime] = None) -> pd.DataFrame:
+    from generate_engagement_events import generate_engagement_events
+    # Session IDs in event data are padded for all shards' sessions, as in sessions.csv
+    total_sessions = plan[-1]['first_session_number'] + plan[-1]['n_sessions'] - 1
+    return generate_engagement_events(tutors, sessions, None, n_days, seed=shard_seed, as_of=as_of,
+                                      session_id_width=id_width('session_id', total_sessions))
+
+
+def stage_merge_events(*shard_events: pd.DataFrame, seed: int) -> pd.DataFrame:
+    """Shard events in one timestamp order (stable, so ties keep shard order) with global IDs"""
+    from generate_engagement_events import EngagementEventsGenerator
+    events = pd.concat(shard_events, ignore_index=True).sort_values('timestamp', kind='stable', ignore_index=True)
+    events['event_id'] = EngagementEventsGenerator._event_ids(1, len(events))
+    return events
+
+
+def stage_churn_model(tutors: pd.DataFrame, tutor_aggregates: pd.DataFrame, output_dir: str, seed: int,
+                      training: str = 'batch', model_dir: Optional[str] = None,
+                      chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Optional[str]:
+    return TutorDataGenerator(seed=seed).train_churn_model(tutors, tutor_aggregates, output_dir=output_dir,
+                                                           training=training, model_dir=model_dir,
+                                                           chunk_rows=chunk_rows)
+
+
+def stage_churn_scores(tutors: pd.DataFrame, tutor_aggregates: pd.DataFrame, *trained: Optional[str],
+                       model_dir: str, seed: int) -> pd.DataFrame:
+    """Score tutors with the model the churn_model stage trained or reused, if any"""
+    return score_churn(tutor_aggregates, tutors, model_dir, trained[0] if trained else None)
+
+
+def stage_write(df: pd.DataFrame, path: str, seed: int, id_widths: Optional[Dict[str, int]] = None) -> str:
+    from data_io import write_frame
+    return write_frame(df, path, id_widths=id_widths)
+
+
+def stage_prepare_database(database_url: str, clear: bool, seed: int) -> str:
+    """Check the connection (and empty the tables with clear) before any load starts"""
+    from db_loader import clear_tables, connect
+    if clear:
+        clear_tables(database_url)
+    else:
+        connect(database_url).close()
+    return database_url
+
+
+def stage_load(*results, dataset: str, database_url: str, batch_rows: int,
+               id_widths: Dict[str, int], seed: int) -> int:
+    """Copy the last dependency's frame into its table; earlier dependencies are loads it must follow"""
+    from db_loader import load_frame
+    return load_frame(results[-1], dataset, database_url, batch_rows, id_widths)
+
+
+def stage_load_last_login(tutors_loaded: int, tutors: pd.DataFrame, database_url: str,
+                          id_widths: Dict[str, int], seed: int) -> int:
+    from db_loader import update_last_login
+    return update_last_login(tutors, database_url, id_widths)
+
+
+# Helper modules whose source every cached stage result depends on
+CACHE_CODE_MODULES = ['schema', 'session_index', 'stage_runner']
+
+
+# Append mode: generator_state.json records what a run needs to extend its dataset forward
+STATE_FILE = 'generator_state.json'
+
+
+def session_state(params: Dict) -> Dict:
+    """Per-tutor session parameters that persist across appends, as JSON lists"""
+    return {
+        'tutor_id': params['tutor_ids'].tolist(),
+        'preferred_start': params['preferred_start'].tolist(),
+        'preferred_end': params['preferred_end'].tolist(),
+        'trends': {metric: values.tolist() for metric, values in params['tutor_trends'].items()},
+    }
+
+
+def next_keys(*frames: pd.DataFrame) -> Dict[str, int]:
+    """Next free integer key per key column (largest key + 1) over the given frames"""
+    keys: Dict[str, int] = {}
+    for df in frames:
+        for column in ID_FORMATS:
+            if column in df.columns and len(df):
+                keys[column] = max(keys.get(column, 1), int(df[column].max()) + 1)
+    return keys
+
+
+def stage_generator_state(tutors: pd.DataFrame, *frames: pd.DataFrame, session_seeds: List,
+                          shard_tutors: List[int], n_days: int, sessions_per_day: int, as_of: datetime,
+                          output_dir: str, output_format: str, seed: int) -> str:
+    """
+    Save generator_state.json for --append-days
+    
+    Session parameters are drawn first from each sessions generator's seed, so they are
+    recomputed here from the same seeds (one per tutor shard) rather than passed along.
+    """
+    shard_states = []
+    first = 0
+    for session_seed, size in zip(session_seeds, shard_tutors):
+        params = TutorDataGenerator(seed=session_seed, as_of=as_of)._build_session_params(
+            tutors.iloc[first:first + size], n_days)
+        shard_states.append(session_state(params))
+        first += size
+    tutor_state = {key: sum((state[key] for state in shard_states), [])
+                   for key in ('tutor_id', 'preferred_start', 'preferred_end')}
+    tutor_state['trends'] = {metric: sum((state['trends'][metric] for state in shard_states), [])
+                             for metric in shard_states[0]['trends']}
+    
+    interventions = [df for df in frames if 'intervention_id' in df.columns]
+    aggregates = [df for df in frames if 'churn_signals_detected' in df.columns]
+    state = {
+        'seed': seed,
+        'as_of': as_of.isoformat(),
+        'n_days': n_days,
+        'trend_days': n_days,
+        'sessions_per_day': sessions_per_day,
+        'interventions_per_day': len(interventions[0]) / max(n_days, 1) if interventions else 0.0,
+        'output_format': output_format,
+        'appends': 0,
+        'next_keys': next_keys(tutors, *frames),
+        'id_widths': id_widths(tutors, *frames),
+        'tutors': tutor_state,
+        # Fingerprint of the churn model the aggregates were scored with; appends score alike
+        'churn_model': aggregates[0].attrs.get('churn_model_fingerprint') if aggregates else None,
+    }
+    path = os.path.join(output_dir, STATE_FILE)
+    with open(path, 'w') as f:
+        json.dump(state, f)
+    return path
+
+
+def build_pipeline(runner: StageRunner, n_tutors: int, n_days: int, sessions_per_day: int,
+                   output_dir: str, output_format: str = 'csv', as_of: Optional[datetime] = None,
+                   shards: int = 1, include_events: bool = True, include_experiments: bool = True,
+                   include_interventions: bool = True, train_model: bool = False,
+                   num_interventions: Optional[int] = None, max_interventions_per_tutor: int = 4,
+                   database_url: Optional[str] = None, clear_database: bool = False,
+                   load_batch_rows: int = DEFAULT_BATCH_ROWS, churn_training: str = 'batch',
+                   model_dir: Optional[str] = None, churn_chunk_rows: int = DEFAULT_CHUNK_ROWS) -> None:
+    """
+    Add the full generation graph to a StageRunner
+    
+    Stage names are stable ('profiles', 'sessions', 'aggregates', 'engagement_events',
+    'write_sessions', ...), so callers can read results and timings by name.
+    
+    Args:
+        runner: StageRunner to add stages to
+        n_tutors, n_days, sessions_per_day: Dataset size
+        output_dir: Directory the write stages save to
+        output_format: 'csv', 'parquet' or 'arrow'
+        as_of: Reference time shared by every stage (default: now)
+        shards: Number of independent tutor shards
+        include_events, include_experiments, include_interventions: Optional tables
+            (interventions need experiments)
+        train_model: Add the churn model training stage
+        churn_training, model_dir, churn_chunk_rows: Churn model training mode ('batch' or
+            'incremental'), artifact directory and chunk size (see train_churn_model)
+        num_interventions, max_interventions_per_tutor: Intervention volume
+        database_url: Also COPY every table into this Postgres database as soon as it
+            and the tables it references are ready ('load_*' stages)
+        clear_database: Empty the tables before loading
+        load_batch_rows: Rows per COPY batch
+    """
+    as_of = as_of or datetime.now()
+    include_interventions = include_interventions and include_experiments
+    model_dir = model_dir or os.path.join(output_dir, 'models')
+    
+    def path_for(name: str) -> Dict:
+        # Tutor IDs are padded alike in every file, whichever tutors a table happens to hold
+        return {'path': output_path(output_dir, name, output_format),
+                'id_widths': {'tutor_id': id_width('tutor_id', n_tutors)}}
+    
+    def saved(path: str) -> str:
+        return f"Saved {os.path.basename(path)}"
+    
+    def scored(df: pd.DataFrame) -> str:
+        if df.attrs.get('churn_model'):
+            return f"Scored {len(df)} tutors with {df.attrs['churn_model']}"
+        return f"No churn model for this data; kept heuristic scores for {len(df)} tutors"
+    
+    # Tutors, sessions and daily rollups: one stage each, or one per shard plus a merge
+    if shards == 1:
+        runner.add('profiles', stage_profiles, label="📝 Generating tutor profiles...",
+                   summary=lambda df: f"Generated {len(df)} tutors", optional=False,
+                   kwargs={'n_tutors': n_tutors, 'as_of': as_of}, cache=True)
+        runner.add('sessions', stage_sessions, ['profiles'], label="📚 Generating session data...",
+                   summary=lambda df: f"Generated {len(df)} sessions", optional=False,
+                   kwargs={'n_days': n_days, 'sessions_per_day': sessions_per_day, 'as_of': as_of}, cache=True)
+        runner.add('rollups', stage_rollups, ['profiles', 'sessions'],
+                   label="🗓️  Rolling up sessions by tutor and day...",
+                   summary=lambda df: f"Rolled up {len(df):,} tutor-days", optional=False,
+                   cache=True, code=['daily_rollups'])
+    else:
+        # One SeedSequence child per shard, split again per generated table
+        shard_seeds = [shard_seed.spawn(3) for shard_seed in np.random.SeedSequence(runner.seed).spawn(shards)]
+        sizes = shard_sizes(n_tutors, shards)
+        first_numbers = np.cumsum([1] + sizes[:-1])
+        shard_names = [f'shard_{shard}' for shard in range(shards)]
+        for shard, name in enumerate(shard_names):
+            runner.add(f'{name}_profiles', stage_shard_profiles,
+                       label=f"📝 Generating tutor profiles (shard {shard + 1}/{shards})...",
+                       summary=lambda df: f"Generated {len(df)} tutors", optional=False,
+                       kwargs={'n_tutors': sizes[shard], 'first_tutor_number': int(first_numbers[shard]),
+                               'shard_seed': shard_seeds[shard][0], 'as_of': as_of}, cache=True)
+        shard_profiles = [f'{name}_profiles' for name in shard_names]
+        runner.add('profiles', stage_merge_profiles, shard_profiles, label="🔗 Merging tutor shards...",
+                   summary=lambda df: f"Merged {len(df)} tutors", optional=False, cache=True)
+        runner.add('session_plan', stage_session_plan, shard_profiles, label="📐 Splitting session volume...",
+                   summary=lambda plan: f"Sessions/day by shard: {[part['sessions_per_day'] for part in plan]}",
+                   optional=False,
+                   kwargs={'n_days': n_days, 'sessions_per_day': sessions_per_day, 'as_of': as_of}, cache=True)
+        for shard, name in enumerate(shard_names):
+            runner.add(f'{name}_sessions', stage_shard_sessions, [f'{name}_profiles', 'session_plan'],
+                       label=f"📚 Generating session data (shard {shard + 1}/{shards})...",
+                       summary=lambda df: f"Generated {len(df)} sessions", optional=False,
+                       kwargs={'shard': shard, 'n_days': n_days, 'shard_seed': shard_seeds[shard][1],
+                               'as_of': as_of}, cache=True)
+        runner.add('sessions', stage_merge_sessions, [f'{name}_sessions' for name in shard_names],
+                   label="🔗 Merging session shards...",
+                   summary=lambda df: f"Merged {len(df)} sessions", optional=False, cache=True)
+        for shard, name in enumerate(shard_names):
+            runner.add(f'{name}_rollups', stage_rollups, [f'{name}_profiles', f'{name}_sessions'],
+                       label=f"🗓️  Rolling up sessions by tutor and day (shard {shard + 1}/{shards})...",
+                       summary=lambda df: f"Rolled up {len(df):,} tutor-days", optional=False,
+                       cache=True, code=['daily_rollups'])
+        runner.add('rollups', stage_merge_rollups, [f'{name}_rollups' for name in shard_names],
+                   label="🔗 Merging daily rollup shards...",
+                   summary=lambda df: f"Merged {len(df):,} tutor-days", optional=False,
+                   cache=True, code=['daily_rollups'])
+    runner.add('aggregates', stage_aggregates, ['profiles', 'rollups'], label="📊 Calculating tutor aggregates...",
+               summary=lambda df: f"Calculated aggregates for {len(df)} tutors", optional=False,
+               kwargs={'as_of': as_of}, cache=True, code=['daily_rollups', 'churn_model'])
+    runner.add('write_sessions', stage_write, ['sessions'], label="💾 Saving sessions...",
+               summary=saved, optional=False, kwargs=path_for('sessions'))
+    
+    # Train ML model (unless skipped), then score every tutor with the model trained for this
+    # data; the heuristic scores from the aggregates stage stand in when there is none, or
+    # when training fails
+    if train_model:
+        runner.add('churn_model', stage_churn_model, ['profiles', 'aggregates'],
+                   label="🤖 Training churn prediction model...",
+                   summary=lambda fingerprint: (f"Saved churn model {fingerprint[:16]} outputs to {output_dir}/"
+                                                if fingerprint else "No churn model trained"),
+                   kwargs={'output_dir': output_dir, 'training': churn_training, 'model_dir': model_dir,
+                           'chunk_rows': churn_chunk_rows})
+    runner.add('churn_scores', stage_churn_scores,
+               ['profiles', 'aggregates'] + (['churn_model'] if train_model else []),
+               label="🎯 Scoring churn risk...", summary=scored, optional=False, fallback='aggregates',
+               kwargs={'model_dir': model_dir})
+    runner.add('write_aggregates', stage_write, ['churn_scores'], label="💾 Saving tutor aggregates...",
+               summary=saved, optional=False, kwargs=path_for('tutor_aggregates'))
+    runner.add('write_rollups', stage_write, ['rollups'], label="💾 Saving daily rollups...",
+               summary=saved, optional=False, kwargs=path_for('tutor_daily_rollups'))
+    
+    if include_events and shards == 1:
+        runner.add('engagement_events', stage_engagement_events, ['profiles', 'sessions'],
+                   label="📱 Generating engagement events...",
+                   summary=lambda df: f"Generated {len(df)} engagement events",
+                   kwargs={'n_days': n_days, 'as_of': as_of}, cache=True, code=['generate_engagement_events'])
+    elif include_events:
+        for shard, name in enumerate(shard_names):
+            runner.add(f'{name}_events', stage_shard_events,
+                       [f'{name}_profiles', f'{name}_sessions', 'session_plan'],
+                       label=f"📱 Generating engagement events (shard {shard + 1}/{shards})...",
+                       summary=lambda df: f"Generated {len(df)} engagement events",
+                       kwargs={'n_days': n_days, 'shard_seed': shard_seeds[shard][2], 'as_of': as_of},
+                       cache=True, code=['generate_engagement_events'])
+        runner.add('engagement_events', stage_merge_events, [f'{name}_events' for name in shard_names],
+                   label="🔗 Merging engagement event shards...",
+                   summary=lambda df: f"Merged {len(df)} engagement events", cache=True)
+    
+    if include_experiments:
+        runner.add('experiments', stage_experiments, label="🧪 Generating experiments...",
+                   summary=lambda df: f"Generated {len(df)} experiments",
+                   kwargs={'n_days': n_days, 'as_of': as_of}, cache=True, code=['generate_experiments'])
+        runner.add('write_experiments', stage_write, ['experiments'], label="💾 Saving experiments...",
+                   summary=saved, kwargs=path_for('experiments'))
+        runner.add('experiment_assignments', stage_experiment_assignments,
+                   ['experiments', 'profiles', 'churn_scores'],
+                   label="📋 Generating experiment assignments...",
+                   summary=lambda df: f"Generated {len(df)} experiment assignments",
+                   kwargs={'as_of': as_of}, cache=True, code=['generate_experiment_assignments'])
+        runner.add('write_experiment_assignments', stage_write, ['experiment_assignments'],
+                   label="💾 Saving experiment assignments...",
+                   summary=saved, kwargs=path_for('experiment_assignments'))
+    
+    # Interventions depend on experiments and assignments
+    if include_interventions:
+        runner.add('interventions', stage_interventions,
+                   ['profiles', 'churn_scores', 'sessions', 'experiments', 'experiment_assignments'],
+                   label="💌 Generating interventions...",
+                   summary=lambda df: f"Generated {len(df)} interventions",
+                   kwargs={'n_days': n_days, 'num_interventions': num_interventions,
+                           'max_per_tutor': max_interventions_per_tutor, 'as_of': as_of},
+                   cache=True, code=['generate_interventions'])
+        runner.add('write_interventions', stage_write, ['interventions'], label="💾 Saving interventions...",
+                   summary=saved, kwargs=path_for('interventions'))
+    
+    if include_events:
+        events_stage = 'engagement_events'
+        if include_interventions:
+            # Email events from interventions; keep the events without them if this fails
+            runner.add('email_events', stage_email_events, ['engagement_events', 'interventions'],
+                       label="📧 Updating engagement events with email interactions...",
+                       summary=lambda df: f"Engagement events with email interactions: {len(df)}",
+                       fallback='engagement_events', kwargs={'as_of': as_of},
+                       cache=True, code=['generate_engagement_events'])
+            events_stage = 'email_events'
+        runner.add('write_engagement_events', stage_write, [events_stage], label="💾 Saving engagement events...",
+                   summary=saved, kwargs=path_for('engagement_events'))
+    
+        # Tutor last_login from engagement events; profiles are written once it is known
+        runner.add('last_login', stage_last_login, ['profiles', events_stage],
+                   label="🕐 Updating tutor last_login timestamps...",
+                   summary=lambda df: f"Updated last_login for {df['last_login'].notna().sum()} tutors",
+                   fallback='profiles', kwargs={'as_of': as_of}, cache=True)
+        runner.add('write_profiles', stage_write, ['last_login'], label="💾 Saving tutor profiles...",
+                   summary=saved, optional=False, kwargs=path_for('tutor_profiles'))
+    else:
+        runner.add('write_profiles', stage_write, ['profiles'], label="💾 Saving tutor profiles...",
+                   summary=saved, optional=False, kwargs=path_for('tutor_profiles'))
+    
+    # State for --append-days, from the final frames
+    state_deps = ['profiles', 'sessions', 'churn_scores']
+    if include_events:
+        state_deps.append(events_stage)
+    if include_interventions:
+        state_deps.append('interventions')
+    if shards == 1:
+        session_seeds, shard_tutors = [stage_seed(runner.seed, 'sessions')], [n_tutors]
+    else:
+        session_seeds, shard_tutors = [shard_seed[1] for shard_seed in shard_seeds], sizes
+    runner.add('generator_state', stage_generator_state, state_deps, label="💾 Saving generator state...",
+               summary=saved, kwargs={'session_seeds': session_seeds, 'shard_tutors': shard_tutors,
+                                      'n_days': n_days, 'sessions_per_day': sessions_per_day, 'as_of': as_of,
+                                      'output_dir': output_dir, 'output_format': output_format})
+    
+    # Bulk load into Postgres; each load waits only for its frame and the tables it references,
+    # so with --workers > 1 loading overlaps the remaining generation
+    if database_url:
+        runner.add('prepare_database', stage_prepare_database, label="🐘 Connecting to Postgres...",
+                   summary=lambda url: "Database ready", kwargs={'database_url': database_url, 'clear': clear_database})
+        load_kwargs = {'database_url': database_url, 'batch_rows': load_batch_rows,
+                       'id_widths': {'tutor_id': id_width('tutor_id', n_tutors)}}
+        
+        def load(name: str, deps: List[str], dataset: str) -> None:
+            table = LOAD_TABLES[dataset]['table']
+            runner.add(name, stage_load, ['prepare_database'] + deps, label=f"🐘 Loading {table}...",
+                       summary=lambda rows: f"Loaded {rows:,} rows into {table}",
+                       kwargs={'dataset': dataset, **load_kwargs})
+        
+        # Tutors load before their last_login is known; it is filled in afterwards
+        load('load_profiles', ['profiles'], 'tutor_profiles')
+        load('load_sessions', ['load_profiles', 'sessions'], 'sessions')
+        load('load_aggregates', ['load_profiles', 'churn_scores'], 'tutor_aggregates')
+        if include_experiments:
+            load('load_experiments', ['experiments'], 'experiments')
+            load('load_experiment_assignments', ['load_profiles', 'load_experiments', 'experiment_assignments'],
+                 'experiment_assignments')
+        if include_interventions:
+            load('load_interventions', ['load_profiles', 'interventions'], 'interventions')
+        if include_events:
+            load('load_engagement_events', ['load_profiles', events_stage], 'engagement_events')
+            runner.add('load_last_login', stage_load_last_login, ['load_profiles', 'last_login'],
+                       label="🐘 Updating tutors.last_login...",
+                       summary=lambda rows: f"Updated last_login for {rows:,} tutors",
+                       kwargs={'database_url': database_url, 'id_widths': load_kwargs['id_widths']})
+
+
+def append_days(output_dir: str, n_days: int, sessions_per_day: Optional[int] = None,
+                num_interventions: Optional[int] = None, max_interventions_per_tutor: int = 4,
+                model_dir: Optional[str] = None) -> Dict:
+    """
+    Extend a generated dataset by the n_days after its as-of time
+    
+    Loads generator_state.json and the existing outputs, generates only the new days'
+    sessions, engagement events and interventions (IDs, tutor peak hours and trends
+    continue from the saved run) and appends them to the output files. The new sessions
+    are merged into the daily rollups, the tutor aggregates are refreshed from those and
+    last_login is updated. Experiments, assignments and the churn model are left as
+    they are.
+    
+    Args:
+        output_dir: Directory of a previous run (or append)
+        n_days: Days to add
+        sessions_per_day: Weekday volume of the new days (default: the saved one)
+        num_interventions: Intervention draws for the new days (default: the saved daily rate)
+        max_interventions_per_tutor: Maximum new interventions per tutor
+        model_dir: Churn model artifacts that score the refreshed aggregates
+            (default: <output_dir>/models; heuristic scores without a saved model)
+    
+    Returns:
+        New rows per table and the updated state
+    """
+    from generate_engagement_events import append_email_events, generate_engagement_events
+    from generate_interventions import generate_interventions
+    
+    state_path = os.path.join(output_dir, STATE_FILE)
+    if not os.path.exists(state_path):
+        raise FileNotFoundError(f"{state_path} not found; generate the dataset with this version first")
+    with open(state_path) as f:
+        state = json.load(f)
+    
+    fmt = state['output_format']
+    path = lambda name: output_path(output_dir, name, fmt)
+    sessions_per_day = sessions_per_day or state['sessions_per_day']
+    as_of = datetime.fromisoformat(state['as_of']) + timedelta(days=n_days)
+    # A fresh stream per append, so repeated appends are reproducible but not repetitive
+    session_seed, event_seed, intervention_seed, email_seed = \
+        np.random.SeedSequence([state['seed'], state['appends'] + 1]).spawn(4)
+    keys = state['next_keys']
+    added = {}
+    
+    print(f"\n📚 Generating sessions for {n_days} more day(s) up to {as_of.isoformat(sep=' ')}...")
+    tutors = read_frame(path('tutor_profiles'), table='tutor_profiles')
+    generator = TutorDataGenerator(seed=session_seed, as_of=as_of)
+    params = generator.resume_session_params(tutors, state, n_days)
+    new_sessions = generator.generate_sessions(tutors, n_days, sessions_per_day,
+                                               first_session_number=keys.get('session_id', 1), params=params)
+    sessions = pd.concat([read_frame(path('sessions'), table='sessions'), new_sessions], ignore_index=True)
+    widths = {**state['id_widths'], **{column: max(width, state['id_widths'].get(column, 0))
+                                       for column, width in id_widths(sessions).items()}}
+    added['sessions'] = new_sessions
+    print(f"   ✓ Generated {len(new_sessions):,} sessions")
+    
+    print("\n📊 Updating daily rollups and tutor aggregates...")
+    # Only the new sessions are rolled up; datasets from before rollups existed are rolled up once
+    if os.path.exists(path('tutor_daily_rollups')):
+        saved_rollups = read_frame(path('tutor_daily_rollups'), table='tutor_daily_rollups')
+    else:
+        saved_rollups = daily_rollups(sessions.iloc[:len(sessions) - len(new_sessions)], tutors['tutor_id'])
+    rollups = merge_rollups(saved_rollups, daily_rollups(new_sessions, tutors['tutor_id']))
+    aggregates = generator.calculate_tutor_aggregates(None, tutors, rollups=rollups)
+    print(f"   ✓ Rolled up {len(rollups) - len(saved_rollups):,} new tutor-days; "
+          f"calculated aggregates for {len(aggregates)} tutors")
+    aggregates = score_churn(aggregates, tutors, model_dir or os.path.join(output_dir, 'models'),
+                             state.get('churn_model'))
+    if aggregates.attrs['churn_model']:
+        print(f"   ✓ Scored churn risk with {aggregates.attrs['churn_model']}")
+    
+    new_events = None
+    if os.path.exists(path('engagement_events')):
+        print("\n📱 Generating engagement events...")
+        new_events = generate_engagement_events(tutors, new_sessions, None, n_days, seed=event_seed, as_of=as_of,
+                                                session_id_width=widths['session_id'],
+                                                first_event_number=keys.get('event_id', 1))
+        print(f"   ✓ Generated {len(new_events):,} engagement events")
+    
+    if os.path.exists(path('interventions')) and os.path.exists(path('experiment_assignments')):
+        print("\n💌 Generating interventions...")
+        if num_interventions is None:
+            num_interventions = int(round(state['interventions_per_day'] * n_days))
+        new_interventions = generate_interventions(
+            tutors, aggregates, sessions, read_frame(path('experiments')),
+            read_frame(path('experiment_assignments'), table='experiment_assignments'), n_days,
+            seed=intervention_seed, num_interventions=num_interventions,
+            max_per_tutor=max_interventions_per_tutor, as_of=as_of)
+        # Keys continue after the saved run, keeping the gaps left by dropped draws
+        new_interventions['intervention_id'] += keys.get('intervention_id', 1) - 1
+        added['interventions'] = new_interventions
+        print(f"   ✓ Generated {len(new_interventions)} interventions")
+        if new_events is not None and len(new_events) > 0:
+            new_events = append_email_events(new_events, new_interventions, seed=email_seed, as_of=as_of)
+    
+    if new_events is not None:
+        added['engagement_events'] = new_events
+        # Tutors who logged in during the new days
+        logins = new_events[new_events['event_type'] == 'login']
+        if len(logins) > 0:
+            last_logins = pd.to_datetime(logins['timestamp']).groupby(logins['tutor_id']).max()
+            tutors = tutors.copy()
+            tutors['last_login'] = pd.to_datetime(tutors['last_login'], format='ISO8601')
+            latest = last_logins.reindex(tutors['tutor_id']).to_numpy(copy=True)
+            tutors['last_login'] = np.where(pd.isna(latest), tutors['last_login'].to_numpy(),
+                                            np.fmax(latest, tutors['last_login'].to_numpy()))
+    
+    print("\n💾 Saving...")
+    tables = {'sessions': 'sessions', 'engagement_events': 'engagement_events', 'interventions': 'interventions'}
+    for name, df in added.items():
+        widths.update({column: max(width, widths.get(column, 0)) for column, width in id_widths(df).items()})
+        # IDs wider than the file's existing ones need a rewrite to stay aligned
+        rewrite = any(widths.get(column, 0) > state['id_widths'].get(column, 0)
+                      for column in ID_FORMATS if column in df.columns and column != 'tutor_id')
+        append_frame(df, path(name), table=tables[name], id_widths=widths, rewrite=rewrite)
+        print(f"   ✓ Appended {len(df):,} rows to {os.path.basename(path(name))}")
+    for name, df in (('tutor_daily_rollups', rollups), ('tutor_aggregates', aggregates), ('tutor_profiles', tutors)):
+        write_frame(df, path(name), id_widths=widths)
+        print(f"   ✓ Rewrote {os.path.basename(path(name))}")
+    
+    state.update({
+        'as_of': as_of.isoformat(),
+        'n_days': state['n_days'] + n_days,
+        'appends': state['appends'] + 1,
+        'next_keys': {**keys, **next_keys(*added.values())},
+        'id_widths': widths,
+    })
+    with open(state_path, 'w') as f:
+        json.dump(state, f)
+    return {'rows': {name: len(df) for name, df in added.items()}, 'state': state}
+
 
 # Usage Example
 if __name__ == "__main__":
@@ -682,6 +1387,8 @@ if __name__ == "__main__":
                        help='Sessions per day (overrides mode default)')
     parser.add_argument('--output-dir', type=str, default='data',
                        help='Output directory for CSV files (default: data)')
+    parser.add_argument('--output-format', type=str, choices=['csv', 'parquet', 'arrow'], default='csv',
+                       help='Output file format: csv (default), parquet or arrow (typed columnar files)')
     parser.add_argument('--no-model', action='store_true',
                        help='Skip ML model training')
     parser.add_argument('--seed', type=int, default=42,
@@ -694,12 +1401,73 @@ if __name__ == "__main__":
                        help='Include interventions generation (default: True)')
     parser.add_argument('--no-interventions', dest='include_interventions', action='store_false',
                        help='Skip interventions generation')
+    parser.add_argument('--num-interventions', type=int, default=None,
+                       help='Number of intervention draws (default: random 50-100)')
+    parser.add_argument('--max-interventions-per-tutor', type=int, default=4,
+                       help='Maximum interventions per tutor (default: 4)')
     parser.add_argument('--include-experiments', action='store_true', default=True,
                        help='Include experiments generation (default: True)')
     parser.add_argument('--no-experiments', dest='include_experiments', action='store_false',
                        help='Skip experiments generation')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Worker processes for independent stages (default: 1, in-process)')
+    parser.add_argument('--shards', type=int, default=1,
+                       help='Split tutors into N shards generated independently (default: 1); '
+                            'output depends on seed and shard count, not on --workers')
+    parser.add_argument('--as-of', type=datetime.fromisoformat, default=None,
+                       help='Reference time the data ends at, e.g. 2025-01-31T00:00 (default: now)')
+    parser.add_argument('--profile', action='store_true',
+                       help='Profile every stage (cProfile hot functions, tracemalloc peaks, DataFrame sizes) '
+                            'and write profile.json/profile.html to <output-dir>/profile')
+    parser.add_argument('--profile-stacks', action='store_true',
+                       help='With --profile, also write flamegraph-compatible collapsed stacks')
+    parser.add_argument('--churn-training', type=str, choices=TRAINING_MODES, default='batch',
+                       help='Churn model training: batch (in-memory logistic regression, default) or '
+                            'incremental (streams feature chunks through SGDClassifier.partial_fit)')
+    parser.add_argument('--churn-chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS,
+                       help=f'Aggregate rows per chunk for --churn-training incremental (default: {DEFAULT_CHUNK_ROWS})')
+    parser.add_argument('--model-dir', type=str, default=None,
+                       help='Directory for versioned churn model artifacts; a model trained on identical '
+                            'data is reused (default: <output-dir>/models)')
+    parser.add_argument('--cache-dir', type=str, default=None,
+                       help='Reuse stage results cached in this directory while their parameters, code and '
+                            'upstream stages are unchanged (combine with --as-of; default: no cache)')
+    parser.add_argument('--cache-max-mb', type=float, default=DEFAULT_MAX_MB,
+                       help=f'Trim the stage cache to this size after a run, least recently used first '
+                            f'(default: {DEFAULT_MAX_MB})')
+    parser.add_argument('--cache-max-age-days', type=float, default=DEFAULT_MAX_AGE_DAYS,
+                       help=f'Evict cached stage results unused for this many days (default: {DEFAULT_MAX_AGE_DAYS})')
+    parser.add_argument('--append-days', type=int, default=None,
+                       help='Extend the dataset in --output-dir by N days after its as-of time, continuing '
+                            'IDs, tutor trends and time factors from its generator_state.json')
+    parser.add_argument('--load-db', action='store_true',
+                       help='Also bulk-load every table into Postgres with COPY while generating '
+                            '(requires psycopg; see --database-url)')
+    parser.add_argument('--database-url', type=str, default=os.environ.get('DATABASE_URL'),
+                       help='Postgres URL for --load-db (default: $DATABASE_URL)')
+    parser.add_argument('--load-clear', action='store_true',
+                       help='With --load-db, empty the tables before loading')
+    parser.add_argument('--load-batch-rows', type=int, default=DEFAULT_BATCH_ROWS,
+                       help=f'Rows per COPY batch for --load-db (default: {DEFAULT_BATCH_ROWS})')
+    parser.add_argument('--stream-sessions', action='store_true',
+                       help='Write sessions to sessions.csv chunk by chunk with bounded memory '
+                            '(generates tutor profiles and sessions only)')
+    parser.add_argument('--chunk-days', type=int, default=1,
+                       help='Days per session chunk in streaming mode (default: 1)')
+    parser.add_argument('--chunk-rows', type=int, default=None,
+                       help='Maximum sessions per chunk in streaming mode (default: no limit)')
     
     args = parser.parse_args()
+    if args.load_db and not args.database_url:
+        parser.error('--load-db needs --database-url or DATABASE_URL')
+    if args.stream_sessions:
+        # Streaming runs outside the stage graph, so options of the graph do not apply
+        unsupported = [option for option, used in (('--shards', args.shards > 1), ('--workers', args.workers > 1),
+                                                   ('--cache-dir', args.cache_dir is not None),
+                                                   ('--profile', args.profile), ('--load-db', args.load_db))
+                       if used]
+        if unsupported:
+            parser.error(f"--stream-sessions cannot be combined with {', '.join(unsupported)}")
     
     # Set defaults based on mode
     if args.mode == 'dev':
@@ -714,170 +1482,100 @@ if __name__ == "__main__":
     n_tutors = args.tutors if args.tutors is not None else default_tutors
     n_days = args.days if args.days is not None else default_days
     sessions_per_day = args.sessions_per_day if args.sessions_per_day is not None else default_sessions_per_day
+    shards = max(1, min(args.shards, n_tutors))
+    as_of = args.as_of or datetime.now()
     
-    # Import new generators
-    scripts_dir = os.path.join(os.path.dirname(__file__), 'scripts')
-    if os.path.exists(scripts_dir):
-        sys.path.insert(0, scripts_dir)
-    else:
-        # Fallback: try current directory
-        sys.path.insert(0, os.path.dirname(__file__))
-    
-    try:
-        from generate_engagement_events import generate_engagement_events
-        from generate_experiments import generate_experiments
-        from generate_experiment_assignments import generate_experiment_assignments
-        from generate_interventions import generate_interventions
-    except ImportError as e:
-        print(f"⚠️  Warning: Could not import new generators: {e}")
-        print("   Make sure scripts are in the scripts/ directory")
-        generate_engagement_events = None
-        generate_experiments = None
-        generate_experiment_assignments = None
-        generate_interventions = None
+    from data_io import OUTPUT_FORMATS, FrameWriter, write_frame
     
     # Create output directory
     os.makedirs(args.output_dir, exist_ok=True)
     
-    # Initialize generator
-    generator = TutorDataGenerator(seed=args.seed)
-    
     # Timing
     start_time = time.time()
     
+    if args.append_days:
+        print(f"➕ Appending {args.append_days} day(s) to {args.output_dir}/")
+        appended = append_days(args.output_dir, args.append_days, sessions_per_day=args.sessions_per_day,
+                               num_interventions=args.num_interventions,
+                               max_interventions_per_tutor=args.max_interventions_per_tutor,
+                               model_dir=args.model_dir)
+        print(f"\n⏱️  Total append time: {time.time() - start_time:.2f}s")
+        print(f"📁 Dataset in {args.output_dir}/ now covers {appended['state']['n_days']} days "
+              f"up to {appended['state']['as_of']}")
+        sys.exit(0)
+    
     # Generate data
     print(f"🚀 Generating {args.mode} dataset...")
-    print(f"   Tutors: {n_tutors}, Days: {n_days}, Sessions/day: {sessions_per_day}")
-    print()
-    
-    print("📝 Generating tutor profiles...")
-    tutor_start = time.time()
-    tutors = generator.generate_tutor_profiles(n_tutors=n_tutors)
-    print(f"   ✓ Generated {len(tutors)} tutors in {time.time() - tutor_start:.2f}s")
-    
-    print("\n📚 Generating session data...")
-    session_start = time.time()
-    sessions = generator.generate_sessions(tutors, n_days=n_days, sessions_per_day=sessions_per_day)
-    print(f"   ✓ Generated {len(sessions)} sessions in {time.time() - session_start:.2f}s")
-    
-    print("\n📊 Calculating tutor aggregates...")
-    agg_start = time.time()
-    tutor_aggregates = generator.calculate_tutor_aggregates(sessions, tutors)
-    print(f"   ✓ Calculated aggregates for {len(tutor_aggregates)} tutors in {time.time() - agg_start:.2f}s")
-    
-    # Save to CSV
-    print("\n💾 Saving CSV files...")
-    tutors_path = os.path.join(args.output_dir, 'tutor_profiles.csv')
-    sessions_path = os.path.join(args.output_dir, 'sessions.csv')
-    aggregates_path = os.path.join(args.output_dir, 'tutor_aggregates.csv')
-    
-    tutors.to_csv(tutors_path, index=False)
-    sessions.to_csv(sessions_path, index=False)
-    tutor_aggregates.to_csv(aggregates_path, index=False)
-    
-    print(f"   ✓ Saved files to {args.output_dir}/")
-    
-    # Generate new data types
-    engagement_events = None
-    experiments = None
-    experiment_assignments = None
-    interventions = None
-    
-    # Generate engagement events
-    if args.include_engagement_events and generate_engagement_events:
-        print("\n📱 Generating engagement events...")
-        events_start = time.time()
-        try:
-            engagement_events = generate_engagement_events(tutors, sessions, None, n_days, args.seed)
-            events_path = os.path.join(args.output_dir, 'engagement_events.csv')
-            engagement_events.to_csv(events_path, index=False)
-            print(f"   ✓ Generated {len(engagement_events)} engagement events in {time.time() - events_start:.2f}s")
-        except Exception as e:
-            print(f"   ⚠️  Failed to generate engagement events: {e}")
-    
-    # Generate experiments
-    if args.include_experiments and generate_experiments:
-        print("\n🧪 Generating experiments...")
-        exp_start = time.time()
-        try:
-            experiments = generate_experiments(n_days, args.seed)
-            experiments_path = os.path.join(args.output_dir, 'experiments.csv')
-            experiments.to_csv(experiments_path, index=False)
-            print(f"   ✓ Generated {len(experiments)} experiments in {time.time() - exp_start:.2f}s")
-        except Exception as e:
-            print(f"   ⚠️  Failed to generate experiments: {e}")
-    
-    # Generate experiment assignments
-    if args.include_experiments and experiments is not None and generate_experiment_assignments:
-        print("\n📋 Generating experiment assignments...")
-        assign_start = time.time()
-        try:
-            experiment_assignments = generate_experiment_assignments(experiments, tutors, tutor_aggregates, args.seed)
-            assignments_path = os.path.join(args.output_dir, 'experiment_assignments.csv')
-            experiment_assignments.to_csv(assignments_path, index=False)
-            print(f"   ✓ Generated {len(experiment_assignments)} experiment assignments in {time.time() - assign_start:.2f}s")
-        except Exception as e:
-            print(f"   ⚠️  Failed to generate experiment assignments: {e}")
-    
-    # Generate interventions (depends on experiments and assignments)
-    if args.include_interventions and generate_interventions and experiments is not None and experiment_assignments is not None:
-        print("\n💌 Generating interventions...")
-        interv_start = time.time()
-        try:
-            interventions = generate_interventions(tutors, tutor_aggregates, sessions, 
-                                                  experiments, experiment_assignments, n_days, args.seed)
-            interventions_path = os.path.join(args.output_dir, 'interventions.csv')
-            interventions.to_csv(interventions_path, index=False)
-            print(f"   ✓ Generated {len(interventions)} interventions in {time.time() - interv_start:.2f}s")
-        except Exception as e:
-            print(f"   ⚠️  Failed to generate interventions: {e}")
-        
-        # Update engagement events with email events from interventions
-        if engagement_events is not None and generate_engagement_events:
-            print("\n📧 Updating engagement events with email interactions...")
-            try:
-                engagement_events = generate_engagement_events(tutors, sessions, interventions, n_days, args.seed)
-                events_path = os.path.join(args.output_dir, 'engagement_events.csv')
-                engagement_events.to_csv(events_path, index=False)
-                print(f"   ✓ Updated engagement events with email interactions")
-            except Exception as e:
-                print(f"   ⚠️  Failed to update engagement events: {e}")
-    
-    # Update tutor last_login from engagement events
-    if engagement_events is not None and len(engagement_events) > 0:
-        print("\n🕐 Updating tutor last_login timestamps...")
-        try:
-            login_events = engagement_events[engagement_events['event_type'] == 'login'].copy()
-            if len(login_events) > 0:
-                login_events['timestamp'] = pd.to_datetime(login_events['timestamp'])
-                last_logins = login_events.groupby('tutor_id')['timestamp'].max()
-                
-                # Update tutors DataFrame
-                for tutor_id, last_login in last_logins.items():
-                    tutors.loc[tutors['tutor_id'] == tutor_id, 'last_login'] = last_login
-                
-                # For tutors without logins, set to 7-30 days ago
-                tutors_without_logins = tutors[tutors['last_login'].isna()]
-                for _, tutor in tutors_without_logins.iterrows():
-                    days_ago = random.randint(7, 30)
-                    tutors.loc[tutors['tutor_id'] == tutor['tutor_id'], 'last_login'] = \
-                        datetime.now() - timedelta(days=days_ago)
-                
-                # Save updated tutors
-                tutors.to_csv(tutors_path, index=False)
-                print(f"   ✓ Updated last_login for {len(last_logins)} tutors")
-        except Exception as e:
-            print(f"   ⚠️  Failed to update last_login: {e}")
-    
-    print(f"   ✓ Saved files to {args.output_dir}/")
-    
-    # Train ML model (unless skipped)
-    if not args.no_model and args.mode == 'production':
-        print("\n🤖 Training churn prediction model...")
-        try:
-            generator.train_churn_model(tutors, tutor_aggregates, output_dir=args.output_dir)
-        except Exception as e:
-            print(f"   ⚠️  Model training failed: {e}")
+    print(f"   Tutors: {n_tutors}, Days: {n_days}, Sessions/day: {sessions_per_day}"
+          + (f", Shards: {shards}" if shards > 1 else ""))
+    
+    if args.stream_sessions:
+        # Seeded like the profiles and sessions stages, so the same --seed gives the same data
+        generator = TutorDataGenerator(seed=stage_seed(args.seed, 'sessions'), as_of=as_of)
+        
+        print("\n📝 Generating tutor profiles...")
+        tutor_start = time.time()
+        tutors = stage_profiles(n_tutors, seed=stage_seed(args.seed, 'profiles'), as_of=as_of)
+        print(f"   ✓ Generated {len(tutors)} tutors in {time.time() - tutor_start:.2f}s")
+        
+        print("\n📚 Streaming session data...")
+        session_start = time.time()
+        tutors_path = write_frame(tutors, output_path(args.output_dir, 'tutor_profiles', args.output_format))
+        sessions_path = output_path(args.output_dir, 'sessions', args.output_format)
+        
+        # Chunks are written one at a time, so pad session IDs for the full planned volume up front
+        planned_sessions = generator.daily_session_counts(as_of - timedelta(days=n_days), n_days,
+                                                          sessions_per_day).sum()
+        id_widths = {'tutor_id': id_width('tutor_id', n_tutors),
+                     'session_id': id_width('session_id', planned_sessions)}
+        
+        n_sessions = 0
+        n_completed = 0
+        n_chunks = 0
+        with FrameWriter(sessions_path, id_widths=id_widths) as sessions_writer:
+            for chunk in generator.iter_sessions(tutors, n_days=n_days, sessions_per_day=sessions_per_day,
+                                                 chunk_days=args.chunk_days, max_chunk_rows=args.chunk_rows):
+                sessions_writer.write(chunk)
+                n_sessions += len(chunk)
+                n_completed += int(chunk['session_completed'].sum())
+                n_chunks += 1
+        print(f"   ✓ Streamed {n_sessions:,} sessions ({n_completed:,} completed) in {n_chunks} chunks "
+              f"in {time.time() - session_start:.2f}s")
+        print("   ℹ️  Streaming mode writes tutor profiles and sessions only; "
+              "downstream stages need the full session set")
+        print(f"\n⏱️  Total generation time: {time.time() - start_time:.2f}s")
+        print(f"📁 Files saved to {args.output_dir}/: {os.path.basename(tutors_path)}, {os.path.basename(sessions_path)}")
+        sys.exit(0)
+    
+    train_model = not args.no_model and args.mode == 'production'
+    
+    stage_cache = None
+    if args.cache_dir:
+        stage_cache = StageCache(args.cache_dir, max_mb=args.cache_max_mb, max_age_days=args.cache_max_age_days,
+                                 code_modules=CACHE_CODE_MODULES)
+    
+    # Stage graph: independent stages and file writes run concurrently with --workers > 1
+    runner = StageRunner(seed=args.seed, workers=args.workers,
+                         profile=args.profile, profile_stacks=args.profile_stacks, cache=stage_cache)
+    build_pipeline(runner, n_tutors, n_days, sessions_per_day, args.output_dir, args.output_format,
+                   as_of=as_of, shards=shards, include_events=args.include_engagement_events,
+                   include_experiments=args.include_experiments,
+                   include_interventions=args.include_interventions, train_model=train_model,
+                   num_interventions=args.num_interventions,
+                   max_interventions_per_tutor=args.max_interventions_per_tutor,
+                   database_url=args.database_url if args.load_db else None, clear_database=args.load_clear,
+                   load_batch_rows=args.load_batch_rows, churn_training=args.churn_training,
+                   model_dir=args.model_dir, churn_chunk_rows=args.churn_chunk_rows)
+    
+    results = runner.run()
+    
+    tutors = results['profiles']
+    sessions = results['sessions']
+    tutor_aggregates = results['churn_scores']
+    engagement_events = results.get('email_events', results.get('engagement_events'))
+    experiments = results.get('experiments')
+    experiment_assignments = results.get('experiment_assignments')
+    interventions = results.get('interventions')
     
     # Print summary statistics
     total_time = time.time() - start_time
@@ -902,20 +1600,31 @@ if __name__ == "__main__":
     if interventions is not None:
         print(f"Interventions: {len(interventions)} (success: {len(interventions[interventions['status'] == 'responded'])}, ignored: {len(interventions[interventions['status'] == 'delivered'])})")
     
+    runner.print_timings()
+    if stage_cache is not None:
+        evicted = stage_cache.evict()
+        print(f"\n🗃️  Stage cache: {len(runner.cached)} stage(s) loaded, "
+              f"{len(runner.keys) - len(runner.cached)} stored; evicted {evicted['removed']}, "
+              f"{evicted['kept_mb']:.1f} MB kept in {args.cache_dir}/")
+    if args.profile:
+        from profiling import write_report
+        print(f"\n🔬 Profile report: {', '.join(write_report(runner.profiles, os.path.join(args.output_dir, 'profile')))}")
     print(f"\n⏱️  Total generation time: {total_time:.2f}s")
     print(f"\n📁 Files saved to {args.output_dir}/:")
-    print(f"   - tutor_profiles.csv")
-    print(f"   - sessions.csv")
-    print(f"   - tutor_aggregates.csv")
+    extension = OUTPUT_FORMATS[args.output_format]
+    print(f"   - tutor_profiles{extension}")
+    print(f"   - sessions{extension}")
+    print(f"   - tutor_aggregates{extension}")
+    print(f"   - tutor_daily_rollups{extension}")
     if engagement_events is not None:
-        print(f"   - engagement_events.csv")
+        print(f"   - engagement_events{extension}")
     if experiments is not None:
-        print(f"   - experiments.csv")
+        print(f"   - experiments{extension}")
     if experiment_assignments is not None:
-        print(f"   - experiment_assignments.csv")
+        print(f"   - experiment_assignments{extension}")
     if interventions is not None:
-        print(f"   - interventions.csv")
-    if not args.no_model and args.mode == 'production':
+        print(f"   - interventions{extension}")
+    if train_model and os.path.exists(os.path.join(args.output_dir, 'churn_feature_importance.csv')):
         print(f"   - churn_feature_importance.csv")
         print(f"   - churn_feature_importance.png")
     print("="*60)